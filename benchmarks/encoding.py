@@ -0,0 +1,72 @@
+from datetime import datetime
+from timeit import timeit
+from uuid import uuid4
+
+from faker import Faker
+from typer import Typer, echo
+
+from blog_api.schemas.posts import PostOut
+from blog_api.utils.encoding import (
+    PydanticCodec,
+    decode_pydantic_model,
+    decode_value,
+    encode_pydantic_model,
+    encode_value,
+)
+
+fake: Faker = Faker()
+
+bench_cli = Typer()
+
+
+def fake_posts(size: int) -> list[PostOut]:
+    return [
+        PostOut(
+            id=uuid4(),
+            title=fake.sentence(),
+            categories=fake.words(3),
+            content=fake.text(2000),
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            author_id=uuid4(),
+            author_username=fake.user_name(),
+        )
+        for _ in range(size)
+    ]
+
+
+@bench_cli.command()
+def run(size: int = 1000, number: int = 20):
+    "Compare the legacy json path against the pydantic codec for post:all"
+    posts = fake_posts(size)
+    codec = PydanticCodec()
+
+    legacy = encode_pydantic_model(posts)
+    framed = encode_value(posts, codec)
+
+    results = {
+        "json": (
+            len(legacy),
+            timeit(lambda: encode_pydantic_model(posts), number=number),
+            timeit(
+                lambda: decode_pydantic_model(legacy, PostOut), number=number
+            ),
+        ),
+        codec.name: (
+            len(framed),
+            timeit(lambda: encode_value(posts, codec), number=number),
+            timeit(lambda: decode_value(framed, PostOut), number=number),
+        ),
+    }
+
+    echo(f"{size} posts, {number} rounds")
+    for name, (payload, encode, decode) in results.items():
+        echo(
+            f"{name:>10}: {payload:>10} bytes"
+            f" | encode {encode / number * 1000:8.2f} ms"
+            f" | decode {decode / number * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    bench_cli()
@@ -0,0 +1,148 @@
+import asyncio
+import tracemalloc
+from datetime import datetime
+from math import inf
+from time import perf_counter
+from typing import Awaitable, Callable
+from uuid import UUID, uuid4
+
+from faker import Faker
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+from typer import Typer, echo
+
+from blog_api.contrib.repositories import from_rows
+from blog_api.core.database import async_session, engine
+from blog_api.models.posts import PostModel
+from blog_api.models.users import UserModel
+from blog_api.repositories.posts import select_posts
+from blog_api.schemas.posts import PostOut
+
+fake: Faker = Faker()
+
+bench_cli = Typer()
+
+Path = Callable[[AsyncSession, UUID], Awaitable[list[PostOut]]]
+
+
+async def entity_path(session: AsyncSession, user_id: UUID) -> list[PostOut]:
+    # the repositories' read path before the column projection
+    result = await session.execute(
+        select(PostModel)
+        .options(joinedload(PostModel.user))
+        .filter(PostModel.user_id == user_id)
+    )
+
+    return [
+        PostOut(
+            id=post.id,
+            title=post.title,
+            categories=post.categories,
+            content=post.content,
+            created_at=post.created_at,
+            updated_at=post.updated_at,
+            author_id=post.user.id,
+            author_username=post.user.username,
+        )
+        for post in result.scalars().all()
+    ]
+
+
+async def projection_path(
+    session: AsyncSession, user_id: UUID
+) -> list[PostOut]:
+    result = await session.execute(
+        select_posts().filter(PostModel.user_id == user_id)
+    )
+
+    return from_rows(PostOut, result)
+
+
+async def seed(session: AsyncSession, size: int) -> UUID:
+    user_id, now = uuid4(), datetime.now()
+
+    await session.execute(
+        insert(UserModel).values(
+            id=user_id,
+            username=f"bench-{user_id}",
+            email=f"{user_id}@bench.local",
+            password="x" * 60,
+            role="user",
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    await session.execute(
+        insert(PostModel),
+        [
+            {
+                "id": uuid4(),
+                "title": fake.sentence(),
+                "categories": fake.words(3),
+                "content": f"{i} {fake.text(2000)}",
+                "user_id": user_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(size)
+        ],
+    )
+
+    return user_id
+
+
+async def measure(
+    session: AsyncSession, path: Path, user_id: UUID, number: int
+) -> tuple[float, int]:
+    best = inf
+    for _ in range(number):
+        # start every round with an empty identity map
+        session.expunge_all()
+        start = perf_counter()
+        await path(session, user_id)
+        best = min(best, perf_counter() - start)
+
+    session.expunge_all()
+    tracemalloc.start()
+    await path(session, user_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak
+
+
+async def bench(size: int, number: int) -> dict[str, tuple[float, int]]:
+    async with async_session() as session:
+        try:
+            user_id = await seed(session, size)
+            return {
+                "entities": await measure(
+                    session, entity_path, user_id, number
+                ),
+                "projection": await measure(
+                    session, projection_path, user_id, number
+                ),
+            }
+        finally:
+            # seeded rows never leave the transaction
+            await session.rollback()
+            await engine.dispose()
+
+
+@bench_cli.command()
+def run(size: int = 10_000, number: int = 5):
+    "Compare ORM entity loading against the column projection for a listing"
+    results = asyncio.run(bench(size, number))
+
+    echo(f"{size} posts, best of {number} rounds")
+    for name, (seconds, peak) in results.items():
+        echo(
+            f"{name:>10}: {seconds * 1000:8.2f} ms"
+            f" | peak {peak / 1024 / 1024:8.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    bench_cli()
@@ -1,20 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
 
+from blog_api.commands.cache import cache_init_lifespan
 from blog_api.commands.database import database_init_lifespan
 from blog_api.core.config import get_settings
+from blog_api.middlewares.query_stats import QueryStatsMiddleware
+from blog_api.middlewares.read_your_writes import ReadYourWritesMiddleware
 from blog_api.middlewares.user_agent import UserAgentMiddleware
 from blog_api.urls import api_router
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with database_init_lifespan(app), cache_init_lifespan(app):
+        yield
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     docs_url=None,
     redoc_url=None,
     openapi_url=None,
-    lifespan=database_init_lifespan,
+    lifespan=lifespan,
 )
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(UserAgentMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 app.include_router(api_router)
 add_pagination(app)
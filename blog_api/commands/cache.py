@@ -0,0 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI
+
+from blog_api.core import cache
+from blog_api.core.cache import (
+    close_cache_pool,
+    get_cache_pool,
+    listen_cache_invalidations,
+)
+
+
+@asynccontextmanager
+async def cache_init_lifespan(app: FastAPI):
+    get_cache_pool()
+
+    listener = (
+        asyncio.create_task(listen_cache_invalidations(cache.local_cache))
+        if cache.local_cache is not None
+        else None
+    )
+
+    yield
+
+    if listener is not None:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
+
+    await close_cache_pool()
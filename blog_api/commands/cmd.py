@@ -3,12 +3,24 @@ from enum import Enum
 from uuid import UUID
 
 import uvicorn
-from typer import Exit, Typer, echo
+from typer import Argument, Exit, FileText, Option, Typer, echo
 
 from blog_api.commands.app import app
-from blog_api.commands.database import cli_update_user_role
+from blog_api.commands.database import (
+    cli_db_current,
+    cli_db_downgrade,
+    cli_db_upgrade,
+    cli_update_user_role,
+)
+from blog_api.commands.imports import cli_import
+from blog_api.commands.recount import cli_recount
+from blog_api.core.config import get_settings
+
+settings = get_settings()
 
 app_cli = Typer()
+db_cli = Typer(help="Database schema migrations.")
+app_cli.add_typer(db_cli, name="db")
 
 
 class Role(str, Enum):
@@ -17,6 +29,11 @@ class Role(str, Enum):
     user = "user"
 
 
+class ImportKind(str, Enum):
+    posts = "posts"
+    comments = "comments"
+
+
 @app_cli.command()
 def update_role(user_id: UUID, role: Role):
     """
@@ -31,7 +48,97 @@ def update_role(user_id: UUID, role: Role):
         raise Exit(code=1)
 
 
+@app_cli.command("import")
+def import_(
+    kind: ImportKind,
+    file: FileText = Argument(..., help="NDJSON file, - reads stdin"),
+    user_id: UUID = Option(..., help="Author of the imported items"),
+    chunk_size: int = Option(settings.BULK_CHUNK_SIZE, min=1),
+):
+    """
+    Import posts or comments from NDJSON, one status line per item.
+    """
+    try:
+        created = asyncio.run(
+            cli_import(
+                file,
+                kind.value,
+                user_id,
+                chunk_size,
+                lambda item: echo(item.model_dump_json(exclude_none=True)),
+            )
+        )
+        echo(f"✅ {created} {kind.value} imported", err=True)
+    except Exception as e:
+        echo(f"Error: {e}", err=True)
+        raise Exit(code=1)
+
+
+@app_cli.command()
+def recount(batch_size: int = Option(1000, min=1)):
+    """
+    Repair drifted post and comment counters in batches.
+    """
+    try:
+        fixed = asyncio.run(
+            cli_recount(
+                batch_size,
+                lambda counter, drift: echo(f"{counter}: {drift} fixed"),
+            )
+        )
+        echo(f"✅ {fixed} counters repaired")
+    except Exception as e:
+        echo(f"Error: {e}")
+        raise Exit(code=1)
+
+
 @app_cli.command()
 def run(host: str = "127.0.0.1", port: int = 8000):
     "Run blog API"
     uvicorn.run(app, host=host, port=port)
+
+
+@db_cli.command("upgrade")
+def db_upgrade(target: int = Option(None, help="Version to stop at")):
+    """
+    Apply pending migrations.
+    """
+    try:
+        applied = asyncio.run(cli_db_upgrade(target))
+        for migration in applied:
+            echo(f"✅ {migration.version:04d} {migration.name}")
+        if not applied:
+            echo("✅ Database already up to date")
+    except Exception as e:
+        echo(f"Error: {e}")
+        raise Exit(code=1)
+
+
+@db_cli.command("downgrade")
+def db_downgrade(target: int):
+    """
+    Revert migrations above the target version.
+    """
+    try:
+        reverted = asyncio.run(cli_db_downgrade(target))
+        for migration in reverted:
+            echo(f"⚠️ Reverted {migration.version:04d} {migration.name}")
+        if not reverted:
+            echo("✅ Nothing to revert")
+    except Exception as e:
+        echo(f"Error: {e}")
+        raise Exit(code=1)
+
+
+@db_cli.command("current")
+def db_current():
+    """
+    Show the applied schema version.
+    """
+    try:
+        version, expected = asyncio.run(cli_db_current())
+        status = "up to date" if version == expected else f"head is {expected}"
+        echo(f"Schema version {version} ({status})")
+    except Exception as e:
+        echo(f"Error: {e}")
+        raise Exit(code=1)
@@ -1,11 +1,24 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from uuid import UUID
 
 from fastapi import FastAPI
-from sqlalchemy import inspect, update
+from redis.asyncio import Redis
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
 
-from blog_api.contrib.models import BaseModel
-from blog_api.core.database import engine, get_context_session
+from blog_api.core.cache import Cache, close_cache_pool, get_cache_pool
+from blog_api.core.config import get_settings
+from blog_api.core.database import engine, get_context_session, replicas
+from blog_api.migrations import MIGRATIONS, Migration
+from blog_api.migrations.runner import (
+    current_version,
+    downgrade,
+    head,
+    upgrade,
+    verify,
+)
 from blog_api.models import (  # noqa: F401  # pylint: disable=unused-import
     comments,
     posts,
@@ -13,28 +26,67 @@ from blog_api.models import (  # noqa: F401  # pylint: disable=unused-import
 )
 from blog_api.models.users import UserModel
 
+settings = get_settings()
+
 
-def get_table_names(sync_conn):
-    inspector = inspect(sync_conn)
-    return inspector.get_table_names()
+def migration_engine() -> AsyncEngine:
+    # index builds and backfills may run far past the API statement timeout
+    return create_async_engine(
+        settings.postgres_dsn,
+        poolclass=NullPool,
+        connect_args={
+            "server_settings": {
+                "application_name": f"{settings.DB_APPLICATION_NAME}-migrate",
+                "statement_timeout": "0",
+            }
+        },
+    )
 
 
 @asynccontextmanager
 async def database_init_lifespan(app: FastAPI):
-    # fix return type of this function
-    async with engine.begin() as conn:
-        existing_tables = await conn.run_sync(get_table_names)
-        all_tables = BaseModel.metadata.tables.keys()
+    # schema changes go through `blog db upgrade`, startup only checks them
+    async with engine.connect() as conn:
+        version = await verify(conn, MIGRATIONS)
 
-        for table in all_tables:
-            if table not in existing_tables:
-                print(f"✅ {table} created")
+    print(f"✅ database schema at version {version}")
+
+    monitor = None
+    if replicas.replicas:
+        monitor = asyncio.create_task(replicas.monitor())
+
+    try:
+        yield
+    finally:
+        if monitor is not None:
+            monitor.cancel()
+            with suppress(asyncio.CancelledError):
+                await monitor
+        await replicas.dispose()
 
-        await conn.run_sync(
-            lambda sync_conn: BaseModel.metadata.create_all(bind=sync_conn)
-        )
 
-    yield
+async def cli_db_upgrade(target: int | None = None) -> list[Migration]:
+    migrate = migration_engine()
+    try:
+        return await upgrade(migrate, MIGRATIONS, target)
+    finally:
+        await migrate.dispose()
+
+
+async def cli_db_downgrade(target: int) -> list[Migration]:
+    migrate = migration_engine()
+    try:
+        return await downgrade(migrate, MIGRATIONS, target)
+    finally:
+        await migrate.dispose()
+
+
+async def cli_db_current() -> tuple[int, int]:
+    try:
+        async with engine.connect() as conn:
+            return await current_version(conn), head(MIGRATIONS)
+    finally:
+        await engine.dispose()
 
 
 async def cli_update_user_role(user_id: UUID, role: str) -> None:
@@ -43,3 +95,10 @@ async def cli_update_user_role(user_id: UUID, role: str) -> None:
             update(UserModel).where(UserModel.id == user_id).values(role=role)
         )
         await conn.commit()
+
+    cache_conn = Redis(connection_pool=get_cache_pool())
+    try:
+        await Cache(cache_conn).invalidate_tags(f"user:{user_id}", "users")
+    finally:
+        await cache_conn.aclose()
+        await close_cache_pool()
@@ -0,0 +1,89 @@
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+from redis.asyncio import Redis
+
+from blog_api.contrib.bulk import ChunkWriter, write_in_chunks
+from blog_api.core.cache import Cache, close_cache_pool, get_cache_pool
+from blog_api.core.database import get_context_session
+from blog_api.repositories.comments import CommentsRepository
+from blog_api.repositories.posts import PostsRepository
+from blog_api.schemas.comments import CommentIn
+from blog_api.schemas.posts import PostIn
+from blog_api.schemas.response import BulkItemSchema, BulkStatus
+
+SCHEMAS: dict[str, type[BaseModel]] = {"posts": PostIn, "comments": CommentIn}
+
+
+def numbered_lines(lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+    # 1-based line numbers so statuses point back into the file
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            yield number, line
+
+
+def parse_chunk(
+    chunk: list[tuple[int, str]], schema: type[BaseModel], user_id: UUID
+) -> tuple[list[int], list[dict], list[BulkItemSchema]]:
+    numbers, rows, invalid = [], [], []
+
+    for number, line in chunk:
+        try:
+            item = schema.model_validate_json(line)
+        except ValidationError as e:
+            detail = e.errors()[0]["msg"]
+            invalid.append(
+                BulkItemSchema(index=number, status="invalid", detail=detail)
+            )
+            continue
+
+        numbers.append(number)
+        rows.append({**item.model_dump(), "user_id": user_id})
+
+    return numbers, rows, invalid
+
+
+async def cli_import(
+    lines: Iterable[str],
+    kind: str,
+    user_id: UUID,
+    chunk_size: int,
+    report: Callable[[BulkItemSchema], None],
+) -> int:
+    # the file is read one chunk at a time, memory stays bounded by
+    # chunk_size whatever the size of the export
+    cache_conn = Redis(connection_pool=get_cache_pool())
+    created = 0
+
+    try:
+        async with get_context_session() as session:
+            cache = Cache(cache_conn)
+            posts = PostsRepository(session, cache)
+            write: ChunkWriter
+            skipped: BulkStatus
+            if kind == "posts":
+                write, skipped = posts.create_posts, "duplicate"
+            else:
+                comments = CommentsRepository(session, posts, cache)
+                write, skipped = comments.create_comments, "post_not_found"
+
+            pending = numbered_lines(lines)
+            while chunk := list(islice(pending, chunk_size)):
+                numbers, rows, invalid = parse_chunk(
+                    chunk, SCHEMAS[kind], user_id
+                )
+                items = await write_in_chunks(write, rows, chunk_size, skipped)
+
+                for item in items:
+                    item.index = numbers[item.index]
+                    created += item.status == "created"
+
+                for item in sorted(invalid + items, key=lambda i: i.index):
+                    report(item)
+    finally:
+        await cache_conn.aclose()
+        await close_cache_pool()
+
+    return created
@@ -0,0 +1,100 @@
+from typing import Callable
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from blog_api.core.cache import Cache, close_cache_pool, get_cache_pool
+from blog_api.core.database import engine
+
+# (table, counter, counted table, foreign key on it)
+COUNTERS = (
+    ("posts", "comments_count", "comments", "post_id"),
+    ("users", "posts_count", "posts", "user_id"),
+    ("users", "comments_count", "comments", "user_id"),
+)
+
+# locking the batch first makes writers that bump these counters wait, so
+# the count below sees every row they committed and none they have not
+LOCK_BATCH = """
+SELECT id FROM {table} WHERE id > :after ORDER BY id LIMIT :limit FOR UPDATE
+"""
+
+REPAIR = """
+UPDATE {table} SET {counter} = actual.total
+FROM (
+    SELECT {table}.id, count({source}.id) AS total
+    FROM {table} LEFT JOIN {source} ON {source}.{fk} = {table}.id
+    WHERE {table}.id > :after AND {table}.id <= :last
+    GROUP BY {table}.id
+) AS actual
+WHERE {table}.id = actual.id AND {table}.{counter} <> actual.total
+RETURNING {table}.id
+"""
+
+# cached entries showing each table's counters
+COUNTER_TAGS = {"posts": "post:{}", "users": "author:{}"}
+
+
+async def recount(
+    engine: AsyncEngine,
+    table: str,
+    counter: str,
+    source: str,
+    fk: str,
+    batch_size: int,
+) -> list[UUID]:
+    fixed: list[UUID] = []
+    after = UUID(int=0)
+    lock = text(LOCK_BATCH.format(table=table))
+    repair = text(
+        REPAIR.format(table=table, counter=counter, source=source, fk=fk)
+    )
+
+    while True:
+        # one short transaction per batch, writers are held only that long
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                lock, {"after": after, "limit": batch_size}
+            )
+            ids = result.scalars().all()
+            if not ids:
+                return fixed
+
+            result = await conn.execute(
+                repair, {"after": after, "last": ids[-1]}
+            )
+            fixed.extend(result.scalars().all())
+
+        after = ids[-1]
+
+
+async def cli_recount(
+    batch_size: int, report: Callable[[str, int], None]
+) -> int:
+    fixed = 0
+    tags: set[str] = set()
+
+    try:
+        for table, counter, source, fk in COUNTERS:
+            drifted = await recount(
+                engine, table, counter, source, fk, batch_size
+            )
+            report(f"{table}.{counter}", len(drifted))
+            fixed += len(drifted)
+            tags.update(COUNTER_TAGS[table].format(id) for id in drifted)
+    finally:
+        await engine.dispose()
+
+    if fixed:
+        cache_conn = Redis(connection_pool=get_cache_pool())
+        try:
+            await Cache(cache_conn).invalidate_tags(
+                "feed", "users", *sorted(tags)
+            )
+        finally:
+            await cache_conn.aclose()
+            await close_cache_pool()
+
+    return fixed
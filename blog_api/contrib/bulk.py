@@ -0,0 +1,50 @@
+from typing import Awaitable, Callable, Sequence
+from uuid import UUID
+
+from blog_api.contrib.errors import CustomError
+from blog_api.schemas.response import (
+    BulkCreatedSchema,
+    BulkItemSchema,
+    BulkStatus,
+)
+
+# inserts one chunk in one transaction, None marks a row that was skipped
+ChunkWriter = Callable[[Sequence[dict]], Awaitable[list[UUID | None]]]
+
+
+async def write_in_chunks(
+    write: ChunkWriter,
+    rows: Sequence[dict],
+    size: int,
+    skipped: BulkStatus,
+) -> list[BulkItemSchema]:
+    items: list[BulkItemSchema] = []
+
+    for start in range(0, len(rows), size):
+        chunk = rows[start : start + size]
+
+        try:
+            ids = await write(chunk)
+        except CustomError as e:
+            # the chunk rolled back as a whole, earlier chunks stay committed
+            items.extend(
+                BulkItemSchema(index=index, status="failed", detail=e.message)
+                for index in range(start, start + len(chunk))
+            )
+            continue
+
+        items.extend(
+            (
+                BulkItemSchema(index=index, status=skipped)
+                if id is None
+                else BulkItemSchema(index=index, status="created", id=id)
+            )
+            for index, id in enumerate(ids, start)
+        )
+
+    return items
+
+
+def bulk_result(items: list[BulkItemSchema]) -> BulkCreatedSchema:
+    created = sum(item.status == "created" for item in items)
+    return BulkCreatedSchema(created=created, items=items)
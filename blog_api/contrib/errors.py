@@ -37,6 +37,16 @@ class NoResultFound(CustomError):
         super().__init__(message)
 
 
+class NotOwner(CustomError):
+    def __init__(self, resource: str | None = None):
+        message = (
+            f"{resource} not belongs current user"
+            if resource
+            else "Resource not belongs current user"
+        )
+        super().__init__(message)
+
+
 class CacheError(CustomError):
     def __init__(self, message: str):
         super().__init__(message)
@@ -62,3 +72,13 @@ class GenericError(CustomError):
     def __init__(self, message: Exception | str | None = None):
         custom_message = str(message) if message else "Generic Error"
         super().__init__(custom_message)
+
+
+class SchemaVersionError(CustomError):
+    def __init__(self, current: int, expected: int):
+        super().__init__(
+            f"Database schema is at version {current}, expected {expected}: "
+            "run `blog db upgrade`"
+        )
+        self.current = current
+        self.expected = expected
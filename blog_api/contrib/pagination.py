@@ -0,0 +1,102 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Literal, Sequence, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException, Query, status
+from fastapi_pagination.cursor import CursorPage, CursorParams
+from sqlalchemy import tuple_
+
+T = TypeVar("T")
+
+CountMode = Literal["exact", "estimate", "none"]
+
+
+@dataclass(frozen=True, slots=True)
+class Keyset:
+    created_at: datetime
+    id: UUID
+    # pages walked so far, lets the cache bound how deep it goes
+    depth: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class RankKeyset:
+    rank: float
+    id: UUID
+    depth: int = 0
+
+
+class KeysetParams(CursorParams):
+    total: CountMode = Query(
+        "none", description="Total count: exact, estimate or none"
+    )
+
+    def decode(self, position: Callable[[Any], Any]) -> tuple | None:
+        if (cursor := self.to_raw_params().cursor) is None:
+            return None
+
+        try:
+            value, id, depth = json.loads(cursor)
+            return position(value), UUID(id), int(depth)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor value",
+            )
+
+    def keyset(self) -> Keyset | None:
+        decoded = self.decode(datetime.fromisoformat)
+        return None if decoded is None else Keyset(*decoded)
+
+    def rank_keyset(self) -> RankKeyset | None:
+        decoded = self.decode(float)
+        return None if decoded is None else RankKeyset(*decoded)
+
+    @property
+    def depth(self) -> int:
+        decoded = self.decode(lambda value: value)
+        return 0 if decoded is None else decoded[2]
+
+
+def keyset_order(model: Any) -> tuple:
+    return model.created_at.desc(), model.id.desc()
+
+
+def keyset_after(model: Any, after: Keyset | None) -> tuple:
+    if after is None:
+        return ()
+
+    return (tuple_(model.created_at, model.id) < (after.created_at, after.id),)
+
+
+def rank_after(rank: Any, model: Any, after: RankKeyset | None) -> tuple:
+    if after is None:
+        return ()
+
+    return (tuple_(rank, model.id) < (after.rank, after.id),)
+
+
+def keyset_page(
+    model: type[T],
+    items: Sequence[T],
+    params: KeysetParams,
+    total: int | None = None,
+    position: Callable[[Any], Any] = lambda item: item.created_at.isoformat(),
+) -> CursorPage[T]:
+    # repositories fetch one row past the page to know if there is a next one
+    page, has_next = items[: params.size], len(items) > params.size
+    next_ = None
+
+    if has_next and page:
+        last = page[-1]
+        next_ = json.dumps([position(last), str(last.id), params.depth + 1])
+
+    return CursorPage[model].create(
+        page,
+        params,
+        current=params.to_raw_params().cursor,
+        next_=next_,
+        total=total,
+    )
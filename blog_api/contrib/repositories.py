@@ -1,6 +1,180 @@
+import json
+from inspect import iscoroutinefunction
+from typing import Any, Iterable, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import Row, Select, Update, func, select, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from blog_api.contrib.errors import (
+    CacheError,
+    CustomError,
+    DatabaseError,
+    GenericError,
+    NoResultFound,
+    NotOwner,
+)
+from blog_api.contrib.pagination import CountMode
+from blog_api.core.cache import Cache, invalidate_tags_later
+from blog_api.core.config import get_settings
+from blog_api.core.metrics import metrics
+from blog_api.core.profiling import traced
+
+settings = get_settings()
+
+S = TypeVar("S", bound=BaseModel)
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def from_row(schema: type[S], row: Row | None) -> S | None:
+    # rows come from labelled column selects matching the schema fields,
+    # they are already typed by the driver so validation is skipped
+    return None if row is None else schema.model_construct(**row._mapping)
+
+
+def from_rows(schema: type[S], rows: Iterable[Row]) -> list[S]:
+    return [schema.model_construct(**row._mapping) for row in rows]
+
+
+def owned_by(model: Any, owner_id: UUID | None) -> tuple:
+    return () if owner_id is None else (model.user_id == owner_id,)
+
+
+def increment(counter: Any, id: UUID, by: int = 1) -> Update:
+    # counters move in the same transaction as the rows they count, and
+    # are not an edit of the row: updated_at keeps its value
+    model = counter.class_
+    return (
+        update(model)
+        .where(model.id == id)
+        .values({counter.key: counter + by, "updated_at": model.updated_at})
+    )
+
+
+class Explain(Executable, ClauseElement):
+    # criteria keep their bound parameters, some types (REGCONFIG) have no
+    # literal rendering
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain)
+def compile_explain(element: Explain, compiler, **kw) -> str:
+    statement = compiler.process(element.statement, **kw)
+    return f"EXPLAIN (FORMAT JSON) {statement}"
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    return getattr(error.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION
 
 
 class BaseRepository:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, cache: Cache | None = None):
         self.db = db
+        self.cache = cache
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # statements are attributed to the repository method that ran them
+        for name, method in list(vars(cls).items()):
+            if not name.startswith("_") and iscoroutinefunction(method):
+                setattr(cls, name, traced(f"{cls.__name__}.{name}")(method))
+
+    async def invalidate(self, *tags: str) -> None:
+        if self.cache is None:
+            return
+
+        # the write is already committed, stale entries still expire by ttl
+        try:
+            await self.cache.invalidate_tags(*tags)
+        except (CacheError, GenericError):
+            metrics.incr("cache.invalidation_errors")
+
+        if settings.DB_REPLICA_DSNS:
+            invalidate_tags_later(settings.DB_REPLICA_MAX_LAG, *tags)
+
+    async def write_miss(
+        self, model: Any, id: UUID, owner_id: UUID | None, resource: str
+    ) -> CustomError:
+        # only reached when a conditional write matched no row, so the
+        # happy path stays a single statement
+        if owner_id is None:
+            return NoResultFound(resource)
+
+        async with self.db as session:
+            try:
+                result = await session.execute(
+                    select(model.user_id).filter(model.id == id)
+                )
+            except OperationalError:
+                raise DatabaseError
+            except Exception:
+                raise GenericError
+
+            if result.scalar_one_or_none() is None:
+                return NoResultFound(resource)
+
+        return NotOwner(resource)
+
+    async def count(self, model: type, *criteria: Any) -> int:
+        async with self.db as session:
+            try:
+                result = await session.execute(
+                    select(func.count()).select_from(model).filter(*criteria)
+                )
+            except OperationalError:
+                raise DatabaseError
+            except Exception:
+                raise GenericError
+
+            return result.scalar_one()
+
+    async def estimate(self, model: type, *criteria: Any) -> int:
+        async with self.db as session:
+            try:
+                if not criteria:
+                    result = await session.execute(
+                        text(
+                            "SELECT reltuples::bigint FROM pg_class "
+                            "WHERE oid = to_regclass(:table)"
+                        ),
+                        {"table": model.__tablename__},
+                    )
+                    rows = result.scalar_one_or_none()
+                else:
+                    # planner row estimate for the filtered scan
+                    result = await session.execute(
+                        Explain(select(model.id).filter(*criteria))
+                    )
+                    plan = result.scalar_one()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    rows = plan[0]["Plan"]["Plan Rows"]
+            except OperationalError:
+                raise DatabaseError
+            except Exception:
+                raise GenericError
+
+        # tables never analyzed report -1
+        if rows is None or rows < 0:
+            return await self.count(model, *criteria)
+
+        return int(rows)
+
+    async def total(
+        self, mode: CountMode, model: type, *criteria: Any
+    ) -> int | None:
+        if mode == "exact":
+            return await self.count(model, *criteria)
+        if mode == "estimate":
+            return await self.estimate(model, *criteria)
+        return None
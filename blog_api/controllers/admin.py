@@ -1,10 +1,11 @@
+from dataclasses import asdict
 from uuid import UUID
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi_pagination import Page, paginate
+from fastapi_pagination.cursor import CursorPage
 from pydantic import EmailStr
 
 from blog_api.contrib.errors import (
@@ -13,14 +14,21 @@ from blog_api.contrib.errors import (
     EncodingError,
     GenericError,
     NoResultFound,
+    NothingToUpdate,
     UnableDeleteEntity,
     UnableUpdateEntity,
 )
+from blog_api.contrib.pagination import KeysetParams, keyset_page
 from blog_api.core.cache import Cache
+from blog_api.core.config import get_settings
+from blog_api.core.database import get_context_read_session
+from blog_api.core.metrics import metrics
+from blog_api.core.profiling import slow_queries
 from blog_api.dependencies.auth import get_current_user
 from blog_api.dependencies.dependencies import (
     CacheDependency,
     DatabaseDependency,
+    ReadDatabaseDependency,
 )
 from blog_api.models.users import UserModel
 from blog_api.repositories.comments import CommentsRepository
@@ -30,16 +38,19 @@ from blog_api.schemas.posts import PostUpdate
 from blog_api.schemas.response import UpdateSuccess
 from blog_api.schemas.users import RoleUpdate, UserOut
 
+settings = get_settings()
+
 admin_controller = APIRouter(tags=["admin"])
 
 
 @admin_controller.get("/users", status_code=status.HTTP_200_OK)
 async def get_users(
-    db: DatabaseDependency,  # type: ignore
+    db: ReadDatabaseDependency,  # type: ignore
     cache_conn: CacheDependency,  # type: ignore
     user: UserOut = Depends(get_current_user),
     email: EmailStr = Query(None),
-) -> Page[UserOut]:
+    params: KeysetParams = Depends(),
+) -> CursorPage[UserOut]:
     if user.role not in ("admin", "dev"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,26 +64,26 @@ async def get_users(
     try:
         if email:
             if cache_user := await cache.get(f"user:{email}", UserOut):
-                return paginate([cache_user])
+                return keyset_page(UserOut, [cache_user], params)
 
             db_user = await repository.get_user_by_query(
                 UserModel(email=email)
             )
 
-            return paginate([UserOut(**db_user.__dict__)])
-
-        users = await cache.get("user:all", UserOut)
-
-        if users is not None:
-            return paginate(users)
-
-        users = await repository.get_users()
-
-        users = [UserOut(**user.__dict__) for user in users]
+            return keyset_page(UserOut, [UserOut(**db_user.__dict__)], params)
 
-        await cache.add("user:all", users)
+        async def refresh_users() -> CursorPage[UserOut]:
+            async with get_context_read_session() as db:
+                return await UsersRepository(db).get_users_page(params)
 
-        return paginate(users)
+        return await cache.get_or_load_page(
+            "user:all",
+            UserOut,
+            params,
+            lambda: repository.get_users_page(params),
+            tags=["users"],
+            refresh=refresh_users,
+        )
 
     except (CacheError, EncodingError) as e:
         raise HTTPException(
@@ -90,7 +101,7 @@ async def get_users(
 
 @admin_controller.get("/users/{user_id}")
 async def get_user_by_id(
-    db: DatabaseDependency,  # type: ignore
+    db: ReadDatabaseDependency,  # type: ignore
     cache_conn: CacheDependency,  # type: ignore
     user_id: UUID,
     user: UserOut = Depends(get_current_user),
@@ -105,17 +116,19 @@ async def get_user_by_id(
 
     cache = Cache(cache_conn)
 
-    try:
-        cache_user = await cache.get(f"user:{user_id}", UserOut)
-
-        if cache_user is not None and isinstance(cache_user, UserOut):
-            return cache_user
-
+    async def load_user() -> UserOut | None:
         db_user = await repository.get_user_by_id(user_id)
+        return UserOut(**db_user.__dict__) if db_user else None
 
-        db_user = UserOut(**db_user.__dict__)
+    try:
+        db_user = await cache.get_or_load(
+            f"user:{user_id}", UserOut, load_user, tags=[f"user:{user_id}"]
+        )
 
-        await cache.add(f"user:{db_user.id}", db_user)
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
 
         return db_user
 
@@ -138,6 +151,7 @@ async def get_user_by_id(
 )
 async def update_user_role(
     db: DatabaseDependency,  # type:ignore
+    cache_conn: CacheDependency,  # type: ignore
     user_id: UUID,
     data: RoleUpdate,
     user: UserOut = Depends(get_current_user),
@@ -154,7 +168,7 @@ async def update_user_role(
             detail="you are not allowed to change your own role",
         )
 
-    repository = UsersRepository(db)
+    repository = UsersRepository(db, Cache(cache_conn))
 
     try:
         await repository.update_user_role(user_id, data.role)
@@ -180,6 +194,7 @@ async def update_user_role(
 )
 async def delete_user(
     db: DatabaseDependency,  # type:ignore
+    cache_conn: CacheDependency,  # type: ignore
     user_id: UUID,
     user: UserOut = Depends(get_current_user),
 ) -> None:
@@ -189,10 +204,14 @@ async def delete_user(
             detail="invalid permissions",
         )
 
-    repository = UsersRepository(db)
+    repository = UsersRepository(db, Cache(cache_conn))
 
     try:
         await repository.delete_user(user_id)
+    except NoResultFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=e.message
+        )
     except (DatabaseError, UnableDeleteEntity) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
@@ -208,6 +227,7 @@ async def delete_user(
 )
 async def update_post(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     post_id: UUID,
     user: UserOut = Depends(get_current_user),
     body: PostUpdate = Body(...),
@@ -218,19 +238,24 @@ async def update_post(
             detail="invalid permissions",
         )
 
-    repository = PostsRepository(db)
+    repository = PostsRepository(db, Cache(cache_conn))
 
     try:
-        post = await repository.get_post_by_id(post_id)
-
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-            )
-
         await repository.update_post(post_id, body.model_dump())
 
-    except (DatabaseError, UnableUpdateEntity) as e:
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
+    except NothingToUpdate as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=e.message
+        )
+    except UnableUpdateEntity as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=e.message
+        )
+    except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
         )
@@ -245,6 +270,7 @@ async def update_post(
 )
 async def delete_post(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     post_id: UUID,
     user: UserOut = Depends(get_current_user),
 ) -> None:
@@ -254,18 +280,15 @@ async def delete_post(
             detail="invalid permissions",
         )
 
-    repository = PostsRepository(db)
+    repository = PostsRepository(db, Cache(cache_conn))
 
     try:
-        post = await repository.get_post_by_id(post_id)
-
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-            )
-
         await repository.delete_post(post_id)
 
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
     except (DatabaseError, UnableDeleteEntity) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
@@ -281,6 +304,7 @@ async def delete_post(
 )
 async def delete_comment(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     comment_id: UUID,
     user: UserOut = Depends(get_current_user),
 ) -> None:
@@ -291,17 +315,16 @@ async def delete_comment(
         )
 
     post_repository = PostsRepository(db)
-    comment_repository = CommentsRepository(db, post_repository)
-
-    comment = await comment_repository.get_comment_by_id(comment_id)
+    comment_repository = CommentsRepository(
+        db, post_repository, Cache(cache_conn)
+    )
 
-    if comment is None:
+    try:
+        await comment_repository.delete_comment(comment_id)
+    except NoResultFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found."
         )
-
-    try:
-        await comment_repository.delete_comment(comment_id)
     except (DatabaseError, UnableDeleteEntity) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
@@ -312,6 +335,51 @@ async def delete_comment(
         )
 
 
+@admin_controller.get("/metrics", status_code=status.HTTP_200_OK)
+async def get_metrics(
+    user: UserOut = Depends(get_current_user),
+) -> dict:
+    if user.role not in ("admin", "dev"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="invalid permissions",
+        )
+
+    return metrics.snapshot()
+
+
+@admin_controller.get("/queries/slow", status_code=status.HTTP_200_OK)
+async def get_slow_queries(
+    user: UserOut = Depends(get_current_user),
+) -> dict:
+    if user.role not in ("admin", "dev"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="invalid permissions",
+        )
+
+    return {
+        "threshold_ms": settings.DB_SLOW_QUERY_MS,
+        "explain": settings.DB_EXPLAIN_SLOW_QUERIES,
+        "queries": [asdict(query) for query in slow_queries.recent()],
+    }
+
+
+@admin_controller.delete(
+    "/queries/slow", status_code=status.HTTP_204_NO_CONTENT
+)
+async def clear_slow_queries(
+    user: UserOut = Depends(get_current_user),
+) -> None:
+    if user.role not in ("admin", "dev"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="invalid permissions",
+        )
+
+    slow_queries.clear()
+
+
 @admin_controller.get(
     "/docs", status_code=status.HTTP_200_OK, include_in_schema=False
 )
@@ -1,42 +1,56 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Body, Depends, HTTPException, status
-from fastapi_pagination import Page, paginate
+from fastapi_pagination.cursor import CursorPage
 
+from blog_api.contrib.bulk import bulk_result, write_in_chunks
 from blog_api.contrib.errors import (
     CacheError,
     DatabaseError,
     EncodingError,
     GenericError,
     NoResultFound,
+    NotOwner,
     UnableCreateEntity,
     UnableDeleteEntity,
     UnableUpdateEntity,
 )
+from blog_api.contrib.pagination import KeysetParams
 from blog_api.core.cache import Cache
+from blog_api.core.config import get_settings
+from blog_api.core.database import get_context_read_session
 from blog_api.dependencies.auth import get_current_user
 from blog_api.dependencies.dependencies import (
     CacheDependency,
     DatabaseDependency,
+    ReadDatabaseDependency,
 )
 from blog_api.models.comments import CommentModel
 from blog_api.repositories.comments import CommentsRepository
 from blog_api.repositories.posts import PostsRepository
 from blog_api.schemas.comments import CommentIn, CommentOut, CommentUpdate
-from blog_api.schemas.response import CommentCreatedSchema
+from blog_api.schemas.response import (
+    BulkCreatedSchema,
+    CommentCreatedSchema,
+)
 from blog_api.schemas.users import UserOut
 
+settings = get_settings()
+
 comments_controller = APIRouter(tags=["comments"])
 
 
 @comments_controller.post("/", status_code=status.HTTP_201_CREATED)
 async def create_comment(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     user: UserOut = Depends(get_current_user),
     body: CommentIn = Body(...),
 ) -> CommentCreatedSchema:
     post_repository = PostsRepository(db)
-    comment_repository = CommentsRepository(db, post_repository)
+    comment_repository = CommentsRepository(
+        db, post_repository, Cache(cache_conn)
+    )
 
     try:
         model = CommentModel(**body.model_dump(), user_id=user.id)
@@ -57,27 +71,59 @@ async def create_comment(
         )
 
 
+@comments_controller.post("/bulk", status_code=status.HTTP_200_OK)
+async def create_comments(
+    db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
+    user: UserOut = Depends(get_current_user),
+    body: list[CommentIn] = Body(
+        ..., min_length=1, max_length=settings.BULK_MAX_ITEMS
+    ),
+) -> BulkCreatedSchema:
+    comment_repository = CommentsRepository(
+        db, PostsRepository(db), Cache(cache_conn)
+    )
+
+    rows = [{**comment.model_dump(), "user_id": user.id} for comment in body]
+
+    items = await write_in_chunks(
+        comment_repository.create_comments,
+        rows,
+        settings.BULK_CHUNK_SIZE,
+        "post_not_found",
+    )
+
+    return bulk_result(items)
+
+
 @comments_controller.get("/post/{post_id}", status_code=status.HTTP_200_OK)
 async def get_comments_by_post_id(
-    db: DatabaseDependency,  # type: ignore
+    db: ReadDatabaseDependency,  # type: ignore
     cache_conn: CacheDependency,  # type: ignore
     post_id: UUID,
-) -> Page[CommentOut]:
+    params: KeysetParams = Depends(),
+) -> CursorPage[CommentOut]:
     post_repository = PostsRepository(db)
     comment_repository = CommentsRepository(db, post_repository)
     cache = Cache(cache_conn)
 
-    try:
-        if comments := await cache.get(f"comment:{post_id}", CommentOut):
-            return paginate(comments)
+    async def refresh_comments() -> CursorPage[CommentOut]:
+        async with get_context_read_session() as db:
+            return await CommentsRepository(
+                db, PostsRepository(db)
+            ).get_comments_by_post_id_page(post_id, params)
 
-        comments = await comment_repository.get_comments_by_post_id(
-            post_id=post_id
+    try:
+        return await cache.get_or_load_page(
+            f"comment:{post_id}",
+            CommentOut,
+            params,
+            lambda: comment_repository.get_comments_by_post_id_page(
+                post_id, params
+            ),
+            tags=[f"comments:{post_id}", f"post:{post_id}"],
+            refresh=refresh_comments,
         )
-
-        await cache.add(f"comment:{post_id}", comments)
-
-        return paginate(comments)
     except NoResultFound as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=e.message
@@ -98,23 +144,29 @@ async def get_comments_by_post_id(
 
 @comments_controller.get("/user/{user_id}", status_code=status.HTTP_200_OK)
 async def get_comments_by_user_id(
-    db: DatabaseDependency,  # type: ignore
+    db: ReadDatabaseDependency,  # type: ignore
     cache_conn: CacheDependency,  # type: ignore
     user_id: UUID,
-) -> Page[CommentOut]:
+    params: KeysetParams = Depends(),
+) -> CursorPage[CommentOut]:
     post_repository = PostsRepository(db)
     comment_repository = CommentsRepository(db, post_repository)
     cache = Cache(cache_conn)
 
     try:
-        if comments := await cache.get(f"comment:{user_id}", CommentOut):
-            return paginate(comments)
-
-        comments = await comment_repository.get_comments_by_user_id(user_id)
-
-        await cache.add(f"comment:{user_id}", comments)
-
-        return paginate(comments)
+        # comments carry their post title, so follow those posts too
+        return await cache.get_or_load_page(
+            f"comment:{user_id}",
+            CommentOut,
+            params,
+            lambda: comment_repository.get_comments_by_user_id_page(
+                user_id, params
+            ),
+            tags=lambda page: [
+                f"commenter:{user_id}",
+                *{f"post:{comment.post_id}" for comment in page.items},
+            ],
+        )
     except NoResultFound as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=e.message
@@ -138,32 +190,29 @@ async def get_comments_by_user_id(
 )
 async def update_comment(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     comment_id: UUID,
     content: CommentUpdate = Body(...),
     user: UserOut = Depends(get_current_user),
 ) -> None:
     post_repository = PostsRepository(db)
-    comment_repository = CommentsRepository(db, post_repository)
+    comment_repository = CommentsRepository(
+        db, post_repository, Cache(cache_conn)
+    )
 
-    comment = await comment_repository.get_comment_by_id(comment_id)
-
-    if not comment:
+    try:
+        await comment_repository.update_comment(
+            comment_id, content.content, owner_id=user.id
+        )
+    except NoResultFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found."
         )
-
-    if comment.author_id != user.id:
+    except NotOwner:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=status.HTTP_403_FORBIDDEN,
             detail="This comment don't belongs current user",
         )
-
-    try:
-        await comment_repository.update_comment(comment_id, content.content)
-    except NoResultFound as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail=e.message
-        )
     except (DatabaseError, UnableUpdateEntity) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
@@ -179,27 +228,26 @@ async def update_comment(
 )
 async def delete_comment(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     comment_id: UUID,
     user: UserOut = Depends(get_current_user),
 ) -> None:
     post_repository = PostsRepository(db)
-    comment_repository = CommentsRepository(db, post_repository)
+    comment_repository = CommentsRepository(
+        db, post_repository, Cache(cache_conn)
+    )
 
-    comment = await comment_repository.get_comment_by_id(comment_id)
-
-    if comment is None:
+    try:
+        await comment_repository.delete_comment(comment_id, owner_id=user.id)
+    except NoResultFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found."
         )
-
-    if comment.author_id != user.id:
+    except NotOwner:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=status.HTTP_403_FORBIDDEN,
             detail="This comment don't belongs current user",
         )
-
-    try:
-        await comment_repository.delete_comment(comment_id)
     except (DatabaseError, UnableDeleteEntity) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
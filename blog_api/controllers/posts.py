@@ -1,36 +1,83 @@
+import hashlib
 from uuid import UUID
-from fastapi import APIRouter, Body, Depends, HTTPException, status
-from fastapi_pagination import Page, paginate
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi_pagination.cursor import CursorPage
 
+from blog_api.contrib.bulk import bulk_result, write_in_chunks
 from blog_api.contrib.errors import (
     CacheError,
     DatabaseError,
     EncodingError,
     GenericError,
+    NoResultFound,
+    NothingToUpdate,
+    NotOwner,
     UnableCreateEntity,
     UnableDeleteEntity,
     UnableUpdateEntity,
 )
+from blog_api.contrib.pagination import KeysetParams
 from blog_api.core.cache import Cache
+from blog_api.core.config import get_settings
+from blog_api.core.database import get_context_read_session
 from blog_api.dependencies.auth import get_current_user
-from blog_api.dependencies.dependencies import CacheDependency, DatabaseDependency
+from blog_api.dependencies.dependencies import (
+    CacheDependency,
+    DatabaseDependency,
+    ReadDatabaseDependency,
+)
 from blog_api.models.posts import PostModel
-from blog_api.repositories.posts import PostsRepository
-from blog_api.schemas.posts import PostIn, PostOut, PostUpdate
-from blog_api.schemas.response import PostCreatedSchema
+from blog_api.repositories.posts import CategoryMatch, PostsRepository
+from blog_api.schemas.posts import (
+    CategoryCountOut,
+    PostIn,
+    PostOut,
+    PostSearchOut,
+    PostSummaryOut,
+    PostUpdate,
+)
+from blog_api.schemas.response import BulkCreatedSchema, PostCreatedSchema
 from blog_api.schemas.users import UserOut
 
+settings = get_settings()
 
 posts_controller = APIRouter(tags=["posts"])
 
 
+def post_tags(post: PostOut) -> list[str]:
+    # the payload embeds the author's counters, author writes reach it too
+    return [f"post:{post.id}", f"author:{post.author_id}"]
+
+
+async def refresh_posts(
+    params: KeysetParams, categories: list[str], match: CategoryMatch
+) -> CursorPage[PostSummaryOut]:
+    async with get_context_read_session() as db:
+        return await PostsRepository(db).get_posts_page(
+            params, categories, match
+        )
+
+
+async def refresh_categories() -> list[CategoryCountOut]:
+    async with get_context_read_session() as db:
+        return await PostsRepository(db).get_category_counts()
+
+
+async def refresh_search(
+    q: str, params: KeysetParams
+) -> CursorPage[PostSearchOut]:
+    async with get_context_read_session() as db:
+        return await PostsRepository(db).search_posts_page(q, params)
+
+
 @posts_controller.post("/", status_code=status.HTTP_201_CREATED)
 async def create_post(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     user: UserOut = Depends(get_current_user),
     body: PostIn = Body(...),
 ):
-    repository = PostsRepository(db)
+    repository = PostsRepository(db, Cache(cache_conn))
 
     post_model = PostModel(**body.model_dump(), user_id=user.id)
 
@@ -39,34 +86,175 @@ async def create_post(
 
         return PostCreatedSchema(id=post_id)
 
-    except (DatabaseError, UnableCreateEntity) as e:
+    except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
         )
+    except UnableCreateEntity as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
     except GenericError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
         )
 
 
+@posts_controller.post("/bulk", status_code=status.HTTP_200_OK)
+async def create_posts(
+    db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
+    user: UserOut = Depends(get_current_user),
+    body: list[PostIn] = Body(
+        ..., min_length=1, max_length=settings.BULK_MAX_ITEMS
+    ),
+) -> BulkCreatedSchema:
+    repository = PostsRepository(db, Cache(cache_conn))
+
+    rows = [{**post.model_dump(), "user_id": user.id} for post in body]
+
+    items = await write_in_chunks(
+        repository.create_posts, rows, settings.BULK_CHUNK_SIZE, "duplicate"
+    )
+
+    return bulk_result(items)
+
+
 @posts_controller.get("/", status_code=status.HTTP_200_OK)
 async def get_posts(
-    db: DatabaseDependency,  # type: ignore
+    db: ReadDatabaseDependency,  # type: ignore
     cache_conn: CacheDependency,  # type: ignore
-) -> Page[PostOut]:
+    params: KeysetParams = Depends(),
+    category: list[str] = Query([], max_length=10),
+    match: CategoryMatch = Query("all", description="all: @>, any: &&"),
+) -> CursorPage[PostSummaryOut]:
     repository = PostsRepository(db)
 
     cache = Cache(cache_conn)
 
+    categories = sorted(set(category))
+    # listings carry summaries only, full bodies live under post:{id}
+    key = "posts:all"
+    if categories:
+        digest = hashlib.sha256("\0".join(categories).encode()).hexdigest()
+        key = f"posts:all:category:{match}:{digest[:16]}"
+
     try:
-        if posts := await cache.get("post:all", PostOut):
-            return paginate(posts)
+        return await cache.get_or_load_page(
+            key,
+            PostSummaryOut,
+            params,
+            lambda: repository.get_posts_page(params, categories, match),
+            tags=["feed"],
+            refresh=lambda: refresh_posts(params, categories, match),
+        )
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+    except (CacheError, EncodingError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+    except GenericError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+
+
+@posts_controller.get("/batch", status_code=status.HTTP_200_OK)
+async def get_posts_by_ids(
+    db: ReadDatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
+    ids: list[UUID] = Query(..., max_length=100),
+) -> list[PostOut]:
+    repository = PostsRepository(db)
+
+    cache = Cache(cache_conn)
+
+    try:
+        keys = {f"post:{post_id}": post_id for post_id in ids}
+        found, misses = await cache.get_many(keys, PostOut)
 
-        posts = await repository.get_posts()
+        if misses:
+            loaded = {
+                f"post:{post.id}": post
+                for post in await repository.get_posts_by_ids(
+                    [keys[key] for key in misses]
+                )
+            }
+            await cache.add_many(loaded, tags=post_tags)
+            found |= loaded
 
-        await cache.add("post:all", posts)
+        return [found[key] for key in keys if key in found]
 
-        return paginate(posts)
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+    except (CacheError, EncodingError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+    except GenericError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+
+
+@posts_controller.get("/categories", status_code=status.HTTP_200_OK)
+async def get_categories(
+    db: ReadDatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
+) -> list[CategoryCountOut]:
+    repository = PostsRepository(db)
+
+    cache = Cache(cache_conn)
+
+    try:
+        return await cache.get_or_load(
+            "categories:counts",
+            CategoryCountOut,
+            repository.get_category_counts,
+            tags=["feed"],
+            refresh=refresh_categories,
+        )
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+    except (CacheError, EncodingError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+    except GenericError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
+        )
+
+
+@posts_controller.get("/search", status_code=status.HTTP_200_OK)
+async def search_posts(
+    db: ReadDatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
+    q: str = Query(..., min_length=1, max_length=200),
+    params: KeysetParams = Depends(),
+) -> CursorPage[PostSearchOut]:
+    repository = PostsRepository(db)
+
+    cache = Cache(cache_conn)
+
+    # the search config lowercases terms, so does the cache key
+    q = " ".join(q.split()).lower()
+    digest = hashlib.sha256(q.encode()).hexdigest()[:16]
+
+    try:
+        return await cache.get_or_load_page(
+            f"search:{digest}",
+            PostSearchOut,
+            params,
+            lambda: repository.search_posts_page(q, params),
+            tags=["feed"],
+            refresh=lambda: refresh_search(q, params),
+        )
     except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
@@ -83,7 +271,7 @@ async def get_posts(
 
 @posts_controller.get("/{post_id}", status_code=status.HTTP_200_OK)
 async def get_post_by_id(
-    db: DatabaseDependency,  # type: ignore
+    db: ReadDatabaseDependency,  # type: ignore
     cache_conn: CacheDependency,  # type: ignore
     post_id: UUID,
 ) -> PostOut:
@@ -92,20 +280,18 @@ async def get_post_by_id(
     cache = Cache(cache_conn)
 
     try:
-        post = await cache.get(f"post:{post_id}", PostOut)
-
-        if isinstance(post, PostOut):
-            return post
-
-        post = await repository.get_post_by_id(post_id)
+        post = await cache.get_or_load(
+            f"post:{post_id}",
+            PostOut,
+            lambda: repository.get_post_by_id(post_id),
+            tags=post_tags,
+        )
 
         if post is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Post Not Found."
             )
 
-        await cache.add(f"post:{post.id}", post)
-
         return post
 
     except DatabaseError as e:
@@ -124,23 +310,23 @@ async def get_post_by_id(
 
 @posts_controller.get("/user/{user_id}", status_code=status.HTTP_200_OK)
 async def get_post_by_user_id(
-    db: DatabaseDependency,  # type: ignore
+    db: ReadDatabaseDependency,  # type: ignore
     cache_conn: CacheDependency,  # type: ignore
     user_id: UUID,
-) -> Page[PostOut]:
+    params: KeysetParams = Depends(),
+) -> CursorPage[PostSummaryOut]:
     repository = PostsRepository(db)
 
     cache = Cache(cache_conn)
 
     try:
-        if posts := await cache.get(f"posts:{user_id}", PostOut):
-            return paginate(posts)
-
-        posts = await repository.get_posts_by_user_id(user_id)
-
-        await cache.add(f"posts:{user_id}", posts)
-
-        return paginate(posts)
+        return await cache.get_or_load_page(
+            f"posts:{user_id}",
+            PostSummaryOut,
+            params,
+            lambda: repository.get_posts_by_user_id_page(user_id, params),
+            tags=[f"author:{user_id}"],
+        )
 
     except DatabaseError as e:
         raise HTTPException(
@@ -159,29 +345,30 @@ async def get_post_by_user_id(
 @posts_controller.put("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def update_post(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     post_id: UUID,
     user: UserOut = Depends(get_current_user),
     body: PostUpdate = Body(...),
 ) -> None:
-    repository = PostsRepository(db)
+    repository = PostsRepository(db, Cache(cache_conn))
 
     try:
-        post = await repository.get_post_by_id(post_id)
-
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-            )
-
-        if post.author_id is not user.id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"{post_id} not belongs current user",
-            )
+        await repository.update_post(post_id, body.model_dump(), owner_id=user.id)
 
-        await repository.update_post(post_id, body.model_dump())
-
-    except (DatabaseError, UnableUpdateEntity) as e:
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
+    except NotOwner:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"{post_id} not belongs current user",
+        )
+    except NothingToUpdate as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
+    except UnableUpdateEntity as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
+    except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
         )
@@ -194,27 +381,24 @@ async def update_post(
 @posts_controller.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_post(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     post_id: UUID,
     user: UserOut = Depends(get_current_user),
 ) -> None:
-    repository = PostsRepository(db)
+    repository = PostsRepository(db, Cache(cache_conn))
 
     try:
-        post = await repository.get_post_by_id(post_id)
-
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-            )
-
-        if post.author_id is not user.id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"{post_id} not belongs current user",
-            )
-
-        await repository.delete_post(post_id)
+        await repository.delete_post(post_id, owner_id=user.id)
 
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
+    except NotOwner:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"{post_id} not belongs current user",
+        )
     except (DatabaseError, UnableDeleteEntity) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message
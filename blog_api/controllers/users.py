@@ -11,11 +11,15 @@ from blog_api.contrib.errors import (
     UnableUpdateEntity,
 )
 from blog_api.core.auth import authenticate
+from blog_api.core.cache import Cache
 from blog_api.core.config import get_settings
 from blog_api.core.security import check_password, gen_hash
 from blog_api.core.token import gen_jwt
 from blog_api.dependencies.auth import get_current_user
-from blog_api.dependencies.dependencies import DatabaseDependency
+from blog_api.dependencies.dependencies import (
+    CacheDependency,
+    DatabaseDependency,
+)
 from blog_api.models.users import UserModel
 from blog_api.repositories.users import UsersRepository
 from blog_api.schemas.response import TokenResponse, UserCreatedSchema
@@ -29,9 +33,10 @@ users_controller = APIRouter(tags=["account"])
 @users_controller.post("/sign-up", status_code=status.HTTP_201_CREATED)
 async def create_user(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     body: UserIn = Body(...),  # type: ignore
 ) -> UserCreatedSchema:
-    repository: UsersRepository = UsersRepository(db)
+    repository: UsersRepository = UsersRepository(db, Cache(cache_conn))
 
     user = UserModel(**body.model_dump())
 
@@ -92,10 +97,11 @@ async def get_logged_user(
 @users_controller.put("/password", status_code=status.HTTP_204_NO_CONTENT)
 async def update_password(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     form: PasswordUpdate,  # type: ignore
     user: UserOut = Depends(get_current_user),
 ) -> None:
-    repository: UsersRepository = UsersRepository(db)
+    repository: UsersRepository = UsersRepository(db, Cache(cache_conn))
 
     try:
         user_db = await repository.get_user_by_id(user.id)
@@ -135,9 +141,10 @@ async def update_password(
 @users_controller.delete("/", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     db: DatabaseDependency,  # type: ignore
+    cache_conn: CacheDependency,  # type: ignore
     user: UserOut = Depends(get_current_user),
 ) -> None:
-    repository: UsersRepository = UsersRepository(db)
+    repository: UsersRepository = UsersRepository(db, Cache(cache_conn))
 
     try:
         await repository.delete_user(user.id)
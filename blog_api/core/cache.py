@@ -1,6 +1,25 @@
-from typing import AsyncGenerator, TypeVar, Type
+import asyncio
+import hashlib
+import json
+import math
+import random
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from time import monotonic, perf_counter, thread_time, time
+from typing import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Iterable,
+    TypeVar,
+    Type,
+)
+from uuid import uuid4
+from fastapi_pagination.cursor import CursorPage
 from pydantic import BaseModel
-from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
 from redis.exceptions import (
     ConnectionError,
     TimeoutError,
@@ -8,8 +27,20 @@ from redis.exceptions import (
     DataError,
 )
 from blog_api.contrib.errors import CacheError, EncodingError, GenericError
-from blog_api.core.config import get_settings
-from blog_api.utils.encoding import encode_pydantic_model, decode_pydantic_model
+from blog_api.contrib.pagination import KeysetParams
+from blog_api.core.config import CompressionPolicy, TTLPolicy, get_settings
+from blog_api.core.local_cache import LocalCache
+from blog_api.core.metrics import metrics
+from blog_api.schemas.comments import CommentOut
+from blog_api.schemas.posts import (
+    CategoryCountOut,
+    PostOut,
+    PostSearchOut,
+    PostSummaryOut,
+)
+from blog_api.schemas.users import UserOut
+from blog_api.utils.compression import compress, decompress, is_compressed
+from blog_api.utils.encoding import decode_value, encode_value, get_codec
 
 settings = get_settings()
 
@@ -17,22 +48,353 @@ settings = get_settings()
 T = TypeVar("T", bound=BaseModel)
 
 
+codec = get_codec(settings.CACHE_CODEC)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+TAG_PREFIX = "tag:"
+
+# deletes every key registered under the given tag sets and the sets
+# themselves, then broadcasts the deleted keys to the other workers' L1
+INVALIDATE_TAGS_SCRIPT = """
+local keys = {}
+for _, tag in ipairs(KEYS) do
+    for _, key in ipairs(redis.call('SMEMBERS', tag)) do
+        keys[#keys + 1] = key
+    end
+end
+for i = 1, #keys, 500 do
+    redis.call('DEL', unpack(keys, i, math.min(i + 499, #keys)))
+end
+redis.call('DEL', unpack(KEYS))
+if #keys > 0 then
+    redis.call('PUBLISH', ARGV[1], cjson.encode(keys))
+end
+return keys
+"""
+
+LOCK_PREFIX = "lock:"
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# misses being loaded by this process, concurrent callers await the same task
+inflight: dict[str, asyncio.Task] = {}
+
+# background refreshes of stale entries, kept apart from inflight since
+# they return nothing a miss could use
+refreshing: dict[str, asyncio.Task] = {}
+
+# delayed invalidations still sleeping, referenced so they aren't collected
+pending_invalidations: set[asyncio.Task] = set()
+
+ENTRY_MAGIC = b"\x1es"
+ENTRY_HEADER = struct.Struct(">dd")
+
+local_cache: LocalCache | None = (
+    LocalCache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_MAX_BYTES)
+    if settings.CACHE_L1_ENABLED
+    else None
+)
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    async def get_connection(self, command_name, *keys, **options):
+        start = perf_counter()
+        try:
+            connection = await super().get_connection(
+                command_name, *keys, **options
+            )
+        except ConnectionError:
+            metrics.incr("cache.pool.timeouts")
+            raise
+        metrics.incr("cache.pool.checkouts")
+        metrics.observe("cache.pool.wait_seconds", perf_counter() - start)
+        return connection
+
+    def in_use(self) -> int:
+        return len(self._in_use_connections)
+
+
+cache_pool: InstrumentedConnectionPool | None = None
+
+metrics.gauge(
+    "cache.pool.in_use", lambda: cache_pool.in_use() if cache_pool else 0
+)
+metrics.gauge(
+    "cache.pool.max_connections",
+    lambda: cache_pool.max_connections if cache_pool else 0,
+)
+
+
+def create_cache_pool() -> InstrumentedConnectionPool:
+    return InstrumentedConnectionPool.from_url(
+        settings.redis_dsn,
+        max_connections=settings.CACHE_POOL_MAX_CONNECTIONS,
+        timeout=settings.CACHE_POOL_TIMEOUT,
+        socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.CACHE_SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=settings.CACHE_HEALTH_CHECK_INTERVAL,
+        protocol=settings.CACHE_PROTOCOL,
+    )
+
+
+def get_cache_pool() -> InstrumentedConnectionPool:
+    global cache_pool
+
+    if cache_pool is None:
+        cache_pool = create_cache_pool()
+
+    return cache_pool
+
+
+async def close_cache_pool() -> None:
+    global cache_pool
+
+    if cache_pool is not None:
+        await cache_pool.disconnect()
+        cache_pool = None
+
+
 async def get_cache_connection() -> AsyncGenerator[Redis, None]:
-    pool = ConnectionPool.from_url(settings.redis_dsn)
-    client = Redis(connection_pool=pool)
+    client = Redis(connection_pool=get_cache_pool())
     try:
         yield client
     finally:
-        await client.close()
+        await client.aclose()
+
+
+def invalidate_tags_later(delay: float, *tags: str) -> None:
+    # a replica lagging behind the write can refill the cache with the old
+    # rows right after the first invalidation, drop them once it caught up
+    async def invalidate() -> None:
+        await asyncio.sleep(delay)
+        client = Redis(connection_pool=get_cache_pool())
+        try:
+            await Cache(client).invalidate_tags(*tags)
+        except (CacheError, GenericError):
+            metrics.incr("cache.invalidation_errors")
+        finally:
+            await client.aclose()
+
+    task = asyncio.create_task(invalidate())
+    pending_invalidations.add(task)
+    task.add_done_callback(pending_invalidations.discard)
+
+
+async def listen_cache_invalidations(cache: LocalCache) -> None:
+    client = Redis.from_url(
+        settings.redis_dsn,
+        socket_connect_timeout=settings.CACHE_SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=settings.CACHE_HEALTH_CHECK_INTERVAL,
+        protocol=settings.CACHE_PROTOCOL,
+    )
+    try:
+        while True:
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    # anything published while we were not subscribed is lost
+                    cache.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            cache.delete(*json.loads(message["data"]))
+            except (ConnectionError, TimeoutError):
+                metrics.incr("cache.l1.listener_reconnects")
+                await asyncio.sleep(1)
+    finally:
+        await client.aclose()
+
+
+# model each namespace decodes into, its schema hash versions the keyspace
+CACHE_MODELS: dict[str, type[BaseModel]] = {
+    "post": PostOut,
+    "posts": PostSummaryOut,
+    "search": PostSearchOut,
+    "categories": CategoryCountOut,
+    "comment": CommentOut,
+    "user": UserOut,
+}
+
+
+@lru_cache
+def schema_fingerprint(model: type[BaseModel]) -> str:
+    schema = json.dumps(model.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode()).hexdigest()[:8]
+
+
+def versioned_key(key: str) -> str:
+    namespace, sep, rest = key.partition(":")
+
+    if "@" in namespace or (model := CACHE_MODELS.get(namespace)) is None:
+        return key
+
+    return f"{namespace}@{schema_fingerprint(model)}{sep}{rest}"
+
+
+def page_key(key: str, params: KeysetParams) -> str:
+    return f"{key}:page:{params.cursor or ''}:{params.size}:{params.total}"
+
+
+def key_namespace(key: str) -> str:
+    return key.split(":", 1)[0].split("@", 1)[0]
+
+
+def ttl_policy(key: str) -> TTLPolicy:
+    return settings.CACHE_TTL.get(
+        key_namespace(key), settings.CACHE_TTL_DEFAULT
+    )
+
+
+def cacheable(key: str) -> bool:
+    return ttl_policy(key).ttl is not None
+
+
+def cache_ttl(key: str) -> int | None:
+    policy = ttl_policy(key)
+
+    if policy.ttl is None:
+        return None
+
+    return policy.ttl + round(random.uniform(0, policy.ttl * policy.jitter))
+
+
+def l1_ttl(key: str) -> float:
+    ttl = settings.CACHE_L1_TTL.get(
+        key_namespace(key), settings.CACHE_L1_DEFAULT_TTL
+    )
+    return min(ttl, ttl_policy(key).ttl or 0)
+
+
+def compression_policy(key: str) -> CompressionPolicy:
+    return settings.CACHE_COMPRESSION.get(
+        key_namespace(key), settings.CACHE_COMPRESSION_DEFAULT
+    )
+
+
+def pack(key: str, encoded: bytes) -> bytes:
+    policy = compression_policy(key)
+
+    if policy.threshold is None or len(encoded) < policy.threshold:
+        return encoded
+
+    start = thread_time()
+    compressed = compress(encoded, policy.level)
+    metrics.observe("cache.compression.cpu_seconds", thread_time() - start)
+
+    if len(compressed) >= len(encoded):
+        metrics.incr("cache.compression.skipped")
+        return encoded
+
+    metrics.observe("cache.compression.ratio", len(compressed) / len(encoded))
+    return compressed
+
+
+def unpack(payload: bytes | None) -> bytes | None:
+    if payload is None or not is_compressed(payload):
+        return payload
+
+    start = thread_time()
+    decompressed = decompress(payload)
+    metrics.observe("cache.decompression.cpu_seconds", thread_time() - start)
+    return decompressed
+
+
+@dataclass(slots=True)
+class EntryMeta:
+    soft_expires_at: float
+    delta: float
+
+    def should_refresh(self, beta: float) -> bool:
+        # XFetch: refresh early with a probability that grows as the soft
+        # expiry gets closer and with how long the value took to compute
+        now = time()
+        if now >= self.soft_expires_at:
+            return True
+        jitter = -self.delta * beta * math.log(1.0 - random.random())
+        return now + jitter >= self.soft_expires_at
+
+
+def soft_ttl(key: str) -> float:
+    hard_ttl = ttl_policy(key).ttl or 0
+    ttl = settings.CACHE_SOFT_TTL.get(key_namespace(key), hard_ttl)
+    return min(ttl, hard_ttl)
+
+
+def wrap_entry(payload: bytes, meta: EntryMeta) -> bytes:
+    return (
+        ENTRY_MAGIC
+        + ENTRY_HEADER.pack(meta.soft_expires_at, meta.delta)
+        + payload
+    )
+
+
+def unwrap_entry(
+    payload: bytes | None,
+) -> tuple[EntryMeta | None, bytes | None]:
+    if payload is None or payload[:2] != ENTRY_MAGIC:
+        return None, payload
+
+    header_end = len(ENTRY_MAGIC) + ENTRY_HEADER.size
+    soft_expires_at, delta = ENTRY_HEADER.unpack(
+        payload[len(ENTRY_MAGIC) : header_end]
+    )
+    return EntryMeta(soft_expires_at, delta), payload[header_end:]
+
+
+def queue_set(
+    pipe: Pipeline, key: str, payload: bytes, tags: Iterable[str] = ()
+) -> None:
+    ttl = cache_ttl(key)
+    sliding = ttl_policy(key).sliding
+
+    pipe.set(key, payload, ex=ttl)
+    for tag in tags:
+        pipe.sadd(f"{TAG_PREFIX}{tag}", key)
+        # a sliding key can outlive any TTL given here, so its tag sets
+        # are kept until invalidated
+        if sliding:
+            pipe.persist(f"{TAG_PREFIX}{tag}")
+        else:
+            pipe.expire(f"{TAG_PREFIX}{tag}", ttl, nx=True)
+            pipe.expire(f"{TAG_PREFIX}{tag}", ttl, gt=True)
 
 
 class Cache:
-    def __init__(self, cache_conn: Redis):
+    def __init__(self, cache_conn: Redis, l1: LocalCache | None = None):
         self.cache_conn = cache_conn
+        self.l1 = l1 if l1 is not None else local_cache
+
+    async def add(
+        self,
+        key: str,
+        value: Type[T] | list[T],
+        tags: Iterable[str] = (),
+        meta: EntryMeta | None = None,
+    ) -> None:
+        key = versioned_key(key)
+        tags = list(tags)
+
+        if not cacheable(key):
+            return
 
-    async def add(self, key: str, value: Type[T] | list[T]) -> None:
         try:
-            await self.cache_conn.set(key, encode_pydantic_model(value), ex=360)
+            encoded = encode_value(value, codec)
+            payload = pack(key, encoded)
+
+            if meta is not None:
+                payload = wrap_entry(payload, meta)
+
+            if tags:
+                async with self.cache_conn.pipeline(transaction=False) as pipe:
+                    queue_set(pipe, key, payload, tags)
+                    await pipe.execute()
+            else:
+                await self.cache_conn.set(key, payload, ex=cache_ttl(key))
         except (ConnectionError, TimeoutError, AuthenticationError, DataError) as e:
             raise CacheError(e.__class__.__name__)
         except TypeError:
@@ -40,14 +402,371 @@ class Cache:
         except Exception as e:
             raise GenericError(e.__class__.__name__)
 
-    async def get(self, key: str, decode_model: Type[T]) -> T | list[T] | None:
+        if self.l1 is not None:
+            self.l1.set(key, value, len(encoded), l1_ttl(key))
+
+    async def get(
+        self,
+        key: str,
+        decode_model: Type[T],
+        on_stale: Callable[[], None] | None = None,
+    ) -> T | list[T] | None:
+        key = versioned_key(key)
+
+        if not cacheable(key):
+            return None
+
+        if self.l1 is not None:
+            if (models := self.l1.get(key)) is not None:
+                metrics.incr("cache.l1.hits")
+                return models
+            metrics.incr("cache.l1.misses")
+
         try:
-            cache_string = await self.cache_conn.get(key)
+            if ttl_policy(key).sliding:
+                raw = await self.cache_conn.getex(key, ex=cache_ttl(key))
+            else:
+                raw = await self.cache_conn.get(key)
+
+            meta, payload = unwrap_entry(raw)
+            cache_string = unpack(payload)
 
-            models = decode_pydantic_model(cache_string, decode_model)
+            models = decode_value(cache_string, decode_model)
+        except (ConnectionError, TimeoutError, AuthenticationError, DataError) as e:
+            raise CacheError(e.__class__.__name__)
+        except Exception as e:
+            raise GenericError(e.__class__.__name__)
 
+        if models is None:
             return models
+
+        if self.l1 is not None:
+            self.l1.set(key, models, len(cache_string), l1_ttl(key))
+
+        if (
+            on_stale is not None
+            and meta is not None
+            and meta.should_refresh(settings.CACHE_XFETCH_BETA)
+        ):
+            metrics.incr("cache.refresh_triggered")
+            on_stale()
+
+        return models
+
+    async def get_many(
+        self, keys: Iterable[str], decode_model: Type[T]
+    ) -> tuple[dict[str, T | list[T]], list[str]]:
+        # results are keyed by the caller's keys, not the versioned ones
+        names = {versioned_key(key): key for key in keys}
+        keys = [key for key in names if cacheable(key)]
+        skipped = [names[key] for key in names if not cacheable(key)]
+        found: dict[str, T | list[T]] = {}
+
+        if self.l1 is not None:
+            for key in keys:
+                if (models := self.l1.get(key)) is not None:
+                    found[key] = models
+            metrics.incr("cache.l1.hits", len(found))
+            metrics.incr("cache.l1.misses", len(keys) - len(found))
+
+        if not (pending := [key for key in keys if key not in found]):
+            return {
+                names[key]: models for key, models in found.items()
+            }, skipped
+
+        try:
+            payloads = await self.cache_conn.mget(pending)
+
+            decoded = []
+            for key, payload in zip(pending, payloads):
+                cache_string = unpack(unwrap_entry(payload)[1])
+                models = decode_value(cache_string, decode_model)
+                decoded.append((key, cache_string, models))
+
+            if sliding := [
+                key
+                for key, _, models in decoded
+                if models is not None and ttl_policy(key).sliding
+            ]:
+                async with self.cache_conn.pipeline(transaction=False) as pipe:
+                    for key in sliding:
+                        pipe.expire(key, cache_ttl(key))
+                    await pipe.execute()
+        except (ConnectionError, TimeoutError, AuthenticationError, DataError) as e:
+            raise CacheError(e.__class__.__name__)
+        except Exception as e:
+            raise GenericError(e.__class__.__name__)
+
+        misses = []
+        for key, cache_string, models in decoded:
+            if models is None:
+                misses.append(key)
+                continue
+
+            found[key] = models
+            if self.l1 is not None:
+                self.l1.set(key, models, len(cache_string), l1_ttl(key))
+
+        metrics.incr("cache.batch.hits", len(found))
+        metrics.incr("cache.batch.misses", len(misses))
+
+        return (
+            {names[key]: models for key, models in found.items()},
+            [names[key] for key in misses] + skipped,
+        )
+
+    async def add_many(
+        self,
+        values: dict[str, T | list[T]],
+        tags: Iterable[str] | Callable[[T | list[T]], Iterable[str]] = (),
+    ) -> None:
+        if not values:
+            return
+
+        values = {
+            versioned_key(key): value
+            for key, value in values.items()
+            if cacheable(key)
+        }
+
+        if not values:
+            return
+
+        try:
+            encoded = {
+                key: encode_value(value, codec)
+                for key, value in values.items()
+            }
+
+            async with self.cache_conn.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    queue_set(
+                        pipe,
+                        key,
+                        pack(key, encoded[key]),
+                        tags(value) if callable(tags) else tags,
+                    )
+                await pipe.execute()
+        except (ConnectionError, TimeoutError, AuthenticationError, DataError) as e:
+            raise CacheError(e.__class__.__name__)
+        except TypeError:
+            raise EncodingError
+        except Exception as e:
+            raise GenericError(e.__class__.__name__)
+
+        if self.l1 is not None:
+            for key, value in values.items():
+                self.l1.set(key, value, len(encoded[key]), l1_ttl(key))
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        await self.delete(*dict.fromkeys(keys))
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+
+        keys = tuple(versioned_key(key) for key in keys)
+
+        if self.l1 is not None:
+            self.l1.delete(*keys)
+
+        try:
+            async with self.cache_conn.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                pipe.publish(INVALIDATION_CHANNEL, json.dumps(keys))
+                await pipe.execute()
+        except (ConnectionError, TimeoutError, AuthenticationError, DataError) as e:
+            raise CacheError(e.__class__.__name__)
+        except Exception as e:
+            raise GenericError(e.__class__.__name__)
+
+    async def invalidate_tags(self, *tags: str) -> list[str]:
+        if not tags:
+            return []
+
+        try:
+            script = self.cache_conn.register_script(INVALIDATE_TAGS_SCRIPT)
+            keys = await script(
+                keys=[f"{TAG_PREFIX}{tag}" for tag in tags],
+                args=[INVALIDATION_CHANNEL],
+            )
         except (ConnectionError, TimeoutError, AuthenticationError, DataError) as e:
             raise CacheError(e.__class__.__name__)
         except Exception as e:
             raise GenericError(e.__class__.__name__)
+
+        keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+
+        if self.l1 is not None:
+            self.l1.delete(*keys)
+
+        metrics.incr("cache.invalidated_keys", len(keys))
+
+        return keys
+
+    async def get_or_load(
+        self,
+        key: str,
+        decode_model: Type[T],
+        loader: Callable[[], Awaitable[T | list[T] | None]],
+        tags: Iterable[str] | Callable[[T | list[T]], Iterable[str]] = (),
+        refresh: Callable[[], Awaitable[T | list[T] | None]] | None = None,
+    ) -> T | list[T] | None:
+        if not cacheable(versioned_key(key)):
+            return await loader()
+
+        if refresh is None:
+            models = await self.get(key, decode_model)
+        else:
+            models = await self.get(
+                key,
+                decode_model,
+                lambda: self.schedule_refresh(key, refresh, tags),
+            )
+
+        if models is not None:
+            return models
+
+        if (task := inflight.get(key)) is not None:
+            metrics.incr("cache.coalesced.local")
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(
+            self.load(key, decode_model, loader, tags, refresh is not None)
+        )
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def get_or_load_page(
+        self,
+        key: str,
+        decode_model: Type[T],
+        params: KeysetParams,
+        loader: Callable[[], Awaitable[CursorPage[T]]],
+        tags: Iterable[str] | Callable[[CursorPage[T]], Iterable[str]] = (),
+        refresh: Callable[[], Awaitable[CursorPage[T]]] | None = None,
+    ) -> CursorPage[T]:
+        if params.depth >= settings.CACHE_MAX_PAGE:
+            metrics.incr("cache.pages.uncached")
+            return await loader()
+
+        return await self.get_or_load(
+            page_key(key, params),
+            CursorPage[decode_model],
+            loader,
+            tags,
+            refresh,
+        )
+
+    async def load(
+        self,
+        key: str,
+        decode_model: Type[T],
+        loader: Callable[[], Awaitable[T | list[T] | None]],
+        tags: Iterable[str] | Callable[[T | list[T]], Iterable[str]] = (),
+        revalidate: bool = False,
+    ) -> T | list[T] | None:
+        lock_key = f"{LOCK_PREFIX}{versioned_key(key)}"
+        token = uuid4().hex
+
+        if not (locked := await self.acquire_lock(lock_key, token)):
+            metrics.incr("cache.coalesced.remote")
+
+            # another process is loading it, wait for its write
+            deadline = monotonic() + settings.CACHE_LOCK_WAIT
+            while monotonic() < deadline:
+                await asyncio.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+                if (models := await self.get(key, decode_model)) is not None:
+                    return models
+
+            metrics.incr("cache.lock_wait_timeouts")
+
+        try:
+            return await self.store(key, loader, tags, revalidate)
+        finally:
+            if locked:
+                await self.release_lock(lock_key, token)
+
+    async def store(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T | list[T] | None]],
+        tags: Iterable[str] | Callable[[T | list[T]], Iterable[str]] = (),
+        revalidate: bool = False,
+    ) -> T | list[T] | None:
+        start = time()
+        models = await loader()
+        loaded_at = time()
+
+        if models is None:
+            return models
+
+        meta = (
+            EntryMeta(loaded_at + soft_ttl(key), loaded_at - start)
+            if revalidate
+            else None
+        )
+        tags = tags(models) if callable(tags) else tags
+
+        if meta is None:
+            await self.add(key, models, tags)
+        else:
+            await self.add(key, models, tags, meta)
+
+        return models
+
+    def schedule_refresh(
+        self,
+        key: str,
+        refresh: Callable[[], Awaitable[T | list[T] | None]],
+        tags: Iterable[str] | Callable[[T | list[T]], Iterable[str]] = (),
+    ) -> None:
+        if key in refreshing:
+            return
+
+        task = asyncio.ensure_future(self.refresh(key, refresh, tags))
+        refreshing[key] = task
+        task.add_done_callback(lambda _: refreshing.pop(key, None))
+
+    async def refresh(
+        self,
+        key: str,
+        refresh: Callable[[], Awaitable[T | list[T] | None]],
+        tags: Iterable[str] | Callable[[T | list[T]], Iterable[str]] = (),
+    ) -> None:
+        lock_key = f"{LOCK_PREFIX}{versioned_key(key)}"
+        token = uuid4().hex
+
+        # runs after the response was sent, failures only cost freshness
+        try:
+            if not await self.acquire_lock(lock_key, token):
+                return
+
+            try:
+                if await self.store(key, refresh, tags, True) is None:
+                    await self.delete(key)
+                metrics.incr("cache.refreshes")
+            finally:
+                await self.release_lock(lock_key, token)
+        except Exception:
+            metrics.incr("cache.refresh_errors")
+
+    async def acquire_lock(self, lock_key: str, token: str) -> bool:
+        try:
+            return bool(
+                await self.cache_conn.set(
+                    lock_key, token, nx=True, px=settings.CACHE_LOCK_TTL_MS
+                )
+            )
+        except (ConnectionError, TimeoutError, AuthenticationError, DataError) as e:
+            raise CacheError(e.__class__.__name__)
+
+    async def release_lock(self, lock_key: str, token: str) -> None:
+        try:
+            script = self.cache_conn.register_script(RELEASE_LOCK_SCRIPT)
+            await script(keys=[lock_key], args=[token])
+        except (ConnectionError, TimeoutError, AuthenticationError, DataError):
+            # the lock expires by itself
+            metrics.incr("cache.lock_release_errors")
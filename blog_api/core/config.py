@@ -1,6 +1,22 @@
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from os import getenv
 from functools import lru_cache
+from typing import Literal
+
+
+class CompressionPolicy(BaseModel):
+    threshold: int | None = 4096
+    level: int = 6
+
+
+class TTLPolicy(BaseModel):
+    # None keeps the namespace out of the cache entirely
+    ttl: int | None = 360
+    # extra seconds drawn from [0, ttl * jitter] so keys don't expire together
+    jitter: float = 0.1
+    # reset the TTL on every Redis hit
+    sliding: bool = False
 
 
 class Settings(BaseSettings):
@@ -14,9 +30,82 @@ class Settings(BaseSettings):
     DB_HOST: str
     DB_PORT: str
     DB_NAME: str
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # 0 disables asyncpg prepared statements, required behind pgbouncer
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int | None = 30_000
+    DB_APPLICATION_NAME: str = "blog_api"
+    DB_REPLICA_DSNS: list[str] = []
+    DB_REPLICA_CHECK_INTERVAL: float = 5
+    DB_REPLICA_CHECK_TIMEOUT: float = 2
+    # replicas further behind are skipped; also the read-your-writes window
+    DB_REPLICA_MAX_LAG: float = 5
+    # statements slower than this go to the slow-query log, None disables it
+    DB_SLOW_QUERY_MS: float | None = 500
+    DB_SLOW_QUERY_LOG_SIZE: int = 100
+    # dev only: slow SELECTs run again under EXPLAIN ANALYZE for their plan
+    DB_EXPLAIN_SLOW_QUERIES: bool = False
+    # rows per multi-row INSERT, each chunk commits on its own
+    BULK_CHUNK_SIZE: int = 500
+    BULK_MAX_ITEMS: int = 1000
     CACHE_PASSWORD: str
     CACHE_HOST: str
     CACHE_PORT: str
+    CACHE_POOL_MAX_CONNECTIONS: int = 50
+    CACHE_POOL_TIMEOUT: float = 5
+    CACHE_SOCKET_TIMEOUT: float = 2
+    CACHE_SOCKET_CONNECT_TIMEOUT: float = 2
+    CACHE_HEALTH_CHECK_INTERVAL: int = 30
+    CACHE_PROTOCOL: Literal[2, 3] = 2
+    CACHE_CODEC: Literal["json", "pydantic"] = "pydantic"
+    CACHE_TTL_DEFAULT: TTLPolicy = TTLPolicy()
+    CACHE_TTL: dict[str, TTLPolicy] = {
+        "user": TTLPolicy(ttl=600),
+        "post": TTLPolicy(ttl=600),
+        "posts": TTLPolicy(ttl=300),
+        # identical searches in a burst share one query, not the long tail
+        "search": TTLPolicy(ttl=30),
+        "categories": TTLPolicy(ttl=300),
+        "comment": TTLPolicy(ttl=180),
+    }
+    CACHE_COMPRESSION_DEFAULT: CompressionPolicy = CompressionPolicy()
+    CACHE_COMPRESSION: dict[str, CompressionPolicy] = {
+        "user": CompressionPolicy(threshold=None),
+        "post": CompressionPolicy(threshold=8192, level=6),
+        "posts": CompressionPolicy(threshold=4096, level=6),
+        "comment": CompressionPolicy(threshold=4096, level=6),
+    }
+    CACHE_LOCK_TTL_MS: int = 10_000
+    CACHE_LOCK_WAIT: float = 5
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05
+    # only read for keys loaded with a refresh loader, the rest keep ttl
+    CACHE_SOFT_TTL: dict[str, float] = {
+        "posts": 240,
+        "search": 20,
+        "categories": 240,
+        "comment": 120,
+        "user": 300,
+    }
+    CACHE_XFETCH_BETA: float = 1.0
+    # deeper pages are rare, serving them uncached keeps tag sets small
+    CACHE_MAX_PAGE: int = 5
+    CACHE_L1_ENABLED: bool = False
+    CACHE_L1_MAX_ENTRIES: int = 1024
+    # charged with the uncompressed encoded entry, whatever Redis stores
+    CACHE_L1_MAX_BYTES: int = 16 * 1024 * 1024
+    CACHE_L1_DEFAULT_TTL: float = 10
+    CACHE_L1_TTL: dict[str, float] = {
+        "user": 30,
+        "post": 30,
+        "posts": 15,
+        "search": 5,
+        "categories": 30,
+        "comment": 15,
+    }
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
@@ -28,7 +117,7 @@ class Settings(BaseSettings):
 
     @property
     def redis_dsn(self) -> str:
-        return f"redis://:{self.CACHE_PASSWORD}@{self.CACHE_HOST}:{self.API_PORT}/0"
+        return f"redis://:{self.CACHE_PASSWORD}@{self.CACHE_HOST}:{self.CACHE_PORT}/0"
 
     model_config = SettingsConfigDict(
         env_file=".env.test" if getenv("PYTEST_CURRENT_TEST") else ".env",
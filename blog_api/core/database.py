@@ -1,24 +1,213 @@
+import asyncio
+import random
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from time import perf_counter, time
+from typing import Any, AsyncGenerator
 
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     create_async_engine,
 )
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    PoolProxiedConnection,
+    QueuePool,
+)
 
-from blog_api.core.config import get_settings
+from blog_api.core.config import Settings, get_settings
+from blog_api.core.metrics import metrics
+from blog_api.core.profiling import instrument_queries
 
 settings = get_settings()
 
-engine: AsyncEngine = create_async_engine(settings.postgres_dsn)
+# set on responses to writes, reads carrying it stay on the primary
+PRIMARY_UNTIL_COOKIE = "db_primary_until"
+
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(
+        extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0
+    )
+END
+"""
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def connect(self) -> PoolProxiedConnection:
+        # the queue wait plus the pre-ping, what a request waits for
+        start = perf_counter()
+        try:
+            connection = super().connect()
+        except TimeoutError:
+            metrics.incr("db.pool.timeouts")
+            raise
+        metrics.observe("db.pool.wait_seconds", perf_counter() - start)
+        return connection
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+    if settings.DB_STATEMENT_TIMEOUT_MS is not None:
+        server_settings["statement_timeout"] = str(
+            settings.DB_STATEMENT_TIMEOUT_MS
+        )
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            # asyncpg's own cache and SQLAlchemy's adapter cache
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    }
+
+
+def queue_pool(engine: AsyncEngine) -> QueuePool:
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        raise TypeError(f"{type(pool).__name__} keeps no checkout counts")
+    return pool
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    # registered on the engine so they survive pool recreation on dispose()
+    target = engine.sync_engine
+
+    for name in ("connect", "checkout", "checkin", "invalidate"):
+        event.listen(
+            target,
+            name,
+            lambda *args, counter=f"db.pool.{name}s": metrics.incr(counter),
+        )
+
+
+engine: AsyncEngine = create_async_engine(
+    settings.postgres_dsn, **engine_options(settings)
+)
+instrument_pool(engine)
+instrument_queries(engine)
+
+metrics.gauge("db.pool.size", lambda: queue_pool(engine).size())
+metrics.gauge("db.pool.checked_out", lambda: queue_pool(engine).checkedout())
+metrics.gauge("db.pool.overflow", lambda: queue_pool(engine).overflow())
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag = 0.0
+
+        event.listen(engine.sync_engine, "handle_error", self.on_error)
+
+    def on_error(self, context) -> None:
+        # don't wait for the next health check once connections start dying
+        if context.is_disconnect:
+            self.healthy = False
+
+    def checked_out(self) -> int:
+        return queue_pool(self.engine).checkedout()
+
+
+class ReplicaSet:
+    def __init__(self, primary: AsyncEngine, dsns: list[str]):
+        self.primary = primary
+        # replica pools stay out of the primary's db.pool.* metrics
+        options = {
+            **engine_options(settings),
+            "poolclass": AsyncAdaptedQueuePool,
+        }
+        self.replicas = [
+            Replica(f"replica{i}", create_async_engine(dsn, **options))
+            for i, dsn in enumerate(dsns)
+        ]
+
+    def pick(self) -> AsyncEngine:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+
+        if not healthy:
+            if self.replicas:
+                metrics.incr("db.replica.fallbacks")
+            return self.primary
+
+        # least busy pool first, random among ties so idle replicas share
+        replica = min(
+            healthy, key=lambda r: (r.checked_out(), random.random())
+        )
+        metrics.incr(f"db.replica.{replica.name}.reads")
+        return replica.engine
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            async with asyncio.timeout(settings.DB_REPLICA_CHECK_TIMEOUT):
+                async with replica.engine.connect() as conn:
+                    result = await conn.execute(text(REPLICA_LAG_QUERY))
+                    replica.lag = float(result.scalar_one())
+        except Exception:
+            metrics.incr(f"db.replica.{replica.name}.check_errors")
+            replica.healthy = False
+            return
+
+        replica.healthy = replica.lag <= settings.DB_REPLICA_MAX_LAG
+
+    async def monitor(self) -> None:
+        while True:
+            await asyncio.gather(
+                *(self.check(replica) for replica in self.replicas)
+            )
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_INTERVAL)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replicas = ReplicaSet(engine, settings.DB_REPLICA_DSNS)
+
+for replica in replicas.replicas:
+    instrument_queries(replica.engine)
+    metrics.gauge(
+        f"db.replica.{replica.name}.healthy",
+        lambda replica=replica: int(replica.healthy),
+    )
+    metrics.gauge(
+        f"db.replica.{replica.name}.lag_seconds",
+        lambda replica=replica: replica.lag,
+    )
 
 async_session: AsyncSession = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
+def wrote_recently(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_UNTIL_COOKIE, 0)) > time()
+    except ValueError:
+        return False
+
+
+def read_engine(request: Request | None = None) -> AsyncEngine:
+    if request is not None and wrote_recently(request):
+        metrics.incr("db.replica.read_your_writes")
+        return engine
+
+    return replicas.pick()
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
@@ -28,3 +217,16 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 async def get_context_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+
+
+async def get_read_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    async with async_session(bind=read_engine(request)) as session:
+        yield session
+
+
+@asynccontextmanager
+async def get_context_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session(bind=read_engine()) as session:
+        yield session
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+
+@dataclass(slots=True)
+class LocalEntry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+class LocalCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: OrderedDict[str, LocalEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> Any | None:
+        entry = self.entries.get(key)
+
+        if entry is None:
+            return None
+
+        if entry.expires_at <= monotonic():
+            self.delete(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return entry.value
+
+    def set(self, key: str, value: Any, size: int, ttl: float) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            self.delete(key)
+            return
+
+        self.delete(key)
+        self.entries[key] = LocalEntry(value, size, monotonic() + ttl)
+        self.size += size
+
+        while (
+            len(self.entries) > self.max_entries or self.size > self.max_bytes
+        ):
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            if (entry := self.entries.pop(key, None)) is not None:
+                self.size -= entry.size
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
@@ -0,0 +1,52 @@
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class Summary:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics:
+    def __init__(self):
+        self.counters: dict[str, int] = defaultdict(int)
+        self.summaries: dict[str, Summary] = defaultdict(Summary)
+        self.gauges: dict[str, Callable[[], float]] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        self.summaries[name].observe(value)
+
+    def gauge(self, name: str, func: Callable[[], float]) -> None:
+        self.gauges[name] = func
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "counters": dict(self.counters),
+            "summaries": {
+                name: {**asdict(summary), "avg": summary.avg}
+                for name, summary in self.summaries.items()
+            },
+            "gauges": {name: func() for name, func in self.gauges.items()},
+        }
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.summaries.clear()
+
+
+metrics = Metrics()
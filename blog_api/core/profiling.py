@@ -0,0 +1,167 @@
+import json
+import logging
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from blog_api.core.config import get_settings
+from blog_api.core.metrics import metrics
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+EXPLAIN_SAVEPOINT = "explain_slow_query"
+
+# repository method running the statement, set by BaseRepository
+caller: ContextVar[str | None] = ContextVar("db_caller", default=None)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+
+    def add(self, seconds: float, rows: int) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.rows += rows
+
+
+# totals for the request being served, set by QueryStatsMiddleware
+request_queries: ContextVar[QueryStats | None] = ContextVar(
+    "db_request_queries", default=None
+)
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    caller: str | None
+    duration_ms: float
+    rows: int
+    at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    plan: Any = None
+
+
+class SlowQueryLog:
+    def __init__(self, size: int):
+        self.entries: deque[SlowQuery] = deque(maxlen=size)
+
+    def add(self, entry: SlowQuery) -> None:
+        self.entries.append(entry)
+        metrics.incr("db.slow_queries")
+        logger.warning(
+            "slow query %.1fms rows=%d caller=%s: %s",
+            entry.duration_ms,
+            entry.rows,
+            entry.caller or "-",
+            entry.statement,
+        )
+
+    def recent(self) -> list[SlowQuery]:
+        return list(reversed(self.entries))
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+slow_queries = SlowQueryLog(settings.DB_SLOW_QUERY_LOG_SIZE)
+
+
+def traced(name: str) -> Callable:
+    def decorate(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            # innermost method wins, helpers it calls report under it
+            token = caller.set(name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                caller.reset(token)
+
+        return wrapper
+
+    return decorate
+
+
+def is_explainable(statement: str, many: bool) -> bool:
+    # ANALYZE executes the statement again, writes must never go through it
+    return not many and statement.lstrip()[:6].upper() == "SELECT"
+
+
+def explain(conn, statement: str, parameters: Any) -> Any:
+    # a raw cursor so the EXPLAIN itself is neither timed nor logged, and a
+    # savepoint so a failing EXPLAIN can't abort the caller's transaction
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(EXPLAIN + statement, parameters)
+            plan = cursor.fetchone()[0]
+        except Exception:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            raise
+        cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+    except Exception:
+        metrics.incr("db.explain_errors")
+        return None
+    finally:
+        cursor.close()
+
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def before_cursor_execute(
+    conn, cursor, statement, parameters, context, many
+) -> None:
+    conn.info.setdefault("query_start", []).append(perf_counter())
+
+
+def after_cursor_execute(
+    conn, cursor, statement, parameters, context, many
+) -> None:
+    seconds = perf_counter() - conn.info["query_start"].pop()
+    rows = max(cursor.rowcount, 0)
+    name = caller.get() or "other"
+
+    metrics.observe("db.query.seconds", seconds)
+    metrics.observe(f"db.query.{name}.seconds", seconds)
+    metrics.observe(f"db.query.{name}.rows", rows)
+
+    if (stats := request_queries.get()) is not None:
+        stats.add(seconds, rows)
+
+    threshold = settings.DB_SLOW_QUERY_MS
+    if threshold is None or seconds * 1000 < threshold:
+        return
+
+    entry = SlowQuery(statement, caller.get(), seconds * 1000, rows)
+    if settings.DB_EXPLAIN_SLOW_QUERIES and is_explainable(statement, many):
+        entry.plan = explain(conn, statement, parameters)
+    slow_queries.add(entry)
+
+
+def handle_error(context) -> None:
+    # failed statements never reach after_cursor_execute
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    target = engine.sync_engine
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    event.listen(target, "after_cursor_execute", after_cursor_execute)
+    event.listen(target, "handle_error", handle_error)
@@ -29,24 +29,21 @@ async def get_current_user(
             raise credencial_exception
 
         cache_service = Cache(cache_conn=cache)
+        user_repository = UsersRepository(db)
 
-        user_cache = await cache_service.get(f"user:{user_id}", UserOut)
-
-        if user_cache is not None:
-            return cast(UserOut, user_cache)
+        async def load_user() -> UserOut | None:
+            user = await user_repository.get_user_by_id(user_id)
+            return UserOut(**user.__dict__) if user else None
 
-        user_repository = UsersRepository(db)
-        user = await user_repository.get_user_by_id(user_id)
+        user_out = await cache_service.get_or_load(
+            f"user:{user_id}", UserOut, load_user, tags=[f"user:{user_id}"]
+        )
 
-        if user is None:
+        if user_out is None:
             credencial_exception.detail = "User can't be authenticated"
             raise credencial_exception
 
-        user_out = UserOut(**user.__dict__)
-
-        await cache_service.add(f"user:{user_id}", user_out)
-
-        return user_out
+        return cast(UserOut, user_out)
 
     except TokenError as e:
         credencial_exception.detail = e.message
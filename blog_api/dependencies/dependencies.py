@@ -1,14 +1,18 @@
 from typing import Annotated
 from fastapi import Depends
-from redis import Redis
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from blog_api.core.database import get_session
+from blog_api.core.database import get_read_session, get_session
 from blog_api.core.cache import get_cache_connection
 from blog_api.core.security import oauth2_schema
 
 
 DatabaseDependency: AsyncSession = Annotated[AsyncSession, Depends(get_session)]
 
+ReadDatabaseDependency: AsyncSession = Annotated[
+    AsyncSession, Depends(get_read_session)
+]
+
 CacheDependency: Redis = Annotated[Redis, Depends(get_cache_connection)]
 
 TokenDependency = Annotated[str, Depends(oauth2_schema)]
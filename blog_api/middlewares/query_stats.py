@@ -0,0 +1,24 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from blog_api.core.metrics import metrics
+from blog_api.core.profiling import QueryStats, request_queries
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        stats = QueryStats()
+        token = request_queries.set(stats)
+
+        try:
+            response = await call_next(request)
+        finally:
+            request_queries.reset(token)
+
+        metrics.observe("db.request.queries", stats.count)
+        metrics.observe("db.request.seconds", stats.seconds)
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+        )
+
+        return response
@@ -0,0 +1,34 @@
+from math import ceil
+from time import time
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from blog_api.core.config import get_settings
+from blog_api.core.database import PRIMARY_UNTIL_COOKIE
+
+settings = get_settings()
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        if (
+            settings.DB_REPLICA_DSNS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            # replicas further behind than this are already out of rotation
+            window = settings.DB_REPLICA_MAX_LAG
+            response.set_cookie(
+                PRIMARY_UNTIL_COOKIE,
+                str(time() + window),
+                max_age=ceil(window),
+                httponly=True,
+                samesite="lax",
+            )
+
+        return response
@@ -0,0 +1,24 @@
+from blog_api.migrations import (
+    m0001_initial,
+    m0002_secondary_indexes,
+    m0003_posts_content_hash,
+    m0004_posts_search,
+    m0005_posts_categories_index,
+    m0006_category_counts,
+    m0007_counters,
+    m0008_posts_excerpt,
+)
+from blog_api.migrations.runner import Migration
+
+MIGRATIONS: list[Migration] = [
+    m0001_initial.migration,
+    m0002_secondary_indexes.migration,
+    m0003_posts_content_hash.migration,
+    m0004_posts_search.migration,
+    m0005_posts_categories_index.migration,
+    m0006_category_counts.migration,
+    m0007_counters.migration,
+    m0008_posts_excerpt.migration,
+]
+
+__all__ = ["MIGRATIONS", "Migration"]
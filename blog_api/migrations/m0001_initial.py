@@ -0,0 +1,47 @@
+from blog_api.migrations.runner import Migration
+
+# IF NOT EXISTS lets databases created by the old create_all startup adopt
+# the versioned schema without changes
+migration = Migration(
+    version=1,
+    name="initial",
+    upgrade=(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id UUID NOT NULL PRIMARY KEY,
+            created_at TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP NOT NULL,
+            username VARCHAR(255) NOT NULL UNIQUE,
+            email TEXT NOT NULL UNIQUE,
+            password VARCHAR(60) NOT NULL,
+            role VARCHAR(30) NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS posts (
+            id UUID NOT NULL PRIMARY KEY,
+            created_at TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            categories VARCHAR(30)[],
+            content TEXT NOT NULL UNIQUE,
+            user_id UUID NOT NULL REFERENCES users (id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS comments (
+            id UUID NOT NULL PRIMARY KEY,
+            created_at TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP NOT NULL,
+            content TEXT NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (id),
+            post_id UUID NOT NULL REFERENCES posts (id)
+        )
+        """,
+    ),
+    downgrade=(
+        "DROP TABLE IF EXISTS comments",
+        "DROP TABLE IF EXISTS posts",
+        "DROP TABLE IF EXISTS users",
+    ),
+)
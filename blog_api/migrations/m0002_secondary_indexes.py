@@ -0,0 +1,22 @@
+from blog_api.migrations.runner import ConcurrentIndex, Migration
+
+# (fk, created_at, id) serves both the fk lookups and the keyset ordering of
+# the per-user/per-post listings; built concurrently so writes keep flowing
+INDEXES = tuple(
+    ConcurrentIndex(name, columns)
+    for name, columns in {
+        "ix_posts_created_at": "posts (created_at DESC, id DESC)",
+        "ix_posts_user_id": "posts (user_id, created_at DESC, id DESC)",
+        "ix_comments_post_id": "comments (post_id, created_at DESC, id DESC)",
+        "ix_comments_user_id": "comments (user_id, created_at DESC, id DESC)",
+        "ix_users_created_at": "users (created_at DESC, id DESC)",
+    }.items()
+)
+
+migration = Migration(
+    version=2,
+    name="secondary_indexes",
+    upgrade=INDEXES,
+    downgrade=tuple(index.drop for index in INDEXES),
+    transactional=False,
+)
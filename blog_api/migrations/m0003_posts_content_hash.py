@@ -0,0 +1,52 @@
+from blog_api.migrations.runner import (
+    ConcurrentIndex,
+    Migration,
+    batched_update,
+    set_not_null,
+)
+
+CONTENT_HASH_INDEX = ConcurrentIndex(
+    "ux_posts_content_hash", "posts (content_hash)", unique=True
+)
+
+BACKFILL = batched_update("posts", "content_hash", "md5(content)::uuid")
+NOT_NULL = set_not_null("posts", "content_hash")
+
+
+# the digest is kept by a trigger rather than GENERATED ALWAYS ... STORED:
+# adding a generated column rewrites the table under an exclusive lock,
+# while a plain column can be backfilled in batches with writes flowing.
+# the old unique constraint is dropped only once the digest index is valid.
+migration = Migration(
+    version=3,
+    name="posts_content_hash",
+    upgrade=(
+        "ALTER TABLE posts ADD COLUMN IF NOT EXISTS content_hash UUID",
+        """
+        CREATE OR REPLACE FUNCTION posts_content_hash() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.content_hash := md5(NEW.content)::uuid;
+            RETURN NEW;
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE TRIGGER posts_content_hash
+        BEFORE INSERT OR UPDATE OF content, content_hash ON posts
+        FOR EACH ROW EXECUTE FUNCTION posts_content_hash()
+        """,
+        BACKFILL,
+        CONTENT_HASH_INDEX,
+        "ALTER TABLE posts DROP CONSTRAINT IF EXISTS posts_content_key",
+        NOT_NULL,
+    ),
+    downgrade=(
+        "ALTER TABLE posts ADD CONSTRAINT posts_content_key UNIQUE (content)",
+        CONTENT_HASH_INDEX.drop,
+        "DROP TRIGGER IF EXISTS posts_content_hash ON posts",
+        "DROP FUNCTION IF EXISTS posts_content_hash()",
+        "ALTER TABLE posts DROP COLUMN IF EXISTS content_hash",
+    ),
+    transactional=False,
+)
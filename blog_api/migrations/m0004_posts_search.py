@@ -0,0 +1,49 @@
+from blog_api.migrations.runner import (
+    ConcurrentIndex,
+    Migration,
+    batched_update,
+)
+
+SEARCH_INDEX = ConcurrentIndex("ix_posts_search", "posts USING GIN (search)")
+
+# title matches rank above body matches
+DOCUMENT = """
+setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+setweight(to_tsvector('english', coalesce({row}content, '')), 'B')
+"""
+
+BACKFILL = batched_update("posts", "search", DOCUMENT.format(row=""))
+
+
+# kept by a trigger for the same reason as content_hash in 0003: a
+# GENERATED ... STORED column would rewrite posts under an exclusive lock
+migration = Migration(
+    version=4,
+    name="posts_search",
+    upgrade=(
+        "ALTER TABLE posts ADD COLUMN IF NOT EXISTS search tsvector",
+        f"""
+        CREATE OR REPLACE FUNCTION posts_search() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search := {DOCUMENT.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE TRIGGER posts_search
+        BEFORE INSERT OR UPDATE OF title, content ON posts
+        FOR EACH ROW EXECUTE FUNCTION posts_search()
+        """,
+        BACKFILL,
+        SEARCH_INDEX,
+    ),
+    downgrade=(
+        SEARCH_INDEX.drop,
+        "DROP TRIGGER IF EXISTS posts_search ON posts",
+        "DROP FUNCTION IF EXISTS posts_search()",
+        "ALTER TABLE posts DROP COLUMN IF EXISTS search",
+    ),
+    transactional=False,
+)
@@ -0,0 +1,14 @@
+from blog_api.migrations.runner import ConcurrentIndex, Migration
+
+# serves both `categories @> :wanted` and `categories && :wanted`
+CATEGORIES_INDEX = ConcurrentIndex(
+    "ix_posts_categories", "posts USING GIN (categories)"
+)
+
+migration = Migration(
+    version=5,
+    name="posts_categories_index",
+    upgrade=(CATEGORIES_INDEX,),
+    downgrade=(CATEGORIES_INDEX.drop,),
+    transactional=False,
+)
@@ -0,0 +1,58 @@
+from blog_api.migrations.runner import Migration
+
+# one upsert per post write with the net change per category: unchanged
+# categories write nothing, and rows are touched in category order so two
+# writers never lock the same counters in opposite orders
+APPLY_DELTA = """
+CREATE OR REPLACE FUNCTION posts_category_counts() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO category_counts AS counts (category, posts)
+    SELECT category, sum(delta) FROM (
+        SELECT DISTINCT unnest(OLD.categories) AS category, -1 AS delta
+        UNION ALL
+        SELECT DISTINCT unnest(NEW.categories), 1
+    ) AS deltas
+    GROUP BY category
+    HAVING sum(delta) <> 0
+    ORDER BY category
+    ON CONFLICT (category)
+    DO UPDATE SET posts = counts.posts + excluded.posts;
+    RETURN NULL;
+END
+$$
+"""
+
+# transactional on purpose: CREATE TRIGGER blocks post writes until commit,
+# so the backfill below counts exactly the rows the trigger will not see
+migration = Migration(
+    version=6,
+    name="category_counts",
+    upgrade=(
+        """
+        CREATE TABLE IF NOT EXISTS category_counts (
+            category VARCHAR(30) PRIMARY KEY,
+            posts INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        APPLY_DELTA,
+        """
+        CREATE OR REPLACE TRIGGER posts_category_counts
+        AFTER INSERT OR DELETE OR UPDATE OF categories ON posts
+        FOR EACH ROW EXECUTE FUNCTION posts_category_counts()
+        """,
+        "TRUNCATE category_counts",
+        """
+        INSERT INTO category_counts (category, posts)
+        SELECT category, count(*) FROM (
+            SELECT DISTINCT id, unnest(categories) AS category FROM posts
+        ) AS tagged
+        GROUP BY category
+        """,
+    ),
+    downgrade=(
+        "DROP TRIGGER IF EXISTS posts_category_counts ON posts",
+        "DROP FUNCTION IF EXISTS posts_category_counts()",
+        "DROP TABLE IF EXISTS category_counts",
+    ),
+)
@@ -0,0 +1,24 @@
+from blog_api.migrations.runner import Migration
+
+# constant defaults are catalog-only since PostgreSQL 11, no table rewrite;
+# existing rows start at 0 until `blog recount` fills them in batches
+COUNTERS = {
+    "posts": ("comments_count",),
+    "users": ("posts_count", "comments_count"),
+}
+
+migration = Migration(
+    version=7,
+    name="counters",
+    upgrade=tuple(
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} "
+        "INTEGER NOT NULL DEFAULT 0"
+        for table, columns in COUNTERS.items()
+        for column in columns
+    ),
+    downgrade=tuple(
+        f"ALTER TABLE {table} DROP COLUMN IF EXISTS {column}"
+        for table, columns in COUNTERS.items()
+        for column in columns
+    ),
+)
@@ -0,0 +1,62 @@
+from blog_api.migrations.runner import Migration, batched_update, set_not_null
+
+EXCERPT_LENGTH = 200
+
+# whitespace collapsed, cut on a word boundary; only the head of the
+# content is ever scanned so huge posts cost the same as short ones
+EXCERPT = f"""
+CREATE OR REPLACE FUNCTION post_excerpt(content TEXT) RETURNS TEXT
+LANGUAGE plpgsql IMMUTABLE AS $$
+DECLARE
+    excerpt TEXT := btrim(regexp_replace(
+        left(content, {EXCERPT_LENGTH * 4}), '\\s+', ' ', 'g'
+    ));
+BEGIN
+    IF char_length(excerpt) <= {EXCERPT_LENGTH}
+        AND char_length(content) <= {EXCERPT_LENGTH * 4} THEN
+        RETURN excerpt;
+    END IF;
+    RETURN regexp_replace(
+        left(excerpt, {EXCERPT_LENGTH}), '\\s+\\S*$', ''
+    ) || '…';
+END
+$$
+"""
+
+BACKFILL = batched_update("posts", "excerpt", "post_excerpt(content)")
+NOT_NULL = set_not_null("posts", "excerpt")
+
+
+# same shape as 0003: trigger, batched backfill, then NOT NULL through a
+# validated check so listings can rely on the column
+migration = Migration(
+    version=8,
+    name="posts_excerpt",
+    upgrade=(
+        "ALTER TABLE posts ADD COLUMN IF NOT EXISTS excerpt TEXT",
+        EXCERPT,
+        """
+        CREATE OR REPLACE FUNCTION posts_excerpt() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.excerpt := post_excerpt(NEW.content);
+            RETURN NEW;
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE TRIGGER posts_excerpt
+        BEFORE INSERT OR UPDATE OF content, excerpt ON posts
+        FOR EACH ROW EXECUTE FUNCTION posts_excerpt()
+        """,
+        BACKFILL,
+        NOT_NULL,
+    ),
+    downgrade=(
+        "DROP TRIGGER IF EXISTS posts_excerpt ON posts",
+        "DROP FUNCTION IF EXISTS posts_excerpt()",
+        "DROP FUNCTION IF EXISTS post_excerpt(TEXT)",
+        "ALTER TABLE posts DROP COLUMN IF EXISTS excerpt",
+    ),
+    transactional=False,
+)
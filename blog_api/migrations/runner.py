@@ -0,0 +1,236 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncGenerator, Awaitable, Callable, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from blog_api.contrib.errors import SchemaVersionError
+
+# arbitrary key shared by every process running migrations
+MIGRATION_LOCK_ID = 7_301_240_513
+
+BACKFILL_BATCH_SIZE = 5_000
+BACKFILL_RETRY_SECONDS = 0.5
+
+VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT now()
+)
+"""
+
+# raw SQL, or a coroutine for steps that need a loop such as batched backfills
+Step = str | Callable[[AsyncConnection], Awaitable[None]]
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Sequence[Step]
+    downgrade: Sequence[Step]
+    # CREATE/DROP INDEX CONCURRENTLY can not run inside a transaction block
+    transactional: bool = True
+
+
+INDEX_VALID = """
+SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ConcurrentIndex:
+    name: str
+    definition: str
+    unique: bool = False
+
+    @property
+    def create(self) -> str:
+        unique = "UNIQUE " if self.unique else ""
+        return (
+            f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {self.name} "
+            f"ON {self.definition}"
+        )
+
+    @property
+    def drop(self) -> str:
+        return f"DROP INDEX CONCURRENTLY IF EXISTS {self.name}"
+
+    async def __call__(self, conn: AsyncConnection) -> None:
+        # a failed CONCURRENTLY build leaves an INVALID index under the same
+        # name, IF NOT EXISTS alone would skip rebuilding it on every re-run
+        result = await conn.execute(text(INDEX_VALID), {"name": self.name})
+        if result.scalar() is False:
+            await conn.exec_driver_sql(self.drop)
+        await conn.exec_driver_sql(self.create)
+
+
+def batched_update(
+    table: str, column: str, value: str, batch_size: int = BACKFILL_BATCH_SIZE
+) -> Step:
+    update = (
+        f"UPDATE {table} SET {column} = {value} WHERE id IN ("
+        f"SELECT id FROM {table} WHERE {column} IS NULL "
+        f"LIMIT {batch_size} FOR UPDATE SKIP LOCKED)"
+    )
+    pending = f"SELECT EXISTS (SELECT 1 FROM {table} WHERE {column} IS NULL)"
+
+    async def backfill(conn: AsyncConnection) -> None:
+        # autocommit connection: every batch is its own short transaction
+        while True:
+            result = await conn.exec_driver_sql(update)
+            if result.rowcount:
+                continue
+
+            # SKIP LOCKED passes over rows other writers hold: an empty batch
+            # is the end only once no row is left without the value
+            result = await conn.exec_driver_sql(pending)
+            if not result.scalar():
+                return
+            await asyncio.sleep(BACKFILL_RETRY_SECONDS)
+
+    return backfill
+
+
+def set_not_null(table: str, column: str) -> Step:
+    check = f"{table}_{column}_set"
+    # NOT NULL through a validated check skips the full-table scan lock
+    steps = (
+        f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check}",
+        f"ALTER TABLE {table} ADD CONSTRAINT {check} "
+        f"CHECK ({column} IS NOT NULL) NOT VALID",
+        f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}",
+        f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL",
+        f"ALTER TABLE {table} DROP CONSTRAINT {check}",
+    )
+
+    async def not_null(conn: AsyncConnection) -> None:
+        await run_steps(conn, steps)
+
+    return not_null
+
+
+def head(migrations: Sequence[Migration]) -> int:
+    return max((m.version for m in migrations), default=0)
+
+
+def check_order(migrations: Sequence[Migration]) -> None:
+    versions = [m.version for m in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise ValueError(f"Migration versions must be 1..n, got {versions}")
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    result = await conn.execute(text("SELECT to_regclass('schema_version')"))
+    if result.scalar() is None:
+        return 0
+
+    result = await conn.execute(
+        text("SELECT coalesce(max(version), 0) FROM schema_version")
+    )
+    return result.scalar_one()
+
+
+async def verify(
+    conn: AsyncConnection, migrations: Sequence[Migration]
+) -> int:
+    version, expected = await current_version(conn), head(migrations)
+    if version != expected:
+        raise SchemaVersionError(version, expected)
+
+    return version
+
+
+@asynccontextmanager
+async def migration_lock(
+    engine: AsyncEngine,
+) -> AsyncGenerator[AsyncConnection, None]:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(
+            text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+        )
+        try:
+            yield conn
+        finally:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(:id)"),
+                {"id": MIGRATION_LOCK_ID},
+            )
+
+
+async def run_steps(conn: AsyncConnection, steps: Sequence[Step]) -> None:
+    for step in steps:
+        if isinstance(step, str):
+            await conn.exec_driver_sql(step)
+        else:
+            await step(conn)
+
+
+async def run(
+    engine: AsyncEngine, migration: Migration, steps: Sequence[Step]
+) -> None:
+    if migration.transactional:
+        async with engine.begin() as conn:
+            await run_steps(conn, steps)
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await run_steps(conn, steps)
+
+
+async def upgrade(
+    engine: AsyncEngine,
+    migrations: Sequence[Migration],
+    target: int | None = None,
+) -> list[Migration]:
+    check_order(migrations)
+    target = head(migrations) if target is None else target
+    applied = []
+
+    async with migration_lock(engine) as conn:
+        await conn.exec_driver_sql(VERSION_TABLE)
+        version = await current_version(conn)
+
+        for migration in migrations:
+            if not version < migration.version <= target:
+                continue
+
+            await run(engine, migration, migration.upgrade)
+            await conn.execute(
+                text(
+                    "INSERT INTO schema_version (version, name) "
+                    "VALUES (:version, :name)"
+                ),
+                {"version": migration.version, "name": migration.name},
+            )
+            applied.append(migration)
+
+    return applied
+
+
+async def downgrade(
+    engine: AsyncEngine, migrations: Sequence[Migration], target: int
+) -> list[Migration]:
+    check_order(migrations)
+    reverted = []
+
+    async with migration_lock(engine) as conn:
+        version = await current_version(conn)
+
+        for migration in reversed(migrations):
+            if not target < migration.version <= version:
+                continue
+
+            await run(engine, migration, migration.downgrade)
+            await conn.execute(
+                text("DELETE FROM schema_version WHERE version = :version"),
+                {"version": migration.version},
+            )
+            reverted.append(migration)
+
+    return reverted
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Table
+from sqlalchemy.types import String
+
+from blog_api.contrib import BaseModel
+
+# per-category post counts, written only by the posts_category_counts
+# trigger; plain table since it has none of the BaseModel columns
+category_counts = Table(
+    "category_counts",
+    BaseModel.metadata,
+    Column("category", String(30), primary_key=True),
+    Column("posts", Integer, nullable=False, server_default="0"),
+)
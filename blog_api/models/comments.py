@@ -1,6 +1,6 @@
 from uuid import UUID
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from blog_api.contrib.models import BaseModel
 from blog_api.models.users import UserModel
 from blog_api.models.posts import PostModel
@@ -19,5 +19,19 @@ class CommentModel(BaseModel):
         PG_UUID(as_uuid=True), ForeignKey("posts.id"), nullable=False
     )
 
-    user: Mapped[UserModel] = relationship(UserModel, lazy="selectin")
-    post: Mapped[PostModel] = relationship(PostModel, lazy="selectin")
+    user: Mapped[UserModel] = relationship(UserModel, lazy="raise")
+    post: Mapped[PostModel] = relationship(PostModel, lazy="raise")
+
+
+Index(
+    "ix_comments_post_id",
+    CommentModel.post_id,
+    CommentModel.created_at.desc(),
+    CommentModel.id.desc(),
+)
+Index(
+    "ix_comments_user_id",
+    CommentModel.user_id,
+    CommentModel.created_at.desc(),
+    CommentModel.id.desc(),
+)
@@ -1,8 +1,8 @@
 from uuid import UUID
-from sqlalchemy import ForeignKey
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy import FetchedValue, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.types import String, TEXT, ARRAY
+from sqlalchemy.types import Integer, String, TEXT
 from blog_api.contrib import BaseModel
 from blog_api.models.users import UserModel
 
@@ -12,9 +12,46 @@ class PostModel(BaseModel):
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     categories: Mapped[list[str]] = mapped_column(ARRAY(String(30)))
-    content: Mapped[str] = mapped_column(TEXT, nullable=False, unique=True)
+    content: Mapped[str] = mapped_column(TEXT, nullable=False)
+    # md5(content) kept by a trigger, uniqueness lives on this digest
+    content_hash: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+        nullable=False,
+    )
+    # head of the content for listings, kept by a trigger like the digest
+    excerpt: Mapped[str] = mapped_column(
+        TEXT,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+        nullable=False,
+    )
+    # weighted title/content document kept by a trigger, never loaded
+    search: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+        deferred=True,
+    )
+
+    comments_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     user_id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
-    user: Mapped[UserModel] = relationship(UserModel, lazy="selectin")
+    user: Mapped[UserModel] = relationship(UserModel, lazy="raise")
+
+
+Index("ix_posts_created_at", PostModel.created_at.desc(), PostModel.id.desc())
+Index(
+    "ix_posts_user_id",
+    PostModel.user_id,
+    PostModel.created_at.desc(),
+    PostModel.id.desc(),
+)
+Index("ux_posts_content_hash", PostModel.content_hash, unique=True)
+Index("ix_posts_search", PostModel.search, postgresql_using="gin")
+Index("ix_posts_categories", PostModel.categories, postgresql_using="gin")
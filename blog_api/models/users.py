@@ -1,5 +1,6 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.types import String, TEXT
+from sqlalchemy.types import Integer, String, TEXT
 from blog_api.contrib import BaseModel
 
 
@@ -10,3 +11,12 @@ class UserModel(BaseModel):
     email: Mapped[str] = mapped_column(TEXT, nullable=False, unique=True)
     password: Mapped[str] = mapped_column(String(60), nullable=False)
     role: Mapped[str] = mapped_column(String(30), nullable=False, default="user")
+    posts_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    comments_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
+
+Index("ix_users_created_at", UserModel.created_at.desc(), UserModel.id.desc())
@@ -1,24 +1,80 @@
-from uuid import UUID
+from collections import Counter
+from typing import Sequence
+from uuid import UUID, uuid4
 
+from fastapi_pagination.cursor import CursorPage
+from sqlalchemy import Select, column, delete, insert, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy.types import TEXT
 
 from blog_api.contrib.errors import (
     DatabaseError,
     GenericError,
     NoResultFound,
-    NothingToUpdate,
     UnableCreateEntity,
     UnableDeleteEntity,
+    UnableUpdateEntity,
 )
-from blog_api.contrib.repositories import BaseRepository
+from blog_api.contrib.pagination import (
+    Keyset,
+    KeysetParams,
+    keyset_after,
+    keyset_order,
+    keyset_page,
+)
+from blog_api.contrib.repositories import (
+    BaseRepository,
+    from_row,
+    from_rows,
+    increment,
+    is_foreign_key_violation,
+    owned_by,
+)
+from blog_api.core.cache import Cache
 from blog_api.models.comments import CommentModel
 from blog_api.models.posts import PostModel
+from blog_api.models.users import UserModel
 from blog_api.repositories.posts import PostsRepository
 from blog_api.schemas.comments import CommentOut
-from blog_api.schemas.posts import PostOut
+
+COMMENT_COLUMNS = (
+    CommentModel.id,
+    CommentModel.content,
+    CommentModel.created_at,
+    CommentModel.updated_at,
+    CommentModel.post_id,
+    PostModel.title.label("post_title"),
+    UserModel.id.label("author_id"),
+    UserModel.username.label("author_username"),
+)
+
+
+def select_comments() -> Select:
+    return (
+        select(*COMMENT_COLUMNS)
+        .join(PostModel, PostModel.id == CommentModel.post_id)
+        .join(UserModel, UserModel.id == CommentModel.user_id)
+    )
+
+
+def comment_tags(
+    post_id: UUID, user_id: UUID, author_id: UUID | None
+) -> list[str]:
+    # comment counters are embedded in post listings: the post's own, and
+    # the commenter's on every post they authored
+    tags = [
+        "feed",
+        f"comments:{post_id}",
+        f"commenter:{user_id}",
+        f"post:{post_id}",
+        f"author:{user_id}",
+    ]
+    if author_id is not None:
+        tags.append(f"author:{author_id}")
+    return tags
 
 
 class CommentsRepository(BaseRepository):
@@ -26,126 +82,191 @@ class CommentsRepository(BaseRepository):
         self,
         db: AsyncSession,
         post_repository: PostsRepository,
+        cache: Cache | None = None,
     ):
-        super().__init__(db)
+        super().__init__(db, cache)
         self.post_repository = post_repository
 
     async def create_comment(self, comment: CommentModel) -> UUID:
-        post: PostOut | None = await self.post_repository.get_post_by_id(
-            comment.post_id
+        # the post_id foreign key proves the post exists, no lookup needed
+        try:
+            self.db.add(comment)
+            await self.db.flush()
+            author_id = await self.count_comments(
+                comment.post_id, comment.user_id, 1
+            )
+            await self.db.commit()
+        except OperationalError:
+            await self.db.rollback()
+            raise DatabaseError
+        except IntegrityError as e:
+            await self.db.rollback()
+            if is_foreign_key_violation(e):
+                raise NoResultFound("post_id")
+            raise UnableCreateEntity
+        except Exception:
+            await self.db.rollback()
+            raise GenericError
+
+        await self.invalidate(
+            *comment_tags(comment.post_id, comment.user_id, author_id)
+        )
+        return comment.id
+
+    async def count_comments(
+        self, post_id: UUID, user_id: UUID, by: int
+    ) -> UUID | None:
+        # post row first, then the author: the order every writer locks in
+        result = await self.db.execute(
+            increment(PostModel.comments_count, post_id, by).returning(
+                PostModel.user_id
+            )
         )
+        await self.db.execute(increment(UserModel.comments_count, user_id, by))
+        return result.scalar_one_or_none()
 
-        if not post:
-            raise NoResultFound("post_id")
+    async def create_comments(
+        self, comments: Sequence[dict]
+    ) -> list[UUID | None]:
+        # rows are joined against posts inside the INSERT, comments on a
+        # missing post are left out instead of failing the whole chunk
+        rows = [{**comment, "id": uuid4()} for comment in comments]
+        incoming = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("content", TEXT),
+            column("user_id", PG_UUID(as_uuid=True)),
+            column("post_id", PG_UUID(as_uuid=True)),
+            name="incoming",
+        ).data(
+            [
+                (row["id"], row["content"], row["user_id"], row["post_id"])
+                for row in rows
+            ]
+        )
 
         try:
-            self.db.add(comment)
-            await self.db.flush()
+            result = await self.db.execute(
+                insert(CommentModel)
+                .from_select(
+                    ["id", "content", "user_id", "post_id"],
+                    select(
+                        incoming.c.id,
+                        incoming.c.content,
+                        incoming.c.user_id,
+                        incoming.c.post_id,
+                    ).join(PostModel, PostModel.id == incoming.c.post_id),
+                )
+                .returning(CommentModel.id)
+            )
+            created = set(result.scalars())
+            inserted = [row for row in rows if row["id"] in created]
+            posts = Counter(row["post_id"] for row in inserted)
+            users = Counter(row["user_id"] for row in inserted)
+            # posts before users, each in id order, like every other writer
+            authors = set()
+            for post_id, count in sorted(posts.items()):
+                result = await self.db.execute(
+                    increment(
+                        PostModel.comments_count, post_id, count
+                    ).returning(PostModel.user_id)
+                )
+                authors.add(result.scalar_one_or_none())
+            for user_id, count in sorted(users.items()):
+                await self.db.execute(
+                    increment(UserModel.comments_count, user_id, count)
+                )
             await self.db.commit()
-            return comment.id
         except OperationalError:
             await self.db.rollback()
             raise DatabaseError
         except IntegrityError:
+            # a post deleted between the join and the foreign key check
             await self.db.rollback()
             raise UnableCreateEntity
         except Exception:
             await self.db.rollback()
             raise GenericError
 
+        if inserted:
+            await self.invalidate(
+                "feed",
+                *(f"comments:{post_id}" for post_id in posts),
+                *(f"post:{post_id}" for post_id in posts),
+                *(f"commenter:{user_id}" for user_id in users),
+                *(f"author:{user_id}" for user_id in users),
+                *(f"author:{author}" for author in authors if author),
+            )
+
+        return [row["id"] if row["id"] in created else None for row in rows]
+
     async def get_comments(self) -> list[CommentOut]:
         async with self.db as session:
             try:
-                result = await session.execute(
-                    select(CommentModel).options(
-                        joinedload(CommentModel.post),
-                        joinedload(CommentModel.user),
-                    )
-                )
+                result = await session.execute(select_comments())
             except OperationalError:
                 raise DatabaseError
             except Exception:
                 raise GenericError
 
-            comments: list[CommentModel] = result.scalars().all()
-            return [
-                CommentOut(
-                    id=comment.id,
-                    content=comment.content,
-                    created_at=comment.created_at,
-                    updated_at=comment.updated_at,
-                    post_id=comment.post.id,
-                    post_title=comment.post.title,
-                    author_id=comment.user.id,
-                    author_username=comment.user.username,
-                )
-                for comment in comments
-            ]
+            return from_rows(CommentOut, result)
 
     async def get_comment_by_id(self, id: UUID) -> CommentOut | None:
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(CommentModel)
-                    .options(
-                        joinedload(CommentModel.post),
-                        joinedload(CommentModel.user),
-                    )
-                    .filter(CommentModel.id == id)
+                    select_comments().filter(CommentModel.id == id)
                 )
             except OperationalError:
                 raise DatabaseError
             except Exception:
                 raise GenericError
 
-            comment: CommentModel = result.scalars().one_or_none()
+            return from_row(CommentOut, result.one_or_none())
 
-            if comment is None:
-                return comment
-
-            return CommentOut(
-                id=comment.id,
-                content=comment.content,
-                created_at=comment.created_at,
-                updated_at=comment.updated_at,
-                post_id=comment.post.id,
-                post_title=comment.post.title,
-                author_id=comment.user.id,
-                author_username=comment.user.username,
-            )
-
-    async def get_comments_by_user_id(self, user_id: UUID) -> list[CommentOut]:
+    async def get_comments_by_user_id(
+        self,
+        user_id: UUID,
+        limit: int | None = None,
+        after: Keyset | None = None,
+    ) -> list[CommentOut]:
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(CommentModel)
-                    .options(
-                        joinedload(CommentModel.post),
-                        joinedload(CommentModel.user),
-                    )
+                    select_comments()
                     .filter(CommentModel.user_id == user_id)
+                    .filter(*keyset_after(CommentModel, after))
+                    .order_by(*keyset_order(CommentModel))
+                    .limit(limit)
                 )
             except OperationalError:
                 raise DatabaseError
             except Exception:
                 raise GenericError
 
-            comments: list[CommentModel] = result.scalars().all()
-            return [
-                CommentOut(
-                    id=comment.id,
-                    content=comment.content,
-                    created_at=comment.created_at,
-                    updated_at=comment.updated_at,
-                    post_id=comment.post.id,
-                    post_title=comment.post.title,
-                    author_id=comment.user.id,
-                    author_username=comment.user.username,
-                )
-                for comment in comments
-            ]
+            return from_rows(CommentOut, result)
 
-    async def get_comments_by_post_id(self, post_id: UUID) -> list[CommentOut]:
+    async def get_comments_by_user_id_page(
+        self, user_id: UUID, params: KeysetParams
+    ) -> CursorPage[CommentOut]:
+        comments = await self.get_comments_by_user_id(
+            user_id, params.size + 1, params.keyset()
+        )
+
+        return keyset_page(
+            CommentOut,
+            comments,
+            params,
+            await self.total(
+                params.total, CommentModel, CommentModel.user_id == user_id
+            ),
+        )
+
+    async def get_comments_by_post_id(
+        self,
+        post_id: UUID,
+        limit: int | None = None,
+        after: Keyset | None = None,
+    ) -> list[CommentOut]:
         async with self.db as session:
             post: PostModel | None = await self.post_repository.get_post_by_id(
                 post_id
@@ -156,68 +277,88 @@ class CommentsRepository(BaseRepository):
 
             try:
                 result = await session.execute(
-                    select(CommentModel)
-                    .options(
-                        joinedload(CommentModel.post),
-                        joinedload(CommentModel.user),
-                    )
+                    select_comments()
                     .filter(CommentModel.post_id == post_id)
+                    .filter(*keyset_after(CommentModel, after))
+                    .order_by(*keyset_order(CommentModel))
+                    .limit(limit)
                 )
             except OperationalError:
                 raise DatabaseError
             except Exception:
                 raise GenericError
 
-            comments: list[CommentModel] = result.scalars().all()
-            return [
-                CommentOut(
-                    id=comment.id,
-                    content=comment.content,
-                    created_at=comment.created_at,
-                    updated_at=comment.updated_at,
-                    post_id=comment.post.id,
-                    post_title=comment.post.title,
-                    author_id=comment.user.id,
-                    author_username=comment.user.username,
-                )
-                for comment in comments
-            ]
+            return from_rows(CommentOut, result)
+
+    async def get_comments_by_post_id_page(
+        self, post_id: UUID, params: KeysetParams
+    ) -> CursorPage[CommentOut]:
+        comments = await self.get_comments_by_post_id(
+            post_id, params.size + 1, params.keyset()
+        )
+
+        return keyset_page(
+            CommentOut,
+            comments,
+            params,
+            await self.total(
+                params.total, CommentModel, CommentModel.post_id == post_id
+            ),
+        )
 
-    async def update_comment(self, comment_id: UUID, content: str) -> None:
+    async def update_comment(
+        self, comment_id: UUID, content: str, owner_id: UUID | None = None
+    ) -> None:
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(CommentModel).filter(CommentModel.id == comment_id)
+                    update(CommentModel)
+                    .where(CommentModel.id == comment_id)
+                    .where(*owned_by(CommentModel, owner_id))
+                    .values(content=content)
+                    .returning(CommentModel.post_id, CommentModel.user_id)
                 )
+                comment = result.one_or_none()
 
-                if update_post := result.scalars().one_or_none():
-                    if update_post.content == content:
-                        raise NothingToUpdate
-                    update_post.content = content
-
-                    await session.flush()
+                if comment is not None:
                     await session.commit()
-                    return
-                raise NoResultFound("comment_id")
             except OperationalError:
-                await self.db.rollback()
+                await session.rollback()
                 raise DatabaseError
+            except IntegrityError:
+                await session.rollback()
+                raise UnableUpdateEntity
             except Exception:
-                await self.db.rollback()
+                await session.rollback()
                 raise GenericError
 
-    async def delete_comment(self, comment_id: UUID) -> None:
+        if comment is None:
+            raise await self.write_miss(
+                CommentModel, comment_id, owner_id, "comment_id"
+            )
+
+        await self.invalidate(
+            f"comments:{comment.post_id}", f"commenter:{comment.user_id}"
+        )
+
+    async def delete_comment(
+        self, comment_id: UUID, owner_id: UUID | None = None
+    ) -> None:
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(CommentModel).filter(CommentModel.id == comment_id)
+                    delete(CommentModel)
+                    .where(CommentModel.id == comment_id)
+                    .where(*owned_by(CommentModel, owner_id))
+                    .returning(CommentModel.post_id, CommentModel.user_id)
                 )
+                comment = result.one_or_none()
 
-                if delete_comment := result.scalars().one_or_none():
-                    await session.delete(delete_comment)
+                if comment is not None:
+                    author_id = await self.count_comments(
+                        comment.post_id, comment.user_id, -1
+                    )
                     await session.commit()
-                    return
-                raise NoResultFound("comment_id")
             except OperationalError:
                 await session.rollback()
                 raise DatabaseError
@@ -227,3 +368,12 @@ class CommentsRepository(BaseRepository):
             except Exception:
                 await session.rollback()
                 raise GenericError
+
+        if comment is None:
+            raise await self.write_miss(
+                CommentModel, comment_id, owner_id, "comment_id"
+            )
+
+        await self.invalidate(
+            *comment_tags(comment.post_id, comment.user_id, author_id)
+        )
@@ -1,11 +1,33 @@
-from uuid import UUID
+from collections import Counter
+from typing import Literal, Sequence
+from uuid import UUID, uuid4
+from fastapi_pagination.cursor import CursorPage
+from sqlalchemy import ColumnElement, Select, delete, func, update
+from sqlalchemy.dialects.postgresql import REAL, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
-from blog_api.contrib.repositories import BaseRepository
+from blog_api.contrib.pagination import (
+    Keyset,
+    KeysetParams,
+    RankKeyset,
+    keyset_after,
+    keyset_order,
+    keyset_page,
+    rank_after,
+)
+from blog_api.contrib.repositories import (
+    BaseRepository,
+    from_row,
+    from_rows,
+    increment,
+    owned_by,
+)
+from blog_api.core.cache import Cache
+from blog_api.models.categories import category_counts
 from blog_api.models.posts import PostModel
+from blog_api.models.users import UserModel
 from blog_api.contrib.errors import (
-    NoResultFound,
+    NothingToUpdate,
     DatabaseError,
     UnableCreateEntity,
     GenericError,
@@ -13,21 +35,99 @@ from blog_api.contrib.errors import (
     UnableUpdateEntity,
 )
 from sqlalchemy.exc import OperationalError, IntegrityError
-from blog_api.schemas.posts import PostOut
+from blog_api.schemas.posts import (
+    CategoryCountOut,
+    PostOut,
+    PostSearchOut,
+    PostSummaryOut,
+)
+
+# exactly the PostOut fields, counters included: they are plain columns
+# on the rows already read, so listings never COUNT(*)
+POST_COLUMNS = (
+    PostModel.id,
+    PostModel.title,
+    PostModel.categories,
+    PostModel.content,
+    PostModel.created_at,
+    PostModel.updated_at,
+    UserModel.id.label("author_id"),
+    UserModel.username.label("author_username"),
+    PostModel.comments_count,
+    UserModel.posts_count.label("author_posts_count"),
+    UserModel.comments_count.label("author_comments_count"),
+)
+
+
+# listings never read content, the excerpt column is filled at write time
+SUMMARY_COLUMNS = tuple(
+    PostModel.excerpt if column is PostModel.content else column
+    for column in POST_COLUMNS
+)
+
+
+def select_posts() -> Select:
+    return select(*POST_COLUMNS).join(
+        UserModel, UserModel.id == PostModel.user_id
+    )
+
+
+def select_post_summaries() -> Select:
+    return select(*SUMMARY_COLUMNS).join(
+        UserModel, UserModel.id == PostModel.user_id
+    )
+
+
+# must match the configuration the posts_search trigger indexes with
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+HTML_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"))
+
+
+def escape_html(column: ColumnElement[str]) -> ColumnElement[str]:
+    # ts_headline copies the content through as is, only <mark> may be markup
+    for char, entity in HTML_ESCAPES:
+        column = func.replace(column, char, entity)
+    return column
+
+
+def search_matches(q: str) -> ColumnElement[bool]:
+    return PostModel.search.op("@@")(
+        func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    )
+
+
+CategoryMatch = Literal["all", "any"]
+
+
+def in_categories(categories: Sequence[str], match: CategoryMatch) -> tuple:
+    # @> and && both go through the GIN index on categories
+    if not categories:
+        return ()
+
+    if match == "all":
+        return (PostModel.categories.contains(list(categories)),)
+
+    return (PostModel.categories.overlap(list(categories)),)
 
 
 class PostsRepository(BaseRepository):
     def __init__(
         self,
         db: AsyncSession,
+        cache: Cache | None = None,
     ):
-        super().__init__(db)
+        super().__init__(db, cache)
 
     async def create_post(self, post: PostModel) -> UUID:
         try:
             self.db.add(post)
             await self.db.flush()
+            await self.db.execute(
+                increment(UserModel.posts_count, post.user_id)
+            )
             await self.db.commit()
+            await self.invalidate("feed", f"author:{post.user_id}")
             return post.id
 
         except OperationalError:
@@ -40,126 +140,284 @@ class PostsRepository(BaseRepository):
             await self.db.rollback()
             raise GenericError
 
-    async def get_posts(self) -> list[PostOut]:
+    async def create_posts(self, posts: Sequence[dict]) -> list[UUID | None]:
+        # one multi-row INSERT and one commit for the whole chunk, a content
+        # digest already taken skips that row instead of failing the chunk
+        rows = [{**post, "id": uuid4()} for post in posts]
+
+        try:
+            result = await self.db.execute(
+                insert(PostModel)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["content_hash"])
+                .returning(PostModel.id)
+            )
+            created = set(result.scalars())
+            authors = Counter(
+                row["user_id"] for row in rows if row["id"] in created
+            )
+            for author, count in sorted(authors.items()):
+                await self.db.execute(
+                    increment(UserModel.posts_count, author, count)
+                )
+            await self.db.commit()
+        except OperationalError:
+            await self.db.rollback()
+            raise DatabaseError
+        except IntegrityError:
+            await self.db.rollback()
+            raise UnableCreateEntity
+        except Exception:
+            await self.db.rollback()
+            raise GenericError
+
+        if created:
+            await self.invalidate(
+                "feed", *(f"author:{author}" for author in authors)
+            )
+
+        return [row["id"] if row["id"] in created else None for row in rows]
+
+    async def get_posts(
+        self,
+        limit: int | None = None,
+        after: Keyset | None = None,
+        categories: Sequence[str] = (),
+        match: CategoryMatch = "all",
+    ) -> list[PostSummaryOut]:
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(PostModel).options(joinedload(PostModel.user))
+                    select_post_summaries()
+                    .filter(*in_categories(categories, match))
+                    .filter(*keyset_after(PostModel, after))
+                    .order_by(*keyset_order(PostModel))
+                    .limit(limit)
                 )
             except OperationalError:
                 raise DatabaseError
             except Exception:
                 raise GenericError
 
-            posts: list[PostModel] = result.scalars().all()
-            return [
-                PostOut(
-                    id=post.id,
-                    title=post.title,
-                    categories=post.categories,
-                    content=post.content,
-                    created_at=post.created_at,
-                    updated_at=post.updated_at,
-                    author=post.user.username,
-                )
-                for post in posts
-            ]
+            return from_rows(PostSummaryOut, result)
 
     async def get_post_by_id(self, post_id: UUID) -> PostOut | None:
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(PostModel)
-                    .filter(PostModel.id == post_id)
-                    .options(joinedload(PostModel.user))
+                    select_posts().filter(PostModel.id == post_id)
                 )
             except OperationalError:
                 raise DatabaseError
             except Exception:
                 raise GenericError
 
-            post: PostModel | None = result.scalars().one_or_none()
+            return from_row(PostOut, result.one_or_none())
 
-            if post is None:
-                return None
+    async def get_posts_by_ids(self, post_ids: list[UUID]) -> list[PostOut]:
+        async with self.db as session:
+            try:
+                result = await session.execute(
+                    select_posts().filter(PostModel.id.in_(post_ids))
+                )
+            except OperationalError:
+                raise DatabaseError
+            except Exception:
+                raise GenericError
 
-            return PostOut(
-                id=post.id,
-                title=post.title,
-                categories=post.categories,
-                content=post.content,
-                created_at=post.created_at,
-                updated_at=post.updated_at,
-                author_id=post.user.id,
-                author_username=post.user.username,
-            )
+            return from_rows(PostOut, result)
+
+    async def get_posts_page(
+        self,
+        params: KeysetParams,
+        categories: Sequence[str] = (),
+        match: CategoryMatch = "all",
+    ) -> CursorPage[PostSummaryOut]:
+        posts = await self.get_posts(
+            params.size + 1, params.keyset(), categories, match
+        )
 
-    async def get_posts_by_user_id(self, user_id: UUID) -> list[PostOut]:
+        return keyset_page(
+            PostSummaryOut,
+            posts,
+            params,
+            await self.total(
+                params.total, PostModel, *in_categories(categories, match)
+            ),
+        )
+
+    async def get_category_counts(self) -> list[CategoryCountOut]:
+        # maintained by the posts_category_counts trigger, never unnested
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(PostModel)
-                    .options(joinedload(PostModel.user))
-                    .filter(PostModel.user_id == user_id)
+                    select(
+                        category_counts.c.category.label("name"),
+                        category_counts.c.posts,
+                    )
+                    .filter(category_counts.c.posts > 0)
+                    .order_by(
+                        category_counts.c.posts.desc(),
+                        category_counts.c.category,
+                    )
                 )
             except OperationalError:
                 raise DatabaseError
             except Exception:
                 raise GenericError
 
-            posts: list[PostModel] = result.scalars().all()
-
-            return [
-                PostOut(
-                    id=post.id,
-                    title=post.title,
-                    categories=post.categories,
-                    content=post.content,
-                    created_at=post.created_at,
-                    updated_at=post.updated_at,
-                    author_id=post.user.id,
-                    author_username=post.user.username,
+            return from_rows(CategoryCountOut, result)
+
+    async def search_posts(
+        self, q: str, limit: int | None = None, after: RankKeyset | None = None
+    ) -> list[PostSearchOut]:
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        rank = func.ts_rank_cd(PostModel.search, query, type_=REAL)
+        # rank and page through the GIN matches first, headlines re-parse
+        # the whole content so they are built for the page rows only
+        ranked = (
+            select(PostModel.id, rank.label("rank"))
+            .filter(search_matches(q))
+            .filter(*rank_after(rank, PostModel, after))
+            .order_by(rank.desc(), PostModel.id.desc())
+            .limit(limit)
+            .subquery("ranked")
+        )
+
+        async with self.db as session:
+            try:
+                result = await session.execute(
+                    select(
+                        *SUMMARY_COLUMNS,
+                        ranked.c.rank,
+                        func.ts_headline(
+                            SEARCH_CONFIG,
+                            escape_html(PostModel.content),
+                            query,
+                            HEADLINE_OPTIONS,
+                        ).label("snippet"),
+                    )
+                    .select_from(ranked)
+                    .join(PostModel, PostModel.id == ranked.c.id)
+                    .join(UserModel, UserModel.id == PostModel.user_id)
+                    .order_by(ranked.c.rank.desc(), ranked.c.id.desc())
                 )
-                for post in posts
-            ]
+            except OperationalError:
+                raise DatabaseError
+            except Exception:
+                raise GenericError
+
+            return from_rows(PostSearchOut, result)
 
-    async def update_post(self, post_id: UUID, fields: dict) -> None:
+    async def search_posts_page(
+        self, q: str, params: KeysetParams
+    ) -> CursorPage[PostSearchOut]:
+        posts = await self.search_posts(
+            q, params.size + 1, params.rank_keyset()
+        )
+
+        return keyset_page(
+            PostSearchOut,
+            posts,
+            params,
+            await self.total(params.total, PostModel, search_matches(q)),
+            position=lambda post: post.rank,
+        )
+
+    async def get_posts_by_user_id(
+        self,
+        user_id: UUID,
+        limit: int | None = None,
+        after: Keyset | None = None,
+    ) -> list[PostSummaryOut]:
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(PostModel).filter(PostModel.id == post_id)
+                    select_post_summaries()
+                    .filter(PostModel.user_id == user_id)
+                    .filter(*keyset_after(PostModel, after))
+                    .order_by(*keyset_order(PostModel))
+                    .limit(limit)
                 )
+            except OperationalError:
+                raise DatabaseError
+            except Exception:
+                raise GenericError
+
+            return from_rows(PostSummaryOut, result)
 
-                if update_post := result.scalars().one_or_none():
-                    for k, v in fields:
-                        setattr(update_post, k, v)
+    async def get_posts_by_user_id_page(
+        self, user_id: UUID, params: KeysetParams
+    ) -> CursorPage[PostSummaryOut]:
+        posts = await self.get_posts_by_user_id(
+            user_id, params.size + 1, params.keyset()
+        )
 
-                    await session.flush()
+        return keyset_page(
+            PostSummaryOut,
+            posts,
+            params,
+            await self.total(
+                params.total, PostModel, PostModel.user_id == user_id
+            ),
+        )
+
+    async def update_post(
+        self, post_id: UUID, fields: dict, owner_id: UUID | None = None
+    ) -> None:
+        values = {k: v for k, v in fields.items() if v is not None}
+
+        if not values:
+            raise NothingToUpdate
+
+        async with self.db as session:
+            try:
+                result = await session.execute(
+                    update(PostModel)
+                    .where(PostModel.id == post_id)
+                    .where(*owned_by(PostModel, owner_id))
+                    .values(**values)
+                    .returning(PostModel.user_id)
+                )
+                author_id = result.scalar_one_or_none()
+
+                if author_id is not None:
                     await session.commit()
-                    return
-                raise NoResultFound("post_id")
             except OperationalError:
-                await self.db.rollback()
+                await session.rollback()
                 raise DatabaseError
             except IntegrityError:
-                await self.db.rollback()
+                await session.rollback()
                 raise UnableUpdateEntity
             except Exception:
-                await self.db.rollback()
+                await session.rollback()
                 raise GenericError
 
-    async def delete_post(self, post_id: UUID) -> None:
+        if author_id is None:
+            raise await self.write_miss(
+                PostModel, post_id, owner_id, "post_id"
+            )
+
+        await self.invalidate(f"post:{post_id}", "feed", f"author:{author_id}")
+
+    async def delete_post(
+        self, post_id: UUID, owner_id: UUID | None = None
+    ) -> None:
         async with self.db as session:
             try:
                 result = await session.execute(
-                    select(PostModel).filter(PostModel.id == post_id)
+                    delete(PostModel)
+                    .where(PostModel.id == post_id)
+                    .where(*owned_by(PostModel, owner_id))
+                    .returning(PostModel.user_id)
                 )
+                author_id = result.scalar_one_or_none()
 
-                if delete_post := result.scalars().one_or_none():
-                    await session.delete(delete_post)
+                if author_id is not None:
+                    await session.execute(
+                        increment(UserModel.posts_count, author_id, -1)
+                    )
                     await session.commit()
-                    return
-                raise NoResultFound("post_id")
             except OperationalError:
                 await session.rollback()
                 raise DatabaseError
@@ -169,3 +427,10 @@ class PostsRepository(BaseRepository):
             except Exception:
                 await session.rollback()
                 raise GenericError
+
+        if author_id is None:
+            raise await self.write_miss(
+                PostModel, post_id, owner_id, "post_id"
+            )
+
+        await self.invalidate(f"post:{post_id}", "feed", f"author:{author_id}")
@@ -1,9 +1,19 @@
 from uuid import UUID
+from fastapi_pagination.cursor import CursorPage
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import OperationalError, IntegrityError
-from sqlalchemy import select
-from blog_api.contrib.repositories import BaseRepository
+from sqlalchemy import delete, select, update
+from blog_api.contrib.pagination import (
+    Keyset,
+    KeysetParams,
+    keyset_after,
+    keyset_order,
+    keyset_page,
+)
+from blog_api.contrib.repositories import BaseRepository, from_rows
+from blog_api.core.cache import Cache
 from blog_api.models.users import UserModel
+from blog_api.schemas.users import UserOut
 from blog_api.contrib.errors import (
     DatabaseError,
     UnableCreateEntity,
@@ -13,16 +23,27 @@ from blog_api.contrib.errors import (
     NoResultFound,
 )
 
+# never select the password hash for listings
+USER_COLUMNS = (
+    UserModel.id,
+    UserModel.username,
+    UserModel.email,
+    UserModel.role,
+    UserModel.created_at,
+    UserModel.updated_at,
+)
+
 
 class UsersRepository(BaseRepository):
-    def __init__(self, db: AsyncSession):
-        super().__init__(db)
+    def __init__(self, db: AsyncSession, cache: Cache | None = None):
+        super().__init__(db, cache)
 
     async def create_user(self, user: UserModel) -> UUID:
         try:
             self.db.add(user)
             await self.db.flush()
             await self.db.commit()
+            await self.invalidate("users")
             return user.id
         except OperationalError:
             await self.db.rollback()
@@ -36,17 +57,35 @@ class UsersRepository(BaseRepository):
         finally:
             await self.db.close()
 
-    async def get_users(self) -> list[UserModel]:
+    async def get_users(
+        self, limit: int | None = None, after: Keyset | None = None
+    ) -> list[UserOut]:
         async with self.db as session:
             try:
-                result = await session.execute(select(UserModel))
+                result = await session.execute(
+                    select(*USER_COLUMNS)
+                    .filter(*keyset_after(UserModel, after))
+                    .order_by(*keyset_order(UserModel))
+                    .limit(limit)
+                )
             except OperationalError:
                 raise DatabaseError
             except Exception:
                 raise GenericError
 
-            users = result.scalars().all()
-            return list(users)
+            return from_rows(UserOut, result)
+
+    async def get_users_page(
+        self, params: KeysetParams
+    ) -> CursorPage[UserOut]:
+        users = await self.get_users(params.size + 1, params.keyset())
+
+        return keyset_page(
+            UserOut,
+            users,
+            params,
+            await self.total(params.total, UserModel),
+        )
 
     async def get_user_by_id(self, id: UUID) -> UserModel | None:
         async with self.db as session:
@@ -83,49 +122,26 @@ class UsersRepository(BaseRepository):
             return user
 
     async def update_user_password(self, user_id: UUID, new_password: str) -> None:
-        with self.db as session:
-            try:
-                result = await session.execute(
-                    select(UserModel).filter(UserModel.id == user_id)
-                )
-
-                if update_user := result.scalars().one_or_none():
-                    update_user.password = new_password
-
-                    await self.db.flush()
-                    await self.db.commit()
-                    return
-
-                session.rollback()
-                raise NoResultFound
-
-            except OperationalError:
-                await self.db.rollback()
-                raise DatabaseError
-            except IntegrityError:
-                await self.db.rollback()
-                raise UnableUpdateEntity
-            except Exception:
-                await self.db.rollback()
-                raise GenericError
+        await self.update_user(user_id, {"password": new_password})
+        await self.invalidate(f"user:{user_id}")
 
     async def update_user_role(self, user_id, role: str) -> None:
-        with self.db as session:
+        await self.update_user(user_id, {"role": role})
+        await self.invalidate(f"user:{user_id}", "users")
+
+    async def update_user(self, user_id: UUID, values: dict) -> None:
+        async with self.db as session:
             try:
                 result = await session.execute(
-                    select(UserModel).filter(UserModel.id == user_id)
+                    update(UserModel)
+                    .where(UserModel.id == user_id)
+                    .values(**values)
+                    .returning(UserModel.id)
                 )
+                updated = result.scalar_one_or_none()
 
-                if update_user := result.scalars().one_or_none():
-                    update_user.role = role
-
-                    await session.flush()
+                if updated is not None:
                     await session.commit()
-                    return
-
-                session.rollback()
-                raise NoResultFound
-
             except OperationalError:
                 await session.rollback()
                 raise DatabaseError
@@ -136,21 +152,21 @@ class UsersRepository(BaseRepository):
                 await session.rollback()
                 raise GenericError
 
+        if updated is None:
+            raise NoResultFound("user_id")
+
     async def delete_user(self, user_id) -> None:
-        with self.db as session:
+        async with self.db as session:
             try:
                 result = await session.execute(
-                    select(UserModel).filter(UserModel.id == user_id)
+                    delete(UserModel)
+                    .where(UserModel.id == user_id)
+                    .returning(UserModel.id)
                 )
+                deleted = result.scalar_one_or_none()
 
-                if delete_user := result.scalars().one_or_none():
-                    await session.delete(delete_user)
+                if deleted is not None:
                     await session.commit()
-                    return
-
-                session.rollback()
-                raise NoResultFound
-
             except OperationalError:
                 await session.rollback()
                 raise DatabaseError
@@ -160,3 +176,8 @@ class UsersRepository(BaseRepository):
             except Exception:
                 await session.rollback()
                 raise GenericError
+
+        if deleted is None:
+            raise NoResultFound("user_id")
+
+        await self.invalidate(f"user:{user_id}", "users")
@@ -12,6 +12,25 @@ class PostBase(BaseModel):
 class PostOut(PostBase, OutMixin):
     author_id: UUID = Field(..., description="Post author id")
     author_username: str = Field(..., description="Post author username")
+    comments_count: int = Field(0, description="Comments on the post")
+    author_posts_count: int = Field(0, description="Posts by the author")
+    author_comments_count: int = Field(0, description="Comments by the author")
+
+
+class PostSummaryOut(OutMixin):
+    title: str = Field(..., description="Post title")
+    categories: list[str] = Field(..., description="Post categories")
+    excerpt: str = Field(..., description="Start of the post content")
+    author_id: UUID = Field(..., description="Post author id")
+    author_username: str = Field(..., description="Post author username")
+    comments_count: int = Field(0, description="Comments on the post")
+    author_posts_count: int = Field(0, description="Posts by the author")
+    author_comments_count: int = Field(0, description="Comments by the author")
+
+
+class PostSearchOut(PostSummaryOut):
+    rank: float = Field(..., description="Search relevance")
+    snippet: str = Field(..., description="Content with the matches marked")
 
 
 class PostIn(PostBase): ...
@@ -21,3 +40,8 @@ class PostUpdate(BaseModel):
     title: str | None = Field(None, description="Post title")
     categories: list[str] | None = Field(None, description="Post categories")
     content: str | None = Field(None, description="Post content")
+
+
+class CategoryCountOut(BaseModel):
+    name: str = Field(..., description="Category name")
+    posts: int = Field(..., description="Posts in the category")
@@ -1,6 +1,11 @@
+from typing import Literal
 from pydantic import BaseModel
 from uuid import UUID
 
+BulkStatus = Literal[
+    "created", "duplicate", "post_not_found", "failed", "invalid"
+]
+
 
 class CreatedSchemaMixin(BaseModel):
     id: UUID
@@ -15,6 +20,18 @@ class PostCreatedSchema(CreatedSchemaMixin): ...
 class CommentCreatedSchema(CreatedSchemaMixin): ...
 
 
+class BulkItemSchema(BaseModel):
+    index: int
+    status: BulkStatus
+    id: UUID | None = None
+    detail: str | None = None
+
+
+class BulkCreatedSchema(BaseModel):
+    created: int
+    items: list[BulkItemSchema]
+
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
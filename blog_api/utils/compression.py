@@ -0,0 +1,17 @@
+import zlib
+
+COMPRESSION_MAGIC = b"\x1fz"
+
+
+def is_compressed(payload: bytes) -> bool:
+    return payload[:2] == COMPRESSION_MAGIC
+
+
+def compress(payload: bytes, level: int) -> bytes:
+    return COMPRESSION_MAGIC + zlib.compress(payload, level)
+
+
+def decompress(payload: bytes) -> bytes:
+    if not is_compressed(payload):
+        return payload
+    return zlib.decompress(payload[len(COMPRESSION_MAGIC) :])
@@ -1,9 +1,14 @@
+from abc import ABC, abstractmethod
 from datetime import datetime
+from functools import lru_cache
 import json
 from typing import Any
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+
+FORMAT_VERSION = 1
 
 
 def __transform_type_in_str(map: dict[str, Any]) -> dict[str, str]:
@@ -58,3 +63,100 @@ def decode_pydantic_model(
             ]
         case _:
             return None
+
+
+@lru_cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+class Codec(ABC):
+    id: int
+    name: str
+
+    @abstractmethod
+    def encode(self, value: BaseModel | list[BaseModel]) -> bytes: ...
+
+    @abstractmethod
+    def decode(
+        self, payload: bytes, decode_model: type[BaseModel]
+    ) -> BaseModel | list[BaseModel]: ...
+
+
+class JsonCodec(Codec):
+    id = 0
+    name = "json"
+
+    def encode(self, value: BaseModel | list[BaseModel]) -> bytes:
+        # json mode reaches nested values too, pages wrap their items
+        match value:
+            case BaseModel():
+                return json.dumps(value.model_dump(mode="json")).encode()
+            case list():
+                return json.dumps(
+                    [model.model_dump(mode="json") for model in value]
+                ).encode()
+            case _:
+                raise TypeError(f"can't encode {type(value).__name__}")
+
+    def decode(
+        self, payload: bytes, decode_model: type[BaseModel]
+    ) -> BaseModel | list[BaseModel]:
+        return decode_pydantic_model(payload, decode_model)
+
+
+class PydanticCodec(Codec):
+    id = 1
+    name = "pydantic"
+
+    def encode(self, value: BaseModel | list[BaseModel]) -> bytes:
+        match value:
+            case BaseModel() | list():
+                return to_json(value)
+            case _:
+                raise TypeError(f"can't encode {type(value).__name__}")
+
+    def decode(
+        self, payload: bytes, decode_model: type[BaseModel]
+    ) -> BaseModel | list[BaseModel]:
+        if payload[:1] == b"[":
+            return _list_adapter(decode_model).validate_json(payload)
+        return decode_model.model_validate_json(payload)
+
+
+CODECS: dict[int, Codec] = {
+    codec.id: codec for codec in (JsonCodec(), PydanticCodec())
+}
+
+
+def get_codec(name: str) -> Codec:
+    for codec in CODECS.values():
+        if codec.name == name:
+            return codec
+    raise ValueError(f"unknown codec {name}")
+
+
+def encode_value(value: BaseModel | list[BaseModel], codec: Codec) -> bytes:
+    return bytes((FORMAT_VERSION, codec.id)) + codec.encode(value)
+
+
+def decode_value(
+    payload: bytes | str | None, decode_model: type[BaseModel]
+) -> BaseModel | list[BaseModel] | None:
+    if payload is None or len(payload) < 1:
+        return None
+
+    if isinstance(payload, str):
+        payload = payload.encode()
+
+    # entries written before the codec header are plain json
+    if payload[:1] in (b"{", b"["):
+        return decode_pydantic_model(payload, decode_model)
+
+    codec = CODECS.get(payload[1]) if payload[0] == FORMAT_VERSION else None
+
+    # written by a release we don't know how to read, treat it as a miss
+    if codec is None:
+        return None
+
+    return codec.decode(payload[2:], decode_model)
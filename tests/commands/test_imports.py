@@ -0,0 +1,64 @@
+import io
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from blog_api.commands import imports
+from blog_api.commands.imports import cli_import, numbered_lines, parse_chunk
+from blog_api.schemas.posts import PostIn
+
+
+def test_numbered_lines_skip_blank_lines():
+    lines = io.StringIO('{"a": 1}\n\n  \n{"b": 2}\n')
+
+    assert [number for number, _ in numbered_lines(lines)] == [1, 4]
+
+
+def test_parse_chunk_report_invalid_lines():
+    user_id = uuid4()
+    chunk = [
+        (1, '{"title": "t", "categories": ["c"], "content": "x"}'),
+        (2, '{"title": "t"}'),
+        (3, "not json"),
+    ]
+
+    numbers, rows, invalid = parse_chunk(chunk, PostIn, user_id)
+
+    assert numbers == [1]
+    assert rows == [
+        {"title": "t", "categories": ["c"], "content": "x", "user_id": user_id}
+    ]
+    assert [(i.index, i.status) for i in invalid] == [
+        (2, "invalid"),
+        (3, "invalid"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cli_import_one_write_per_chunk_with_line_numbers():
+    post = '{"title": "t", "categories": [], "content": "%s"}\n'
+    lines = io.StringIO(post % "a" + "\n" + post % "b" + "{}\n" + post % "c")
+    created = uuid4()
+    create_posts = AsyncMock(side_effect=[[created, None], [created]])
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.__aexit__ = AsyncMock(return_value=None)
+    reported = []
+
+    with (
+        patch.object(imports, "get_context_session", return_value=session),
+        patch.object(imports, "Redis", return_value=AsyncMock()),
+        patch.object(imports, "close_cache_pool", AsyncMock()),
+        patch.object(imports.PostsRepository, "create_posts", create_posts),
+    ):
+        total = await cli_import(lines, "posts", uuid4(), 3, reported.append)
+
+    assert total == 2
+    assert create_posts.await_count == 2
+    assert [(i.index, i.status) for i in reported] == [
+        (1, "created"),
+        (3, "duplicate"),
+        (4, "invalid"),
+        (5, "created"),
+    ]
@@ -0,0 +1,97 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+import pytest
+
+from blog_api.commands import recount as recount_command
+from blog_api.commands.recount import COUNTERS, cli_recount, recount
+
+
+def fake_engine(batches: list[list[UUID]], fixed: int):
+    # the first `fixed` ids of every batch come back as repaired
+    conn = MagicMock()
+    results = []
+    for ids in batches:
+        locked = MagicMock()
+        locked.scalars.return_value.all.return_value = ids
+        results.append(locked)
+        if ids:
+            repaired = MagicMock()
+            repaired.scalars.return_value.all.return_value = ids[:fixed]
+            results.append(repaired)
+    conn.execute = AsyncMock(side_effect=results)
+    engine = MagicMock()
+    transactions = []
+
+    @asynccontextmanager
+    async def begin():
+        transactions.append(conn)
+        yield conn
+
+    engine.begin = begin
+    return engine, conn, transactions
+
+
+@pytest.mark.asyncio
+async def test_recount_walks_batches_in_id_order():
+    first, second = [UUID(int=1), UUID(int=2)], [UUID(int=3)]
+    engine, conn, transactions = fake_engine([first, second, []], fixed=1)
+
+    fixed = await recount(engine, *COUNTERS[0], batch_size=2)
+
+    assert fixed == [UUID(int=1), UUID(int=3)]
+    assert len(transactions) == 3
+    params = [call.args[1] for call in conn.execute.await_args_list]
+    assert params == [
+        {"after": UUID(int=0), "limit": 2},
+        {"after": UUID(int=0), "last": UUID(int=2)},
+        {"after": UUID(int=2), "limit": 2},
+        {"after": UUID(int=2), "last": UUID(int=3)},
+        {"after": UUID(int=3), "limit": 2},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_recount_lock_batch_before_counting():
+    engine, conn, _ = fake_engine([[UUID(int=1)], []], fixed=0)
+
+    await recount(engine, *COUNTERS[0], batch_size=10)
+
+    lock, repair, _ = [str(c.args[0]) for c in conn.execute.await_args_list]
+    assert "FOR UPDATE" in lock
+    assert "SET comments_count = actual.total" in repair
+    assert "comments.post_id = posts.id" in repair
+
+
+@pytest.mark.asyncio
+async def test_cli_recount_invalidates_entries_of_repaired_rows(monkeypatch):
+    post_id, user_id = UUID(int=1), UUID(int=2)
+    cache = MagicMock(invalidate_tags=AsyncMock())
+    monkeypatch.setattr(
+        recount_command,
+        "recount",
+        AsyncMock(side_effect=[[post_id], [user_id], [user_id]]),
+    )
+    monkeypatch.setattr(
+        recount_command, "engine", MagicMock(dispose=AsyncMock())
+    )
+    monkeypatch.setattr(recount_command, "get_cache_pool", MagicMock())
+    monkeypatch.setattr(recount_command, "close_cache_pool", AsyncMock())
+    monkeypatch.setattr(
+        recount_command,
+        "Redis",
+        MagicMock(return_value=MagicMock(aclose=AsyncMock())),
+    )
+    monkeypatch.setattr(
+        recount_command, "Cache", MagicMock(return_value=cache)
+    )
+    report = MagicMock()
+
+    fixed = await cli_recount(100, report)
+
+    assert fixed == 3
+    report.assert_any_call("users.posts_count", 1)
+    cache.invalidate_tags.assert_awaited_once_with(
+        "feed", "users", f"author:{user_id}", f"post:{post_id}"
+    )
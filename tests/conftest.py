@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import AsyncGenerator
-from unittest.mock import AsyncMock
+from typing import AsyncGenerator, Callable, Generator
+from unittest.mock import AsyncMock, MagicMock
 from uuid import UUID, uuid4
 
 from faker import Faker
@@ -9,12 +9,14 @@ from pytest import fixture
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from blog_api.commands.app import app
+from blog_api.core.cache import get_cache_connection
+from blog_api.core.database import engine, get_read_session, replicas
 from blog_api.core.security import gen_hash
 from blog_api.models.comments import CommentModel
 from blog_api.models.posts import PostModel
 from blog_api.models.users import UserModel
 from blog_api.schemas.comments import CommentOut
-from blog_api.schemas.posts import PostOut
+from blog_api.schemas.posts import PostOut, PostSummaryOut
 from blog_api.schemas.users import UserOut
 from tests.factories import (
     comment_data,
@@ -26,6 +28,11 @@ from tests.factories import (
     single_user_data,
     update_post_data,
 )
+from tests.query_counter import (
+    QueryCounter,
+    count_queries,
+    counting_session,
+)
 
 fake: Faker = Faker()
 
@@ -126,6 +133,16 @@ def mock_posts_inserted() -> list[PostOut]:
     return [PostOut(**post) for post in many_posts_data()]
 
 
+@fixture
+def mock_post_summaries(mock_posts_inserted: list[PostOut]) -> list[PostSummaryOut]:
+    return [
+        PostSummaryOut(
+            **post.model_dump(exclude={"content"}), excerpt=post.content[:200]
+        )
+        for post in mock_posts_inserted
+    ]
+
+
 @fixture
 def mock_update_post() -> dict:
     return update_post_data()
@@ -186,9 +203,41 @@ async def client() -> AsyncGenerator[AsyncClient, None]:
         yield ac
 
 
+@fixture
+def query_counter() -> Generator[QueryCounter, None, None]:
+    engines = [engine, *(replica.engine for replica in replicas.replicas)]
+
+    with count_queries(*(e.sync_engine for e in engines)) as counter:
+        yield counter
+
+
+@fixture
+def read_db(query_counter: QueryCounter) -> Generator[Callable, None, None]:
+    def returning(*results: list[dict]) -> MagicMock:
+        session = counting_session(query_counter, *results)
+        app.dependency_overrides[get_read_session] = lambda: session
+        return session
+
+    yield returning
+    app.dependency_overrides.pop(get_read_session, None)
+
+
 @fixture
 async def cache_session() -> AsyncGenerator[AsyncMock, None]:
-    yield AsyncMock()
+    session = AsyncMock()
+    pipeline = MagicMock()
+    pipeline.__aenter__.return_value = pipeline
+    pipeline.execute = AsyncMock(return_value=[])
+    session.pipeline = MagicMock(return_value=pipeline)
+    session.register_script = MagicMock(return_value=AsyncMock())
+    yield session
+
+
+@fixture(autouse=True)
+def override_cache_connection(cache_session: AsyncMock):
+    app.dependency_overrides[get_cache_connection] = lambda: cache_session
+    yield
+    app.dependency_overrides.pop(get_cache_connection, None)
 
 
 @fixture
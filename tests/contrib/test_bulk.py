@@ -0,0 +1,38 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from blog_api.contrib.bulk import bulk_result, write_in_chunks
+from blog_api.contrib.errors import DatabaseError
+
+
+@pytest.mark.asyncio
+async def test_write_in_chunks_map_ids_to_item_status():
+    first, second = uuid4(), uuid4()
+    write = AsyncMock(side_effect=[[first, None], [second]])
+    rows = [{"n": 0}, {"n": 1}, {"n": 2}]
+
+    items = await write_in_chunks(write, rows, 2, "duplicate")
+
+    assert [call.args[0] for call in write.await_args_list] == [
+        rows[:2],
+        rows[2:],
+    ]
+    assert [(i.index, i.status, i.id) for i in items] == [
+        (0, "created", first),
+        (1, "duplicate", None),
+        (2, "created", second),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_write_in_chunks_fail_only_the_rolled_back_chunk():
+    created = uuid4()
+    write = AsyncMock(side_effect=[DatabaseError(), [created]])
+
+    items = await write_in_chunks(write, [{}, {}, {}], 2, "post_not_found")
+
+    assert [i.status for i in items] == ["failed", "failed", "created"]
+    assert items[0].detail == "Database integrity error"
+    assert bulk_result(items).created == 1
@@ -0,0 +1,193 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from blog_api.contrib.pagination import (
+    Keyset,
+    KeysetParams,
+    RankKeyset,
+    keyset_after,
+    keyset_order,
+    keyset_page,
+)
+from blog_api.contrib.repositories import BaseRepository
+from blog_api.models.posts import PostModel
+from blog_api.repositories.posts import search_matches
+from blog_api.schemas.posts import PostOut
+
+
+def compile_sql(query) -> str:
+    return str(
+        query.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def session_returning(value) -> MagicMock:
+    result = MagicMock()
+    result.scalar_one.return_value = value
+    result.scalar_one_or_none.return_value = value
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+def test_keyset_page_next_cursor_round_trip(mock_posts_inserted):
+    params = KeysetParams(cursor=None, size=2, total="none")
+
+    page = keyset_page(PostOut, mock_posts_inserted[:3], params)
+
+    assert page.items == mock_posts_inserted[:2]
+    assert page.total is None
+
+    next_params = KeysetParams(cursor=page.next_page, size=2, total="none")
+    last = mock_posts_inserted[1]
+    assert next_params.keyset() == Keyset(last.created_at, last.id, 1)
+    assert next_params.depth == 1
+
+
+def test_keyset_page_last_page_without_next(mock_posts_inserted):
+    params = KeysetParams(cursor=None, size=50, total="exact")
+
+    page = keyset_page(
+        PostOut, mock_posts_inserted, params, len(mock_posts_inserted)
+    )
+
+    assert page.next_page is None
+    assert page.total == len(mock_posts_inserted)
+
+
+def test_keyset_params_first_page():
+    params = KeysetParams(cursor=None, size=10, total="none")
+
+    assert params.keyset() is None
+    assert params.depth == 0
+
+
+@pytest.mark.parametrize("cursor", ["bm90LWpzb24=", "WzEsIDJd"])
+def test_keyset_params_invalid_cursor_raise_400(cursor):
+    params = KeysetParams(cursor=cursor, size=10, total="none")
+
+    with pytest.raises(HTTPException) as exc:
+        params.keyset()
+
+    assert exc.value.status_code == 400
+
+
+def test_keyset_query_seek_past_cursor(mock_post_inserted):
+    after = Keyset(mock_post_inserted.created_at, mock_post_inserted.id)
+
+    sql = compile_sql(
+        select(PostModel)
+        .filter(*keyset_after(PostModel, after))
+        .order_by(*keyset_order(PostModel))
+        .limit(11)
+    )
+
+    assert "(posts.created_at, posts.id) < (" in sql
+    assert "ORDER BY posts.created_at DESC, posts.id DESC" in sql
+    assert "LIMIT 11" in sql
+    assert "OFFSET" not in sql
+    assert keyset_after(PostModel, None) == ()
+
+
+@pytest.mark.asyncio
+async def test_total_none_skip_query():
+    session = session_returning(0)
+
+    assert await BaseRepository(session).total("none", PostModel) is None
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_total_exact_count():
+    session = session_returning(42)
+
+    assert await BaseRepository(session).total("exact", PostModel) == 42
+    assert "count(*)" in str(session.execute.await_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_total_estimate_read_reltuples():
+    session = session_returning(1000)
+
+    assert await BaseRepository(session).total("estimate", PostModel) == 1000
+    query, binds = session.execute.await_args.args
+    assert "pg_class" in str(query)
+    assert binds == {"table": "posts"}
+
+
+@pytest.mark.asyncio
+async def test_total_estimate_never_analyzed_fallback_count():
+    session = session_returning(5)
+    session.execute.return_value.scalar_one_or_none.return_value = -1
+
+    assert await BaseRepository(session).total("estimate", PostModel) == 5
+    assert session.execute.await_count == 2
+    assert "count(*)" in str(session.execute.await_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_total_estimate_filtered_use_planner_rows(user_id):
+    session = session_returning(json.dumps([{"Plan": {"Plan Rows": 7}}]))
+
+    total = await BaseRepository(session).total(
+        "estimate", PostModel, PostModel.user_id == user_id
+    )
+
+    assert total == 7
+    compiled = session.execute.await_args.args[0].compile(
+        dialect=asyncpg.dialect()
+    )
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT posts.id")
+    assert list(compiled.params.values()) == [user_id]
+
+
+@pytest.mark.asyncio
+async def test_total_estimate_search_criteria_keep_bound_params():
+    session = session_returning(json.dumps([{"Plan": {"Plan Rows": 3}}]))
+
+    total = await BaseRepository(session).total(
+        "estimate", PostModel, search_matches("python async")
+    )
+
+    assert total == 3
+    compiled = session.execute.await_args.args[0].compile(
+        dialect=asyncpg.dialect()
+    )
+    assert "websearch_to_tsquery" in str(compiled)
+    assert "python async" in compiled.params.values()
+
+
+def test_rank_keyset_round_trips_float_rank(mock_posts_inserted):
+    params = KeysetParams(cursor=None, size=1, total="none")
+    # a real from ts_rank_cd widened to a python float
+    rank = 0.10000000149011612
+
+    page = keyset_page(
+        PostOut, mock_posts_inserted[:2], params, position=lambda _: rank
+    )
+
+    next_params = KeysetParams(cursor=page.next_page, size=1, total="none")
+    first = mock_posts_inserted[0]
+    assert next_params.rank_keyset() == RankKeyset(rank, first.id, 1)
+    assert next_params.depth == 1
+
+
+def test_rank_keyset_raise_400_for_date_cursor(mock_posts_inserted):
+    params = KeysetParams(cursor=None, size=1, total="none")
+    page = keyset_page(PostOut, mock_posts_inserted[:2], params)
+
+    next_params = KeysetParams(cursor=page.next_page, size=1, total="none")
+
+    with pytest.raises(HTTPException):
+        next_params.rank_keyset()
@@ -15,12 +15,14 @@ from blog_api.contrib.errors import (
     UnableUpdateEntity,
 )
 from blog_api.core.cache import Cache
+from blog_api.core.profiling import SlowQuery, slow_queries
 from blog_api.core.token import gen_jwt
 from blog_api.dependencies.auth import get_current_user
 from blog_api.repositories.comments import CommentsRepository
 from blog_api.repositories.posts import PostsRepository
 from blog_api.repositories.users import UsersRepository
 from blog_api.schemas.users import UserOut
+from tests.factories import page_of
 
 
 @pytest.mark.asyncio
@@ -42,8 +44,8 @@ async def test_get_users_return_success(
     with (
         patch.object(
             UsersRepository,
-            "get_users",
-            AsyncMock(return_value=mock_users_out_inserted),
+            "get_users_page",
+            AsyncMock(return_value=page_of(mock_users_out_inserted)),
         ) as user_mock,
         patch.multiple(
             Cache,
@@ -192,7 +194,7 @@ async def test_get_users_return_success_from_cache(
 
     with patch.multiple(
         Cache,
-        get=AsyncMock(return_value=mock_users_out_inserted),
+        get=AsyncMock(return_value=page_of(mock_users_out_inserted)),
         add=AsyncMock(return_value=None),
     ):
         result = await client.get(
@@ -366,8 +368,8 @@ async def test_get_users_raise_500_cache_error_when_add_from_cache(
     with (
         patch.object(
             UsersRepository,
-            "get_users",
-            AsyncMock(return_value=mock_users_out_inserted),
+            "get_users_page",
+            AsyncMock(return_value=page_of(mock_users_out_inserted)),
         ) as user_mock,
         patch.multiple(
             Cache,
@@ -410,8 +412,8 @@ async def test_get_users_raise_500_encoding_error_when_add_from_cache(
     with (
         patch.object(
             UsersRepository,
-            "get_users",
-            AsyncMock(return_value=mock_users_out_inserted),
+            "get_users_page",
+            AsyncMock(return_value=page_of(mock_users_out_inserted)),
         ) as user_mock,
         patch.multiple(
             Cache,
@@ -1543,8 +1545,8 @@ async def test_update_post_raise_404_post_not_found(
 
     with patch.object(
         PostsRepository,
-        "get_post_by_id",
-        AsyncMock(return_value=None),
+        "update_post",
+        AsyncMock(side_effect=NoResultFound("post_id")),
     ) as mock_post:
         result = await client.put(
             f"{admin_url}/posts/{mock_post_inserted.id}",
@@ -1600,7 +1602,7 @@ async def test_update_post_raise_500_database_error(
 
 
 @pytest.mark.asyncio
-async def test_update_post_raise_500_unable_update_entity_error(
+async def test_update_post_raise_409_unable_update_entity_error(
     client: AsyncClient,
     admin_url: str,
     user_agent: str,
@@ -1617,7 +1619,6 @@ async def test_update_post_raise_500_unable_update_entity_error(
 
     with patch.multiple(
         PostsRepository,
-        get_post_by_id=AsyncMock(return_value=mock_post_inserted),
         update_post=AsyncMock(side_effect=UnableUpdateEntity),
     ):
         result = await client.put(
@@ -1629,7 +1630,7 @@ async def test_update_post_raise_500_unable_update_entity_error(
             json=mock_update_post,
         )
 
-        assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert result.status_code == status.HTTP_409_CONFLICT
         assert result.json() == {"detail": "Unable Update Entity"}
 
     app.dependency_overrides.clear()
@@ -1737,7 +1738,6 @@ async def test_delete_post_raise_404_post_not_found(
     mock_user_out_inserted: UserOut,
     mock_user,
     mock_post_inserted,  # noqa: F811
-    mock_update_post,
 ):
     mock_user_out_inserted.role = "admin"
 
@@ -1747,19 +1747,18 @@ async def test_delete_post_raise_404_post_not_found(
 
     with patch.object(
         PostsRepository,
-        "get_post_by_id",
-        AsyncMock(return_value=None),
+        "delete_post",
+        AsyncMock(side_effect=NoResultFound("post_id")),
     ) as mock_post:
-        result = await client.put(
+        result = await client.delete(
             f"{admin_url}/posts/{mock_post_inserted.id}",
             headers={
                 "Authorization": f"Bearer {jwt}",
                 "User-Agent": user_agent,
             },
-            json=mock_update_post,
         )
 
-        mock_post.assert_awaited_once()
+        mock_post.assert_awaited_once_with(mock_post_inserted.id)
 
         assert result.status_code == status.HTTP_404_NOT_FOUND
         assert result.json() == {"detail": "Post not found"}
@@ -1990,8 +1989,8 @@ async def test_delete_comment_raise_404_not_found(
 
     with patch.object(
         CommentsRepository,
-        "get_comment_by_id",
-        AsyncMock(return_value=None),
+        "delete_comment",
+        AsyncMock(side_effect=NoResultFound("comment_id")),
     ) as mock_comment:
         result = await client.delete(
             f"{admin_url}{comments_url}/{mock_comment_inserted.id}",
@@ -2118,3 +2117,129 @@ async def test_delete_comment_raise_500_generic_error(
         assert result.json() == {"detail": "Generic Error"}
 
     app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_metrics_as_admin_success(
+    client: AsyncClient,
+    mock_user,
+    admin_url,
+    user_agent,
+    mock_user_out_inserted,
+):
+    mock_user.role = "admin"
+    mock_user_out_inserted.role = "admin"
+
+    jwt = gen_jwt(360, mock_user)
+
+    app.dependency_overrides[get_current_user] = lambda: mock_user_out_inserted
+
+    result = await client.get(
+        f"{admin_url}/metrics",
+        headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
+    )
+
+    assert result.status_code == status.HTTP_200_OK
+    assert "cache.pool.in_use" in result.json()["gauges"]
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_metrics_as_user_raise_401_invalid_permissions(
+    client: AsyncClient,
+    mock_user,
+    admin_url,
+    user_agent,
+    mock_user_out_inserted,
+):
+    mock_user.role = "user"
+    mock_user_out_inserted.role = "user"
+
+    jwt = gen_jwt(360, mock_user)
+
+    app.dependency_overrides[get_current_user] = lambda: mock_user_out_inserted
+
+    result = await client.get(
+        f"{admin_url}/metrics",
+        headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
+    )
+
+    assert result.status_code == status.HTTP_401_UNAUTHORIZED
+    assert result.json() == {"detail": "invalid permissions"}
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_slow_queries_as_dev_return_plans(
+    client: AsyncClient,
+    mock_user,
+    admin_url,
+    user_agent,
+    mock_user_out_inserted,
+):
+    mock_user.role = "dev"
+    mock_user_out_inserted.role = "dev"
+
+    jwt = gen_jwt(360, mock_user)
+
+    app.dependency_overrides[get_current_user] = lambda: mock_user_out_inserted
+
+    slow_queries.clear()
+    slow_queries.add(
+        SlowQuery(
+            "SELECT 1",
+            "PostsRepository.get_posts",
+            812.5,
+            1,
+            plan=[{"Plan": {"Node Type": "Result"}}],
+        )
+    )
+
+    result = await client.get(
+        f"{admin_url}/queries/slow",
+        headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
+    )
+
+    [query] = result.json()["queries"]
+
+    assert result.status_code == status.HTTP_200_OK
+    assert query["caller"] == "PostsRepository.get_posts"
+    assert query["plan"] == [{"Plan": {"Node Type": "Result"}}]
+
+    result = await client.delete(
+        f"{admin_url}/queries/slow",
+        headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
+    )
+
+    assert result.status_code == status.HTTP_204_NO_CONTENT
+    assert slow_queries.recent() == []
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_slow_queries_as_user_raise_401_invalid_permissions(
+    client: AsyncClient,
+    mock_user,
+    admin_url,
+    user_agent,
+    mock_user_out_inserted,
+):
+    mock_user.role = "user"
+    mock_user_out_inserted.role = "user"
+
+    jwt = gen_jwt(360, mock_user)
+
+    app.dependency_overrides[get_current_user] = lambda: mock_user_out_inserted
+
+    result = await client.get(
+        f"{admin_url}/queries/slow",
+        headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
+    )
+
+    assert result.status_code == status.HTTP_401_UNAUTHORIZED
+    assert result.json() == {"detail": "invalid permissions"}
+
+    app.dependency_overrides.clear()
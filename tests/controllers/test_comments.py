@@ -11,6 +11,7 @@ from blog_api.contrib.errors import (
     EncodingError,
     GenericError,
     NoResultFound,
+    NotOwner,
     UnableCreateEntity,
     UnableDeleteEntity,
     UnableUpdateEntity,
@@ -19,6 +20,7 @@ from blog_api.core.cache import Cache
 from blog_api.core.token import gen_jwt
 from blog_api.dependencies.auth import get_current_user
 from blog_api.repositories.comments import CommentsRepository
+from tests.factories import page_of
 
 
 @pytest.mark.asyncio
@@ -220,8 +222,8 @@ async def test_get_comments_by_post_id_success(
     with (
         patch.object(
             CommentsRepository,
-            "get_comments_by_post_id",
-            AsyncMock(return_value=mock_comments_inserted_same_post),
+            "get_comments_by_post_id_page",
+            AsyncMock(return_value=page_of(mock_comments_inserted_same_post)),
         ) as mock_comments,
         patch.multiple(
             Cache,
@@ -250,7 +252,7 @@ async def test_get_comments_by_post_id_success_from_cache(
     post_id = mock_comments_inserted_same_post[0].post_id
 
     with patch.object(
-        Cache, "get", AsyncMock(return_value=mock_comments_inserted_same_post)
+        Cache, "get", AsyncMock(return_value=page_of(mock_comments_inserted_same_post))
     ) as mock_comments:
         result = await client.get(
             f"{comments_url}/post/{post_id}",
@@ -348,8 +350,8 @@ async def test_get_comments_by_post_id_raise_500_cache_error_when_add(
     with (
         patch.object(
             CommentsRepository,
-            "get_comments_by_post_id",
-            AsyncMock(return_value=mock_comments_inserted_same_post),
+            "get_comments_by_post_id_page",
+            AsyncMock(return_value=page_of(mock_comments_inserted_same_post)),
         ) as mock_comments,
         patch.multiple(
             Cache,
@@ -379,8 +381,8 @@ async def test_get_comments_by_post_id_raise_500_encoding_error_when_add(
     with (
         patch.object(
             CommentsRepository,
-            "get_comments_by_post_id",
-            AsyncMock(return_value=mock_comments_inserted_same_post),
+            "get_comments_by_post_id_page",
+            AsyncMock(return_value=page_of(mock_comments_inserted_same_post)),
         ) as mock_comments,
         patch.multiple(
             Cache,
@@ -444,8 +446,8 @@ async def test_get_comments_by_user_id_success(
     with (
         patch.object(
             CommentsRepository,
-            "get_comments_by_user_id",
-            AsyncMock(return_value=mock_comments_inserted_same_author),
+            "get_comments_by_user_id_page",
+            AsyncMock(return_value=page_of(mock_comments_inserted_same_author)),
         ) as mock_comments,
         patch.multiple(
             Cache,
@@ -476,7 +478,7 @@ async def test_get_comments_by_user_id_success_from_cache(
     with patch.object(
         Cache,
         "get",
-        AsyncMock(return_value=mock_comments_inserted_same_author),
+        AsyncMock(return_value=page_of(mock_comments_inserted_same_author)),
     ) as mock_comments:
         result = await client.get(
             f"{comments_url}/user/{author_id}",
@@ -621,8 +623,8 @@ async def test_get_comments_by_user_id_raise_500_cache_error_when_add(
     with (
         patch.object(
             CommentsRepository,
-            "get_comments_by_user_id",
-            AsyncMock(return_value=mock_comments_inserted_same_author),
+            "get_comments_by_user_id_page",
+            AsyncMock(return_value=page_of(mock_comments_inserted_same_author)),
         ) as mock_comments,
         patch.multiple(
             Cache,
@@ -652,8 +654,8 @@ async def test_get_comments_by_user_id_raise_500_encoding_error_when_add(
     with (
         patch.object(
             CommentsRepository,
-            "get_comments_by_user_id",
-            AsyncMock(return_value=mock_comments_inserted_same_author),
+            "get_comments_by_user_id_page",
+            AsyncMock(return_value=page_of(mock_comments_inserted_same_author)),
         ) as mock_comments,
         patch.multiple(
             Cache,
@@ -754,8 +756,8 @@ async def test_update_comment_raise_404_not_found(
 
     with patch.object(
         CommentsRepository,
-        "get_comment_by_id",
-        AsyncMock(return_value=None),
+        "update_comment",
+        AsyncMock(side_effect=NoResultFound("comment_id")),
     ):
         result = await client.put(
             f"{comments_url}/{mock_comment_inserted.id}",
@@ -773,7 +775,7 @@ async def test_update_comment_raise_404_not_found(
 
 
 @pytest.mark.asyncio
-async def test_update_comment_raise_401_comment_dont_belongs_current_user(
+async def test_update_comment_raise_403_comment_dont_belongs_current_user(
     client: AsyncClient,
     comments_url: str,
     user_agent: str,
@@ -786,9 +788,9 @@ async def test_update_comment_raise_401_comment_dont_belongs_current_user(
 
     with patch.object(
         CommentsRepository,
-        "get_comment_by_id",
-        AsyncMock(return_value=mock_comment_inserted),
-    ):
+        "update_comment",
+        AsyncMock(side_effect=NotOwner("comment")),
+    ) as mock_update:
         result = await client.put(
             f"{comments_url}/{mock_comment_inserted.id}",
             headers={
@@ -798,7 +800,13 @@ async def test_update_comment_raise_401_comment_dont_belongs_current_user(
             json={"content": "update my comment"},
         )
 
-        assert result.status_code == status.HTTP_401_UNAUTHORIZED
+        mock_update.assert_awaited_once_with(
+            mock_comment_inserted.id,
+            "update my comment",
+            owner_id=mock_user_out_inserted.id,
+        )
+
+        assert result.status_code == status.HTTP_403_FORBIDDEN
         assert result.json() == {
             "detail": "This comment don't belongs current user"
         }
@@ -823,7 +831,6 @@ async def test_update_comment_raise_404_no_result_found_from_update(
 
     with patch.multiple(
         CommentsRepository,
-        get_comment_by_id=AsyncMock(return_value=mock_comment_inserted),
         update_comment=AsyncMock(side_effect=NoResultFound("comment_id")),
     ):
         result = await client.put(
@@ -836,7 +843,7 @@ async def test_update_comment_raise_404_no_result_found_from_update(
         )
 
         assert result.status_code == status.HTTP_404_NOT_FOUND
-        assert result.json() == {"detail": "Result not found with comment_id"}
+        assert result.json() == {"detail": "Comment not found."}
 
     app.dependency_overrides.clear()
 
@@ -997,8 +1004,8 @@ async def test_delete_comment_raise_404_comment_not_found(
 
     with patch.object(
         CommentsRepository,
-        "get_comment_by_id",
-        AsyncMock(return_value=None),
+        "delete_comment",
+        AsyncMock(side_effect=NoResultFound("comment_id")),
     ) as mock_comment:
         result = await client.delete(
             f"{comments_url}/{mock_comment_inserted.id}",
@@ -1017,7 +1024,7 @@ async def test_delete_comment_raise_404_comment_not_found(
 
 
 @pytest.mark.asyncio
-async def test_delete_comment_raise_401_comment_dont_belongs_current_user(
+async def test_delete_comment_raise_403_comment_dont_belongs_current_user(
     client: AsyncClient,
     comments_url: str,
     user_agent: str,
@@ -1030,8 +1037,8 @@ async def test_delete_comment_raise_401_comment_dont_belongs_current_user(
 
     with patch.object(
         CommentsRepository,
-        "get_comment_by_id",
-        AsyncMock(return_value=mock_comment_inserted),
+        "delete_comment",
+        AsyncMock(side_effect=NotOwner("comment")),
     ) as mock_comment:
         result = await client.delete(
             f"{comments_url}/{mock_comment_inserted.id}",
@@ -1041,9 +1048,11 @@ async def test_delete_comment_raise_401_comment_dont_belongs_current_user(
             },
         )
 
-        mock_comment.assert_awaited_once()
+        mock_comment.assert_awaited_once_with(
+            mock_comment_inserted.id, owner_id=mock_user_out_inserted.id
+        )
 
-        assert result.status_code == status.HTTP_401_UNAUTHORIZED
+        assert result.status_code == status.HTTP_403_FORBIDDEN
         assert result.json() == {
             "detail": "This comment don't belongs current user"
         }
@@ -1151,3 +1160,99 @@ async def test_delete_comment_raise_500_generic_error(
         assert result.json() == {"detail": "Generic Error"}
 
     app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_create_comments_bulk_return_item_status(
+    client: AsyncClient,
+    comments_url: str,
+    user_agent: str,
+    mock_user,
+    mock_comment_inserted,
+    mock_user_out_inserted,
+):
+    jwt = gen_jwt(360, mock_user)
+    app.dependency_overrides[get_current_user] = lambda: mock_user_out_inserted
+
+    comment = {
+        "content": mock_comment_inserted.content,
+        "post_id": str(mock_comment_inserted.post_id),
+    }
+
+    with patch.object(
+        CommentsRepository,
+        "create_comments",
+        AsyncMock(return_value=[None, mock_comment_inserted.id]),
+    ) as mock_comments:
+        result = await client.post(
+            f"{comments_url}/bulk",
+            headers={
+                "Authorization": f"Bearer {jwt}",
+                "User-Agent": user_agent,
+            },
+            json=[comment, comment],
+        )
+
+        mock_comments.assert_awaited_once()
+
+    assert result.status_code == status.HTTP_200_OK
+    assert result.json()["created"] == 1
+    assert [item["status"] for item in result.json()["items"]] == [
+        "post_not_found",
+        "created",
+    ]
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_comments_by_post_id_cache_miss_runs_two_statements(
+    client: AsyncClient,
+    comments_url: str,
+    user_agent: str,
+    mock_post_inserted,
+    mock_comments_inserted,
+    read_db,
+    query_counter,
+):
+    # the post lookup, then its comments with titles and authors joined in
+    read_db(
+        [mock_post_inserted.model_dump()],
+        [comment.model_dump() for comment in mock_comments_inserted],
+    )
+
+    with patch.multiple(
+        Cache, get=AsyncMock(return_value=None), add=AsyncMock(return_value=None)
+    ):
+        result = await client.get(
+            f"{comments_url}/post/{mock_post_inserted.id}",
+            headers={"User-Agent": user_agent},
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    assert len(result.json()["items"]) == len(mock_comments_inserted)
+    query_counter.assert_count(2)
+
+
+@pytest.mark.asyncio
+async def test_get_comments_by_user_id_cache_miss_runs_one_statement(
+    client: AsyncClient,
+    comments_url: str,
+    user_agent: str,
+    user_id,
+    mock_comments_inserted,
+    read_db,
+    query_counter,
+):
+    read_db([comment.model_dump() for comment in mock_comments_inserted])
+
+    with patch.multiple(
+        Cache, get=AsyncMock(return_value=None), add=AsyncMock(return_value=None)
+    ):
+        result = await client.get(
+            f"{comments_url}/user/{user_id}",
+            headers={"User-Agent": user_agent},
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    query_counter.assert_count(1)
@@ -10,6 +10,8 @@ from blog_api.contrib.errors import (
     DatabaseError,
     EncodingError,
     GenericError,
+    NoResultFound,
+    NotOwner,
     UnableCreateEntity,
     UnableDeleteEntity,
     UnableUpdateEntity,
@@ -19,8 +21,14 @@ from blog_api.core.token import gen_jwt
 from blog_api.dependencies.auth import get_current_user
 from blog_api.models.users import UserModel
 from blog_api.repositories.posts import PostsRepository
-from blog_api.schemas.posts import PostOut
+from blog_api.schemas.posts import (
+    CategoryCountOut,
+    PostOut,
+    PostSearchOut,
+    PostSummaryOut,
+)
 from blog_api.schemas.users import UserOut
+from tests.factories import page_of
 
 
 @pytest.mark.asyncio
@@ -129,7 +137,7 @@ async def test_create_post_raise_500_database_error(
 
 
 @pytest.mark.asyncio
-async def test_create_post_raise_500_unable_create_entity(
+async def test_create_post_raise_409_unable_create_entity(
     client: AsyncClient,
     posts_url: str,
     user_agent: str,
@@ -159,7 +167,7 @@ async def test_create_post_raise_500_unable_create_entity(
 
         mock_post.assert_awaited_once()
 
-    assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert result.status_code == status.HTTP_409_CONFLICT
     assert result.json() == {
         "detail": "Unable Create Entity: Field value already exists"
     }
@@ -206,11 +214,11 @@ async def test_create_post_raise_500_generic_error(
 
 @pytest.mark.asyncio
 async def test_get_posts_success(
-    client: AsyncClient, posts_url: str, user_agent: str, mock_posts_inserted: PostOut
+    client: AsyncClient, posts_url: str, user_agent: str, mock_post_summaries: list[PostSummaryOut]
 ):
     with (
         patch.object(
-            PostsRepository, "get_posts", AsyncMock(return_value=mock_posts_inserted)
+            PostsRepository, "get_posts_page", AsyncMock(return_value=page_of(mock_post_summaries))
         ) as mock_post,
         patch.multiple(
             Cache, get=AsyncMock(return_value=None), add=AsyncMock(return_value=None)
@@ -273,7 +281,7 @@ async def test_get_posts_raise_500_cache_error_when_add_cache(
 ):
     with (
         patch.object(
-            PostsRepository, "get_posts", AsyncMock(return_value=mock_post_inserted)
+            PostsRepository, "get_posts_page", AsyncMock(return_value=page_of([mock_post_inserted]))
         ) as mock_post,
         patch.multiple(
             Cache,
@@ -298,7 +306,7 @@ async def test_get_posts_raise_500_encoding_error_when_add_cache(
 ):
     with (
         patch.object(
-            PostsRepository, "get_posts", AsyncMock(return_value=mock_post_inserted)
+            PostsRepository, "get_posts_page", AsyncMock(return_value=page_of([mock_post_inserted]))
         ) as mock_post,
         patch.multiple(
             Cache,
@@ -323,7 +331,9 @@ async def test_get_posts_raise_500_generic_error_when_add_cache(
 ):
     with (
         patch.object(
-            PostsRepository, "get_posts", AsyncMock(return_value=mock_post_inserted)
+            PostsRepository,
+            "get_posts_page",
+            AsyncMock(return_value=page_of([mock_post_inserted])),
         ) as mock_post,
         patch.multiple(
             Cache,
@@ -344,11 +354,11 @@ async def test_get_posts_success_from_cache(
     client: AsyncClient,
     posts_url: str,
     user_agent: str,
-    mock_posts_inserted: list[PostOut],
+    mock_post_summaries: list[PostSummaryOut],
 ):
     with patch.multiple(
         Cache,
-        get=AsyncMock(return_value=mock_posts_inserted),
+        get=AsyncMock(return_value=page_of(mock_post_summaries)),
         add=AsyncMock(side_effect=None),
     ):
         result = await client.get(f"{posts_url}/", headers={"User-Agent": user_agent})
@@ -421,6 +431,184 @@ async def test_get_post_by_id_success(
         assert result.json()["title"] == mock_post_inserted.title
 
 
+@pytest.mark.asyncio
+async def test_get_post_by_id_tagged_with_author(
+    client: AsyncClient, posts_url: str, user_agent: str, mock_post_inserted
+):
+    with (
+        patch.object(
+            PostsRepository,
+            "get_post_by_id",
+            AsyncMock(return_value=mock_post_inserted),
+        ),
+        patch.multiple(
+            Cache,
+            get=AsyncMock(return_value=None),
+            add=AsyncMock(return_value=None),
+        ),
+    ):
+        await client.get(
+            f"{posts_url}/{mock_post_inserted.id}",
+            headers={"User-Agent": user_agent},
+        )
+
+        _, _, tags, *_ = Cache.add.await_args.args
+
+    # author counters are embedded, author writes must evict the entry
+    assert tags == [
+        f"post:{mock_post_inserted.id}",
+        f"author:{mock_post_inserted.author_id}",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_post_by_id_cache_hit_runs_no_statements(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_post_inserted,
+    query_counter,
+):
+    with (
+        patch.object(PostsRepository, "get_post_by_id") as mock_post,
+        patch.object(Cache, "get", AsyncMock(return_value=mock_post_inserted)),
+    ):
+        result = await client.get(
+            f"{posts_url}/{mock_post_inserted.id}", headers={"User-Agent": user_agent}
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    mock_post.assert_not_called()
+    query_counter.assert_count(0)
+
+
+def cache_miss():
+    return patch.multiple(
+        Cache,
+        get=AsyncMock(return_value=None),
+        add=AsyncMock(return_value=None),
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_posts_cache_miss_runs_one_statement(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_post_summaries,
+    read_db,
+    query_counter,
+):
+    read_db([post.model_dump() for post in mock_post_summaries])
+
+    with cache_miss():
+        result = await client.get(
+            f"{posts_url}/", headers={"User-Agent": user_agent}
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    assert len(result.json()["items"]) == len(mock_post_summaries)
+    query_counter.assert_count(1)
+
+
+@pytest.mark.asyncio
+async def test_get_posts_by_user_id_cache_miss_runs_one_statement(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    user_id: UUID,
+    mock_post_summaries,
+    read_db,
+    query_counter,
+):
+    read_db([post.model_dump() for post in mock_post_summaries])
+
+    with cache_miss():
+        result = await client.get(
+            f"{posts_url}/user/{user_id}", headers={"User-Agent": user_agent}
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    query_counter.assert_count(1)
+
+
+@pytest.mark.asyncio
+async def test_search_posts_cache_miss_runs_one_statement(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_post_summaries,
+    read_db,
+    query_counter,
+):
+    read_db(
+        [
+            {**post.model_dump(), "rank": 0.5, "snippet": "x"}
+            for post in mock_post_summaries
+        ]
+    )
+
+    with cache_miss():
+        result = await client.get(
+            f"{posts_url}/search",
+            params={"q": "python"},
+            headers={"User-Agent": user_agent},
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    query_counter.assert_count(1)
+
+
+@pytest.mark.asyncio
+async def test_get_post_by_id_cache_miss_runs_one_statement(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_post_inserted,
+    read_db,
+    query_counter,
+):
+    read_db([mock_post_inserted.model_dump()])
+
+    with cache_miss():
+        result = await client.get(
+            f"{posts_url}/{mock_post_inserted.id}",
+            headers={"User-Agent": user_agent},
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    query_counter.assert_count(1)
+
+
+@pytest.mark.asyncio
+async def test_get_posts_batch_cache_miss_runs_one_statement(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_posts_inserted,
+    read_db,
+    query_counter,
+):
+    read_db([post.model_dump() for post in mock_posts_inserted])
+    keys = [f"post:{post.id}" for post in mock_posts_inserted]
+
+    with patch.multiple(
+        Cache,
+        get_many=AsyncMock(return_value=({}, keys)),
+        add_many=AsyncMock(return_value=None),
+    ):
+        result = await client.get(
+            f"{posts_url}/batch",
+            params={"ids": [str(post.id) for post in mock_posts_inserted]},
+            headers={"User-Agent": user_agent},
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    assert len(result.json()) == len(mock_posts_inserted)
+    # one IN query however many posts missed
+    query_counter.assert_count(1)
+
+
 @pytest.mark.asyncio
 async def test_get_post_by_id_raise_404_not_found(
     client: AsyncClient, posts_url: str, user_agent: str
@@ -653,17 +841,17 @@ async def test_get_posts_by_user_id_return_success(
     posts_url: str,
     user_agent: str,
     user_id: UUID,
-    mock_posts_inserted: list[PostOut],
+    mock_post_summaries: list[PostSummaryOut],
 ):
-    for post in mock_posts_inserted:
+    for post in mock_post_summaries:
         post.author_id = user_id
         post.author_username == "Username"
 
     with (
         patch.object(
             PostsRepository,
-            "get_posts_by_user_id",
-            AsyncMock(return_value=mock_posts_inserted),
+            "get_posts_by_user_id_page",
+            AsyncMock(return_value=page_of(mock_post_summaries)),
         ) as mock_post,
         patch.multiple(
             Cache,
@@ -755,16 +943,16 @@ async def test_get_posts_by_user_id_success_from_cache(
     posts_url: str,
     user_agent: str,
     user_id: UUID,
-    mock_posts_inserted: list[PostOut],
+    mock_post_summaries: list[PostSummaryOut],
 ):
-    for post in mock_posts_inserted:
+    for post in mock_post_summaries:
         post.author_id = user_id
         post.author_username == "Username"
 
     with patch.object(
         Cache,
         "get",
-        AsyncMock(return_value=mock_posts_inserted),
+        AsyncMock(return_value=page_of(mock_post_summaries)),
     ) as mock_post:
         result = await client.get(
             f"{posts_url}/user/{user_id}", headers={"User-Agent": user_agent}
@@ -845,7 +1033,7 @@ async def test_get_posts_by_user_id_raise_500_cache_error_from_cache_when_add(
     with (
         patch.object(
             PostsRepository,
-            "get_posts_by_user_id",
+            "get_posts_by_user_id_page",
             AsyncMock(side_effect=mock_posts_inserted),
         ) as mock_post,
         patch.multiple(
@@ -879,7 +1067,7 @@ async def test_get_posts_by_user_id_raise_500_encoding_error_from_cache_when_add
     with (
         patch.object(
             PostsRepository,
-            "get_posts_by_user_id",
+            "get_posts_by_user_id_page",
             AsyncMock(side_effect=mock_posts_inserted),
         ) as mock_post,
         patch.multiple(
@@ -913,8 +1101,8 @@ async def test_get_posts_by_user_id_raise_500_generic_error_from_cache_when_add(
     with (
         patch.object(
             PostsRepository,
-            "get_posts_by_user_id",
-            AsyncMock(side_effect=mock_posts_inserted),
+            "get_posts_by_user_id_page",
+            AsyncMock(return_value=page_of(mock_posts_inserted)),
         ) as mock_post,
         patch.multiple(
             Cache,
@@ -1011,8 +1199,8 @@ async def test_update_post_raise_404_post_not_found(
 
     with patch.object(
         PostsRepository,
-        "get_post_by_id",
-        AsyncMock(return_value=None),
+        "update_post",
+        AsyncMock(side_effect=NoResultFound("post_id")),
     ) as mock_post:
         result = await client.put(
             f"{posts_url}/{mock_post_inserted.id}",
@@ -1020,7 +1208,7 @@ async def test_update_post_raise_404_post_not_found(
             json=mock_update_post,
         )
 
-        mock_post.assert_awaited_once_with(mock_post_inserted.id)
+        mock_post.assert_awaited_once()
 
         assert result.status_code == status.HTTP_404_NOT_FOUND
         assert result.json() == {"detail": "Post not found"}
@@ -1029,7 +1217,7 @@ async def test_update_post_raise_404_post_not_found(
 
 
 @pytest.mark.asyncio
-async def test_update_post_raise_401_current_user_not_own_post(
+async def test_update_post_raise_403_current_user_not_own_post(
     client: AsyncClient,
     posts_url: str,
     user_agent: str,
@@ -1046,8 +1234,8 @@ async def test_update_post_raise_401_current_user_not_own_post(
 
     with patch.object(
         PostsRepository,
-        "get_post_by_id",
-        AsyncMock(return_value=mock_post_inserted),
+        "update_post",
+        AsyncMock(side_effect=NotOwner("post_id")),
     ) as mock_post:
         result = await client.put(
             f"{posts_url}/{mock_post_inserted.id}",
@@ -1055,9 +1243,13 @@ async def test_update_post_raise_401_current_user_not_own_post(
             json=mock_update_post,
         )
 
-        mock_post.assert_awaited_once_with(mock_post_inserted.id)
+        mock_post.assert_awaited_once_with(
+            mock_post_inserted.id,
+            {**mock_update_post, "title": None},
+            owner_id=mock_user_out_inserted.id,
+        )
 
-        assert result.status_code == status.HTTP_401_UNAUTHORIZED
+        assert result.status_code == status.HTTP_403_FORBIDDEN
         assert result.json() == {
             "detail": f"{mock_post_inserted.id} not belongs current user"
         }
@@ -1081,7 +1273,7 @@ async def test_update_post_raise_500_database_error(
 
     with patch.object(
         PostsRepository,
-        "get_post_by_id",
+        "update_post",
         AsyncMock(side_effect=DatabaseError),
     ) as mock_post:
         result = await client.put(
@@ -1090,7 +1282,7 @@ async def test_update_post_raise_500_database_error(
             json=mock_update_post,
         )
 
-        mock_post.assert_awaited_once_with(mock_post_inserted.id)
+        mock_post.assert_awaited_once()
 
         assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert result.json() == {"detail": "Database integrity error"}
@@ -1099,7 +1291,7 @@ async def test_update_post_raise_500_database_error(
 
 
 @pytest.mark.asyncio
-async def test_update_post_raise_500_unable_update_entity_error(
+async def test_update_post_raise_409_unable_update_entity_error(
     client: AsyncClient,
     posts_url: str,
     user_agent: str,
@@ -1114,7 +1306,7 @@ async def test_update_post_raise_500_unable_update_entity_error(
 
     with patch.object(
         PostsRepository,
-        "get_post_by_id",
+        "update_post",
         AsyncMock(side_effect=UnableUpdateEntity),
     ) as mock_post:
         result = await client.put(
@@ -1123,9 +1315,9 @@ async def test_update_post_raise_500_unable_update_entity_error(
             json=mock_update_post,
         )
 
-        mock_post.assert_awaited_once_with(mock_post_inserted.id)
+        mock_post.assert_awaited_once()
 
-        assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert result.status_code == status.HTTP_409_CONFLICT
         assert result.json() == {"detail": "Unable Update Entity"}
 
     app.dependency_overrides.clear()
@@ -1147,7 +1339,7 @@ async def test_update_post_raise_500_generic_error(
 
     with patch.object(
         PostsRepository,
-        "get_post_by_id",
+        "update_post",
         AsyncMock(side_effect=GenericError),
     ) as mock_post:
         result = await client.put(
@@ -1156,7 +1348,7 @@ async def test_update_post_raise_500_generic_error(
             json=mock_update_post,
         )
 
-        mock_post.assert_awaited_once_with(mock_post_inserted.id)
+        mock_post.assert_awaited_once()
 
         assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert result.json() == {"detail": "Generic Error"}
@@ -1210,8 +1402,7 @@ async def test_delete_post_raise_404_post_not_found(
 
     with patch.multiple(
         PostsRepository,
-        get_post_by_id=AsyncMock(return_value=None),
-        delete_post=AsyncMock(return_value=None),
+        delete_post=AsyncMock(side_effect=NoResultFound("post_id")),
     ):
         result = await client.delete(
             f"{posts_url}/{mock_post_inserted.id}",
@@ -1223,7 +1414,7 @@ async def test_delete_post_raise_404_post_not_found(
 
 
 @pytest.mark.asyncio
-async def test_delete_post_raise_401_current_user_not_own_post(
+async def test_delete_post_raise_403_current_user_not_own_post(
     client: AsyncClient,
     posts_url: str,
     user_agent: str,
@@ -1239,15 +1430,14 @@ async def test_delete_post_raise_401_current_user_not_own_post(
 
     with patch.multiple(
         PostsRepository,
-        get_post_by_id=AsyncMock(return_value=mock_post_inserted),
-        delete_post=AsyncMock(return_value=None),
+        delete_post=AsyncMock(side_effect=NotOwner("post_id")),
     ):
         result = await client.delete(
             f"{posts_url}/{mock_post_inserted.id}",
             headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
         )
 
-        assert result.status_code == status.HTTP_401_UNAUTHORIZED
+        assert result.status_code == status.HTTP_403_FORBIDDEN
         assert result.json() == {
             "detail": f"{mock_post_inserted.id} not belongs current user"
         }
@@ -1335,3 +1525,370 @@ async def test_delete_post_raise_500_generic_error(
 
         assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert result.json() == {"detail": "Generic Error"}
+
+
+@pytest.mark.asyncio
+async def test_get_posts_by_ids_load_only_misses(
+    client: AsyncClient, posts_url: str, user_agent: str, mock_posts_inserted
+):
+    cached, missing = mock_posts_inserted[:2]
+
+    with (
+        patch.object(
+            PostsRepository,
+            "get_posts_by_ids",
+            AsyncMock(return_value=[missing]),
+        ) as mock_posts,
+        patch.multiple(
+            Cache,
+            get_many=AsyncMock(
+                return_value=(
+                    {f"post:{cached.id}": cached},
+                    [f"post:{missing.id}"],
+                )
+            ),
+            add_many=AsyncMock(return_value=None),
+        ),
+    ):
+        result = await client.get(
+            f"{posts_url}/batch",
+            params={"ids": [str(cached.id), str(missing.id)]},
+            headers={"User-Agent": user_agent},
+        )
+
+        mock_posts.assert_awaited_once_with([missing.id])
+        Cache.add_many.assert_awaited_once()
+        assert Cache.add_many.await_args.args == (
+            {f"post:{missing.id}": missing},
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    assert [post["id"] for post in result.json()] == [
+        str(cached.id),
+        str(missing.id),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_posts_by_ids_all_cached_skip_database(
+    client: AsyncClient, posts_url: str, user_agent: str, mock_post_inserted
+):
+    with (
+        patch.object(PostsRepository, "get_posts_by_ids") as mock_posts,
+        patch.object(
+            Cache,
+            "get_many",
+            AsyncMock(
+                return_value=(
+                    {f"post:{mock_post_inserted.id}": mock_post_inserted},
+                    [],
+                )
+            ),
+        ),
+    ):
+        result = await client.get(
+            f"{posts_url}/batch",
+            params={"ids": [str(mock_post_inserted.id)]},
+            headers={"User-Agent": user_agent},
+        )
+
+        mock_posts.assert_not_called()
+
+    assert result.status_code == status.HTTP_200_OK
+    assert result.json()[0]["title"] == mock_post_inserted.title
+
+
+@pytest.mark.asyncio
+async def test_get_posts_by_ids_raise_500_cache_error(
+    client: AsyncClient, posts_url: str, user_agent: str, post_id: UUID
+):
+    with patch.object(
+        Cache, "get_many", AsyncMock(side_effect=CacheError("Cache Error"))
+    ):
+        result = await client.get(
+            f"{posts_url}/batch",
+            params={"ids": [str(post_id)]},
+            headers={"User-Agent": user_agent},
+        )
+
+    assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert result.json() == {"detail": "Cache Error"}
+
+
+@pytest.mark.asyncio
+async def test_create_posts_bulk_return_item_status(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_post_inserted: PostOut,
+    mock_user: UserModel,
+    mock_user_out_inserted: UserOut,
+):
+    jwt = gen_jwt(360, mock_user)
+
+    app.dependency_overrides[get_current_user] = lambda: mock_user_out_inserted
+
+    post = {
+        "title": mock_post_inserted.title,
+        "categories": mock_post_inserted.categories,
+        "content": mock_post_inserted.content,
+    }
+
+    with patch.object(
+        PostsRepository,
+        "create_posts",
+        AsyncMock(return_value=[mock_post_inserted.id, None]),
+    ) as mock_posts:
+        result = await client.post(
+            f"{posts_url}/bulk",
+            headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
+            json=[post, post],
+        )
+
+        mock_posts.assert_awaited_once_with(
+            [{**post, "user_id": mock_user_out_inserted.id}] * 2
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    assert result.json() == {
+        "created": 1,
+        "items": [
+            {
+                "index": 0,
+                "status": "created",
+                "id": str(mock_post_inserted.id),
+                "detail": None,
+            },
+            {"index": 1, "status": "duplicate", "id": None, "detail": None},
+        ],
+    }
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_create_posts_bulk_report_failed_chunk(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_post_inserted: PostOut,
+    mock_user: UserModel,
+    mock_user_out_inserted: UserOut,
+):
+    jwt = gen_jwt(360, mock_user)
+
+    app.dependency_overrides[get_current_user] = lambda: mock_user_out_inserted
+
+    with patch.object(
+        PostsRepository, "create_posts", AsyncMock(side_effect=DatabaseError)
+    ):
+        result = await client.post(
+            f"{posts_url}/bulk",
+            headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
+            json=[
+                {
+                    "title": mock_post_inserted.title,
+                    "categories": mock_post_inserted.categories,
+                    "content": mock_post_inserted.content,
+                }
+            ],
+        )
+
+    assert result.status_code == status.HTTP_200_OK
+    assert result.json()["created"] == 0
+    assert result.json()["items"][0]["status"] == "failed"
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_create_posts_bulk_raise_422_empty_body(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_user: UserModel,
+    mock_user_out_inserted: UserOut,
+):
+    jwt = gen_jwt(360, mock_user)
+
+    app.dependency_overrides[get_current_user] = lambda: mock_user_out_inserted
+
+    result = await client.post(
+        f"{posts_url}/bulk",
+        headers={"Authorization": f"Bearer {jwt}", "User-Agent": user_agent},
+        json=[],
+    )
+
+    assert result.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_posts_success(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_post_summaries: list[PostSummaryOut],
+):
+    found = [
+        PostSearchOut(**post.model_dump(), rank=0.5, snippet="<mark>x</mark>")
+        for post in mock_post_summaries
+    ]
+
+    with (
+        patch.object(
+            PostsRepository,
+            "search_posts_page",
+            AsyncMock(return_value=page_of(found)),
+        ) as mock_search,
+        patch.multiple(
+            Cache, get=AsyncMock(return_value=None), add=AsyncMock(return_value=None)
+        ),
+    ):
+        result = await client.get(
+            f"{posts_url}/search",
+            params={"q": "  Python   Async "},
+            headers={"User-Agent": user_agent},
+        )
+
+        assert mock_search.await_args.args[0] == "python async"
+
+    assert result.status_code == status.HTTP_200_OK
+    assert result.json()["items"][0]["snippet"] == "<mark>x</mark>"
+
+
+@pytest.mark.asyncio
+async def test_search_posts_same_query_share_cache_key(
+    client: AsyncClient, posts_url: str, user_agent: str
+):
+    with patch.object(
+        Cache, "get_or_load_page", AsyncMock(side_effect=GenericError)
+    ) as mock_cache:
+        for q in ("Python  async", "python async"):
+            await client.get(
+                f"{posts_url}/search",
+                params={"q": q},
+                headers={"User-Agent": user_agent},
+            )
+
+    first, second = mock_cache.await_args_list
+    assert first.args[0] == second.args[0]
+    assert first.args[0].startswith("search:")
+
+
+@pytest.mark.asyncio
+async def test_search_posts_raise_422_without_query(
+    client: AsyncClient, posts_url: str, user_agent: str
+):
+    result = await client.get(
+        f"{posts_url}/search", headers={"User-Agent": user_agent}
+    )
+
+    assert result.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_get_posts_filter_by_categories(
+    client: AsyncClient,
+    posts_url: str,
+    user_agent: str,
+    mock_post_summaries: list[PostSummaryOut],
+):
+    with (
+        patch.object(
+            PostsRepository,
+            "get_posts_page",
+            AsyncMock(return_value=page_of(mock_post_summaries)),
+        ) as mock_page,
+        patch.multiple(
+            Cache, get=AsyncMock(return_value=None), add=AsyncMock(return_value=None)
+        ),
+    ):
+        result = await client.get(
+            f"{posts_url}/",
+            params={"category": ["web", "python", "web"], "match": "any"},
+            headers={"User-Agent": user_agent},
+        )
+
+        _, categories, match = mock_page.await_args.args
+        assert categories == ["python", "web"]
+        assert match == "any"
+
+    assert result.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_get_posts_filtered_pages_cached_apart_from_feed(
+    client: AsyncClient, posts_url: str, user_agent: str
+):
+    with patch.object(
+        Cache, "get_or_load_page", AsyncMock(side_effect=GenericError)
+    ) as mock_cache:
+        for params in ({}, {"category": "web"}, {"category": "python"}):
+            await client.get(
+                f"{posts_url}/", params=params, headers={"User-Agent": user_agent}
+            )
+
+    keys = [call.args[0] for call in mock_cache.await_args_list]
+    assert keys[0] == "posts:all"
+    assert len(set(keys)) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_posts_raise_422_unknown_match(
+    client: AsyncClient, posts_url: str, user_agent: str
+):
+    result = await client.get(
+        f"{posts_url}/",
+        params={"category": "web", "match": "none"},
+        headers={"User-Agent": user_agent},
+    )
+
+    assert result.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_get_categories_success(
+    client: AsyncClient, posts_url: str, user_agent: str
+):
+    counts = [CategoryCountOut(name="python", posts=3)]
+
+    with (
+        patch.object(
+            PostsRepository, "get_category_counts", AsyncMock(return_value=counts)
+        ) as mock_counts,
+        patch.multiple(
+            Cache, get=AsyncMock(return_value=None), add=AsyncMock(return_value=None)
+        ),
+    ):
+        result = await client.get(
+            f"{posts_url}/categories", headers={"User-Agent": user_agent}
+        )
+
+        mock_counts.assert_awaited_once()
+
+    assert result.status_code == status.HTTP_200_OK
+    assert result.json() == [{"name": "python", "posts": 3}]
+
+
+@pytest.mark.asyncio
+async def test_get_categories_raise_500_database_error(
+    client: AsyncClient, posts_url: str, user_agent: str
+):
+    with (
+        patch.object(
+            PostsRepository,
+            "get_category_counts",
+            AsyncMock(side_effect=DatabaseError),
+        ),
+        patch.multiple(
+            Cache, get=AsyncMock(return_value=None), add=AsyncMock(return_value=None)
+        ),
+    ):
+        result = await client.get(
+            f"{posts_url}/categories", headers={"User-Agent": user_agent}
+        )
+
+    assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert result.json() == {"detail": "Database integrity error"}
@@ -1,15 +1,53 @@
-from unittest.mock import AsyncMock
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
+from blog_api.contrib.pagination import KeysetParams
 from blog_api.contrib.errors import CacheError, GenericError
-from blog_api.core.cache import Cache
-from blog_api.utils.encoding import encode_pydantic_model
+from blog_api.core import cache as cache_module
+from blog_api.core.cache import (
+    Cache,
+    codec,
+    EntryMeta,
+    InstrumentedConnectionPool,
+    INVALIDATE_TAGS_SCRIPT,
+    INVALIDATION_CHANNEL,
+    RELEASE_LOCK_SCRIPT,
+    schema_fingerprint,
+    cache_ttl,
+    close_cache_pool,
+    get_cache_connection,
+    get_cache_pool,
+    key_namespace,
+    l1_ttl,
+    pack,
+    page_key,
+    soft_ttl,
+    ttl_policy,
+    unwrap_entry,
+    versioned_key,
+    wrap_entry,
+)
+from blog_api.core.config import CompressionPolicy, TTLPolicy, get_settings
+from blog_api.core.local_cache import LocalCache
+from blog_api.core.metrics import metrics
+from blog_api.utils.encoding import encode_pydantic_model, encode_value
 from redis.exceptions import (
     ConnectionError,
     TimeoutError,
     AuthenticationError,
     DataError,
 )
+from blog_api.schemas.posts import PostOut
 from blog_api.schemas.users import UserOut
+from blog_api.utils.compression import is_compressed
+from tests.factories import page_of
+from time import time
+
+
+@pytest.fixture(autouse=True)
+def no_ttl_jitter(monkeypatch):
+    monkeypatch.setattr(cache_module.random, "uniform", lambda a, b: 0)
 
 
 @pytest.mark.asyncio
@@ -21,9 +59,9 @@ async def test_add_cache_one_model_return_success(mock_session, mock_user_out_in
     await cache.add(f"user:{mock_user_out_inserted.id}", mock_user_out_inserted)
 
     mock_session.set.assert_called_once_with(
-        f"user:{mock_user_out_inserted.id}",
-        encode_pydantic_model(mock_user_out_inserted),
-        ex=360,
+        versioned_key(f"user:{mock_user_out_inserted.id}"),
+        encode_value(mock_user_out_inserted, codec),
+        ex=600,
     )
 
 
@@ -38,9 +76,9 @@ async def test_add_cache_many_models_return_success(
     await cache.add("user:all", mock_users_out_inserted)
 
     mock_session.set.assert_awaited_once_with(
-        "user:all",
-        encode_pydantic_model(mock_users_out_inserted),
-        ex=360,
+        versioned_key("user:all"),
+        encode_value(mock_users_out_inserted, codec),
+        ex=600,
     )
 
 
@@ -56,9 +94,9 @@ async def test_add_cache_connection_error_return_cache_error(
         await cache.add(f"user:{mock_user_out_inserted.id}", mock_user_out_inserted)
 
     mock_session.set.assert_called_once_with(
-        f"user:{mock_user_out_inserted.id}",
-        encode_pydantic_model(mock_user_out_inserted),
-        ex=360,
+        versioned_key(f"user:{mock_user_out_inserted.id}"),
+        encode_value(mock_user_out_inserted, codec),
+        ex=600,
     )
 
 
@@ -74,9 +112,9 @@ async def test_add_cache_timeout_error_return_cache_error(
         await cache.add(f"user:{mock_user_out_inserted.id}", mock_user_out_inserted)
 
     mock_session.set.assert_called_once_with(
-        f"user:{mock_user_out_inserted.id}",
-        encode_pydantic_model(mock_user_out_inserted),
-        ex=360,
+        versioned_key(f"user:{mock_user_out_inserted.id}"),
+        encode_value(mock_user_out_inserted, codec),
+        ex=600,
     )
 
 
@@ -92,9 +130,9 @@ async def test_add_cache_authentication_error_return_cache_error(
         await cache.add(f"user:{mock_user_out_inserted.id}", mock_user_out_inserted)
 
     mock_session.set.assert_called_once_with(
-        f"user:{mock_user_out_inserted.id}",
-        encode_pydantic_model(mock_user_out_inserted),
-        ex=360,
+        versioned_key(f"user:{mock_user_out_inserted.id}"),
+        encode_value(mock_user_out_inserted, codec),
+        ex=600,
     )
 
 
@@ -108,9 +146,9 @@ async def test_add_data_error_return_cache_error(mock_session, mock_user_out_ins
         await cache.add(f"user:{mock_user_out_inserted.id}", mock_user_out_inserted)
 
     mock_session.set.assert_called_once_with(
-        f"user:{mock_user_out_inserted.id}",
-        encode_pydantic_model(mock_user_out_inserted),
-        ex=360,
+        versioned_key(f"user:{mock_user_out_inserted.id}"),
+        encode_value(mock_user_out_inserted, codec),
+        ex=600,
     )
 
 
@@ -126,9 +164,9 @@ async def test_add_non_mapped_exception_return_generic_error(
         await cache.add(f"user:{mock_user_out_inserted.id}", mock_user_out_inserted)
 
     mock_session.set.assert_called_once_with(
-        f"user:{mock_user_out_inserted.id}",
-        encode_pydantic_model(mock_user_out_inserted),
-        ex=360,
+        versioned_key(f"user:{mock_user_out_inserted.id}"),
+        encode_value(mock_user_out_inserted, codec),
+        ex=600,
     )
 
 
@@ -142,7 +180,9 @@ async def test_get_one_model_success(mock_session, mock_user_out_inserted):
 
     result = await cache.get(f"user:{mock_user_out_inserted.id}", UserOut)
 
-    mock_session.get.assert_called_once_with(f"user:{mock_user_out_inserted.id}")
+    mock_session.get.assert_called_once_with(
+        versioned_key(f"user:{mock_user_out_inserted.id}")
+    )
 
     assert result == mock_user_out_inserted
 
@@ -157,7 +197,7 @@ async def test_get_many_models_success(mock_session, mock_users_out_inserted):
 
     result = await cache.get("user:all", UserOut)
 
-    mock_session.get.assert_called_once_with("user:all")
+    mock_session.get.assert_called_once_with(versioned_key("user:all"))
 
     assert result == mock_users_out_inserted
 
@@ -171,7 +211,7 @@ async def test_get_one_model_return_none(mock_session, mock_users_out_inserted):
     result = await cache.get("user:9345098b-99a3-4494-862d-9cf77d25fe7d", UserOut)
 
     mock_session.get.assert_called_once_with(
-        "user:9345098b-99a3-4494-862d-9cf77d25fe7d"
+        versioned_key("user:9345098b-99a3-4494-862d-9cf77d25fe7d")
     )
 
     assert result is None
@@ -187,7 +227,7 @@ async def test_get_connection_error_return_cache_error(mock_session, user_id):
         await cache.get(f"user:{user_id}", UserOut)
 
     mock_session.get.assert_called_once_with(
-        f"user:{user_id}",
+        versioned_key(f"user:{user_id}"),
     )
 
 
@@ -201,7 +241,7 @@ async def test_get_timeout_error_return_cache_error(mock_session, user_id):
         await cache.get(f"user:{user_id}", UserOut)
 
     mock_session.get.assert_called_once_with(
-        f"user:{user_id}",
+        versioned_key(f"user:{user_id}"),
     )
 
 
@@ -215,7 +255,7 @@ async def test_get_authentication_error_return_cache_error(mock_session, user_id
         await cache.get(f"user:{user_id}", UserOut)
 
     mock_session.get.assert_called_once_with(
-        f"user:{user_id}",
+        versioned_key(f"user:{user_id}"),
     )
 
 
@@ -229,7 +269,7 @@ async def test_get_data_error_return_cache_error(mock_session, user_id):
         await cache.get(f"user:{user_id}", UserOut)
 
     mock_session.get.assert_called_once_with(
-        f"user:{user_id}",
+        versioned_key(f"user:{user_id}"),
     )
 
 
@@ -243,5 +283,948 @@ async def test_get_non_mapped_exception_return_generic_error(mock_session, user_
         await cache.get(f"user:{user_id}", UserOut)
 
     mock_session.get.assert_called_once_with(
-        f"user:{user_id}",
+        versioned_key(f"user:{user_id}"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_cache_pool_return_shared_bounded_pool():
+    await close_cache_pool()
+
+    settings = get_settings()
+    pool = get_cache_pool()
+
+    assert isinstance(pool, InstrumentedConnectionPool)
+    assert pool is get_cache_pool()
+    assert pool.max_connections == settings.CACHE_POOL_MAX_CONNECTIONS
+    assert pool.timeout == settings.CACHE_POOL_TIMEOUT
+    assert pool.connection_kwargs["protocol"] == settings.CACHE_PROTOCOL
+    assert pool.connection_kwargs["port"] == int(settings.CACHE_PORT)
+
+    await close_cache_pool()
+
+    assert cache_module.cache_pool is None
+
+
+@pytest.mark.asyncio
+async def test_get_cache_connection_reuse_pool_across_requests():
+    await close_cache_pool()
+
+    first = get_cache_connection()
+    first_client = await anext(first)
+    await first.aclose()
+
+    second = get_cache_connection()
+    second_client = await anext(second)
+    await second.aclose()
+
+    assert first_client.connection_pool is second_client.connection_pool
+
+    await close_cache_pool()
+
+
+@pytest.mark.asyncio
+async def test_get_from_l1_skip_redis(mock_session, mock_user_out_inserted):
+    mock_session.get = AsyncMock(
+        return_value=encode_pydantic_model(mock_user_out_inserted)
+    )
+    l1 = LocalCache(max_entries=10, max_bytes=1024 * 1024)
+
+    cache = Cache(mock_session, l1)
+
+    first = await cache.get(f"user:{mock_user_out_inserted.id}", UserOut)
+    second = await cache.get(f"user:{mock_user_out_inserted.id}", UserOut)
+
+    mock_session.get.assert_awaited_once_with(
+        versioned_key(f"user:{mock_user_out_inserted.id}")
+    )
+    assert first == mock_user_out_inserted
+    assert second is first
+
+
+@pytest.mark.asyncio
+async def test_get_miss_not_stored_in_l1(mock_session, user_id):
+    mock_session.get = AsyncMock(return_value=None)
+    l1 = LocalCache(max_entries=10, max_bytes=1024 * 1024)
+
+    cache = Cache(mock_session, l1)
+
+    assert await cache.get(f"user:{user_id}", UserOut) is None
+    assert len(l1) == 0
+
+
+@pytest.mark.asyncio
+async def test_add_populate_l1(mock_session, mock_users_out_inserted):
+    mock_session.set = AsyncMock(return_value=None)
+    mock_session.get = AsyncMock()
+    l1 = LocalCache(max_entries=10, max_bytes=1024 * 1024)
+
+    cache = Cache(mock_session, l1)
+
+    await cache.add("user:all", mock_users_out_inserted)
+
+    assert await cache.get("user:all", UserOut) == mock_users_out_inserted
+    assert l1.size == len(encode_value(mock_users_out_inserted, codec))
+    mock_session.get.assert_not_awaited()
+
+
+def test_l1_ttl_never_exceed_redis_ttl(monkeypatch):
+    monkeypatch.setitem(get_settings().CACHE_L1_TTL, "post", 10_000)
+
+    assert l1_ttl("post:all") == get_settings().CACHE_TTL["post"].ttl
+    assert l1_ttl("unknown:1") == get_settings().CACHE_L1_DEFAULT_TTL
+
+
+@pytest.mark.asyncio
+async def test_delete_evict_l1_and_publish_invalidation(mock_user_out_inserted):
+    pipe = MagicMock()
+    pipe.__aenter__.return_value = pipe
+    pipe.execute = AsyncMock(return_value=[1, 1])
+    conn = MagicMock()
+    conn.pipeline.return_value = pipe
+    l1 = LocalCache(max_entries=10, max_bytes=1024 * 1024)
+    key = versioned_key(f"user:{mock_user_out_inserted.id}")
+    l1.set(key, mock_user_out_inserted, size=1, ttl=30)
+
+    cache = Cache(conn, l1)
+
+    await cache.delete(f"user:{mock_user_out_inserted.id}", "user:all")
+
+    assert l1.get(key) is None
+    pipe.delete.assert_called_once_with(key, versioned_key("user:all"))
+    pipe.publish.assert_called_once_with(
+        INVALIDATION_CHANNEL, json.dumps([key, versioned_key("user:all")])
+    )
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_connection_error_return_cache_error():
+    pipe = MagicMock()
+    pipe.__aenter__.return_value = pipe
+    pipe.execute = AsyncMock(side_effect=ConnectionError)
+    conn = MagicMock()
+    conn.pipeline.return_value = pipe
+
+    cache = Cache(conn)
+
+    with pytest.raises(CacheError, match="ConnectionError"):
+        await cache.delete("user:all")
+
+
+@pytest.mark.asyncio
+async def test_get_encoded_with_codec_success(
+    mock_session, mock_users_out_inserted
+):
+    mock_session.get = AsyncMock(
+        return_value=encode_value(mock_users_out_inserted, codec)
+    )
+
+    cache = Cache(mock_session)
+
+    result = await cache.get("user:all", UserOut)
+
+    assert result == mock_users_out_inserted
+
+
+@pytest.mark.asyncio
+async def test_add_compress_payload_above_namespace_threshold(
+    mock_session, mock_posts_inserted, monkeypatch
+):
+    monkeypatch.setitem(
+        get_settings().CACHE_COMPRESSION,
+        "post",
+        CompressionPolicy(threshold=64, level=6),
+    )
+    mock_session.set = AsyncMock(return_value=None)
+    posts = mock_posts_inserted * 20
+
+    cache = Cache(mock_session)
+
+    await cache.add("post:all", posts)
+
+    stored = mock_session.set.await_args.args[1]
+
+    assert is_compressed(stored)
+    assert len(stored) < len(encode_value(posts, codec))
+
+    mock_session.get = AsyncMock(return_value=stored)
+
+    assert await cache.get("post:all", PostOut) == posts
+
+
+@pytest.mark.asyncio
+async def test_l1_charged_uncompressed_size_of_compressed_entry(
+    mock_session, mock_posts_inserted, monkeypatch
+):
+    monkeypatch.setitem(
+        get_settings().CACHE_COMPRESSION,
+        "post",
+        CompressionPolicy(threshold=64, level=6),
+    )
+    mock_session.set = AsyncMock(return_value=None)
+    posts = mock_posts_inserted * 20
+    size = len(encode_value(posts, codec))
+    l1 = LocalCache(max_entries=10, max_bytes=1024 * 1024)
+
+    await Cache(mock_session, l1).add("post:all", posts)
+
+    assert l1.size == size
+
+    mock_session.get = AsyncMock(
+        return_value=mock_session.set.await_args.args[1]
+    )
+    l1.clear()
+
+    await Cache(mock_session, l1).get("post:all", PostOut)
+
+    assert l1.size == size
+
+
+@pytest.mark.asyncio
+async def test_add_not_compress_payload_below_threshold(
+    mock_session, mock_post_inserted, monkeypatch
+):
+    monkeypatch.setitem(
+        get_settings().CACHE_COMPRESSION,
+        "post",
+        CompressionPolicy(threshold=1024 * 1024),
+    )
+    mock_session.set = AsyncMock(return_value=None)
+
+    cache = Cache(mock_session)
+
+    await cache.add(f"post:{mock_post_inserted.id}", mock_post_inserted)
+
+    mock_session.set.assert_awaited_once_with(
+        versioned_key(f"post:{mock_post_inserted.id}"),
+        encode_value(mock_post_inserted, codec),
+        ex=600,
+    )
+
+
+def test_pack_keep_payload_when_compression_does_not_help(monkeypatch):
+    monkeypatch.setitem(
+        get_settings().CACHE_COMPRESSION,
+        "post",
+        CompressionPolicy(threshold=1),
+    )
+
+    assert pack("post:1", b"\x01\x01{}") == b"\x01\x01{}"
+
+
+def test_pack_disabled_namespace():
+    payload = b"a" * 10_000
+
+    assert pack("user:all", payload) == payload
+
+
+@pytest.mark.asyncio
+async def test_add_with_tags_register_key_in_tag_sets(
+    cache_session, mock_post_inserted
+):
+    pipe = cache_session.pipeline.return_value
+    key = f"post:{mock_post_inserted.id}"
+
+    cache = Cache(cache_session)
+
+    await cache.add(key, mock_post_inserted, tags=[key, "feed"])
+
+    pipe.set.assert_called_once_with(
+        versioned_key(key), encode_value(mock_post_inserted, codec), ex=600
+    )
+    assert pipe.sadd.call_args_list == [
+        ((f"tag:{key}", versioned_key(key)),),
+        (("tag:feed", versioned_key(key)),),
+    ]
+    assert pipe.expire.call_count == 4
+    pipe.execute.assert_awaited_once()
+    cache_session.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_delete_tagged_keys(
+    cache_session, mock_post_inserted
+):
+    key = f"post:{mock_post_inserted.id}"
+    script = AsyncMock(return_value=[key.encode(), b"post:all"])
+    cache_session.register_script = MagicMock(return_value=script)
+    l1 = LocalCache(max_entries=10, max_bytes=1024)
+    l1.set(key, mock_post_inserted, size=1, ttl=30)
+
+    cache = Cache(cache_session, l1)
+
+    keys = await cache.invalidate_tags(key, "feed")
+
+    cache_session.register_script.assert_called_once_with(
+        INVALIDATE_TAGS_SCRIPT
+    )
+    script.assert_awaited_once_with(
+        keys=[f"tag:{key}", "tag:feed"], args=[INVALIDATION_CHANNEL]
+    )
+    assert keys == [key, "post:all"]
+    assert l1.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_without_tags_skip_redis(cache_session):
+    cache_session.register_script = MagicMock()
+
+    cache = Cache(cache_session)
+
+    assert await cache.invalidate_tags() == []
+    cache_session.register_script.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_connection_error_return_cache_error(
+    cache_session,
+):
+    script = AsyncMock(side_effect=ConnectionError)
+    cache_session.register_script = MagicMock(return_value=script)
+
+    cache = Cache(cache_session)
+
+    with pytest.raises(CacheError, match="ConnectionError"):
+        await cache.invalidate_tags("feed")
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_later_invalidates_again_after_delay():
+    invalidate = AsyncMock(return_value=[])
+
+    with (
+        patch.object(Cache, "invalidate_tags", invalidate),
+        patch.object(cache_module, "get_cache_pool"),
+    ):
+        cache_module.invalidate_tags_later(0.01, "feed", "post:1")
+
+        invalidate.assert_not_awaited()
+        await asyncio.gather(*cache_module.pending_invalidations)
+
+    invalidate.assert_awaited_once_with("feed", "post:1")
+    assert not cache_module.pending_invalidations
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_return_cached_without_loading(
+    cache_session, mock_posts_inserted
+):
+    cache_session.get = AsyncMock(
+        return_value=encode_value(mock_posts_inserted, codec)
+    )
+    loader = AsyncMock()
+
+    cache = Cache(cache_session)
+
+    result = await cache.get_or_load("post:all", PostOut, loader)
+
+    assert result == mock_posts_inserted
+    loader.assert_not_awaited()
+    cache_session.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_coalesce_concurrent_misses(
+    cache_session, mock_posts_inserted
+):
+    cache_session.get = AsyncMock(return_value=None)
+    cache_session.set = AsyncMock(return_value=True)
+    release = cache_session.register_script.return_value
+    started = asyncio.Event()
+
+    async def loader():
+        started.set()
+        await asyncio.sleep(0.01)
+        return mock_posts_inserted
+
+    loader_mock = AsyncMock(side_effect=loader)
+    coalesced = metrics.counters["cache.coalesced.local"]
+
+    cache = Cache(cache_session)
+
+    results = await asyncio.gather(
+        *(
+            cache.get_or_load("post:all", PostOut, loader_mock, ["feed"])
+            for _ in range(5)
+        )
+    )
+
+    assert results == [mock_posts_inserted] * 5
+    loader_mock.assert_awaited_once()
+    assert metrics.counters["cache.coalesced.local"] == coalesced + 4
+    cache_session.set.assert_awaited_once()
+    assert cache_session.set.await_args.kwargs == {
+        "nx": True,
+        "px": get_settings().CACHE_LOCK_TTL_MS,
+    }
+    cache_session.register_script.assert_called_with(RELEASE_LOCK_SCRIPT)
+    release.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_wait_for_remote_loader(
+    cache_session, mock_posts_inserted, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "CACHE_LOCK_POLL_INTERVAL", 0)
+    cache_session.get = AsyncMock(
+        side_effect=[None, None, encode_value(mock_posts_inserted, codec)]
+    )
+    cache_session.set = AsyncMock(return_value=None)
+    loader = AsyncMock()
+
+    cache = Cache(cache_session)
+
+    result = await cache.get_or_load("post:all", PostOut, loader)
+
+    assert result == mock_posts_inserted
+    loader.assert_not_awaited()
+    cache_session.register_script.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_load_after_remote_lock_wait_timeout(
+    cache_session, mock_posts_inserted, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "CACHE_LOCK_WAIT", 0)
+    cache_session.get = AsyncMock(return_value=None)
+    cache_session.set = AsyncMock(return_value=None)
+    loader = AsyncMock(return_value=mock_posts_inserted)
+
+    cache = Cache(cache_session)
+
+    with patch.object(Cache, "add", AsyncMock()) as mock_add:
+        result = await cache.get_or_load("post:all", PostOut, loader)
+
+    assert result == mock_posts_inserted
+    loader.assert_awaited_once()
+    mock_add.assert_awaited_once_with("post:all", mock_posts_inserted, ())
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_not_cache_missing_value(cache_session, post_id):
+    cache_session.get = AsyncMock(return_value=None)
+    cache_session.set = AsyncMock(return_value=True)
+
+    cache = Cache(cache_session)
+
+    with patch.object(Cache, "add", AsyncMock()) as mock_add:
+        result = await cache.get_or_load(
+            f"post:{post_id}", PostOut, AsyncMock(return_value=None)
+        )
+
+    assert result is None
+    mock_add.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_build_tags_from_loaded_value(
+    cache_session, mock_posts_inserted
+):
+    cache_session.get = AsyncMock(return_value=None)
+    cache_session.set = AsyncMock(return_value=True)
+
+    cache = Cache(cache_session)
+
+    with patch.object(Cache, "add", AsyncMock()) as mock_add:
+        await cache.get_or_load(
+            "post:all",
+            PostOut,
+            AsyncMock(return_value=mock_posts_inserted),
+            tags=lambda posts: [f"post:{post.id}" for post in posts],
+        )
+
+    mock_add.assert_awaited_once_with(
+        "post:all",
+        mock_posts_inserted,
+        [f"post:{post.id}" for post in mock_posts_inserted],
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_lock_error_return_cache_error(cache_session):
+    cache_session.get = AsyncMock(return_value=None)
+    cache_session.set = AsyncMock(side_effect=ConnectionError)
+
+    cache = Cache(cache_session)
+
+    with pytest.raises(CacheError, match="ConnectionError"):
+        await cache.get_or_load("post:all", PostOut, AsyncMock())
+
+
+def test_wrap_entry_round_trip(mock_posts_inserted):
+    payload = encode_value(mock_posts_inserted, codec)
+    meta = EntryMeta(soft_expires_at=1234.5, delta=0.25)
+
+    assert unwrap_entry(wrap_entry(payload, meta)) == (meta, payload)
+    assert unwrap_entry(payload) == (None, payload)
+    assert unwrap_entry(None) == (None, None)
+
+
+def test_entry_meta_refresh_after_soft_expiry():
+    assert EntryMeta(time() - 1, 0).should_refresh(1.0)
+    assert not EntryMeta(time() + 60, 0).should_refresh(1.0)
+
+
+def test_entry_meta_refresh_early_for_slow_values():
+    meta = EntryMeta(time() + 5, delta=2)
+
+    # -log(1 - 0.99) * 2 ~ 9.2s of headroom
+    with patch("blog_api.core.cache.random.random", return_value=0.99):
+        assert meta.should_refresh(1.0)
+
+    with patch("blog_api.core.cache.random.random", return_value=0.01):
+        assert not meta.should_refresh(1.0)
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_store_soft_expiry_with_refresh(
+    cache_session, mock_posts_inserted
+):
+    cache_session.get = AsyncMock(return_value=None)
+    cache_session.set = AsyncMock(return_value=True)
+
+    cache = Cache(cache_session)
+
+    with patch.object(Cache, "add", AsyncMock()) as mock_add:
+        await cache.get_or_load(
+            "posts:all",
+            PostOut,
+            AsyncMock(return_value=mock_posts_inserted),
+            refresh=AsyncMock(),
+        )
+
+    key, value, tags, meta = mock_add.await_args.args
+    assert (key, value, tags) == ("posts:all", mock_posts_inserted, ())
+    assert meta.soft_expires_at == pytest.approx(
+        time() + get_settings().CACHE_SOFT_TTL["posts"], abs=1
+    )
+
+
+def test_soft_ttl_set_for_namespaces_with_refresh_loaders():
+    soft = get_settings().CACHE_SOFT_TTL
+
+    assert soft_ttl("posts:all") == soft["posts"] < ttl_policy("posts").ttl
+    assert soft_ttl("search:abc") == soft["search"] < ttl_policy("search").ttl
+    assert "post" not in soft
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_serve_stale_and_refresh_in_background(
+    cache_session, mock_posts_inserted
+):
+    stale = wrap_entry(
+        encode_value(mock_posts_inserted, codec), EntryMeta(time() - 1, 0.1)
+    )
+    cache_session.get = AsyncMock(return_value=stale)
+    cache_session.set = AsyncMock(return_value=True)
+    loader = AsyncMock()
+    refresh = AsyncMock(return_value=mock_posts_inserted[:1])
+    refreshes = metrics.counters["cache.refreshes"]
+
+    cache = Cache(cache_session)
+
+    result = await cache_module.asyncio.wait_for(
+        cache.get_or_load("post:all", PostOut, loader, refresh=refresh),
+        1,
+    )
+    await cache_module.refreshing["post:all"]
+
+    assert result == mock_posts_inserted
+    loader.assert_not_awaited()
+    refresh.assert_awaited_once()
+    assert metrics.counters["cache.refreshes"] == refreshes + 1
+    assert "post:all" not in cache_module.refreshing
+
+    lock_call, add_call = cache_session.set.await_args_list
+    assert lock_call.args[0] == f"lock:{versioned_key('post:all')}"
+    _, payload = unwrap_entry(add_call.args[1])
+    assert payload == encode_value(mock_posts_inserted[:1], codec)
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_miss_during_refresh_use_own_loader(
+    cache_session, mock_posts_inserted
+):
+    stale = wrap_entry(
+        encode_value(mock_posts_inserted, codec), EntryMeta(time() - 1, 0.1)
+    )
+    # stale hit schedules the refresh, then the key is invalidated
+    cache_session.get = AsyncMock(side_effect=[stale, None])
+    cache_session.set = AsyncMock(return_value=True)
+    released = cache_module.asyncio.Event()
+
+    async def slow_refresh():
+        await released.wait()
+        return mock_posts_inserted
+
+    loader = AsyncMock(return_value=mock_posts_inserted[:1])
+
+    cache = Cache(cache_session)
+
+    await cache.get_or_load("post:all", PostOut, loader, refresh=slow_refresh)
+    assert "post:all" in cache_module.refreshing
+
+    result = await cache_module.asyncio.wait_for(
+        cache.get_or_load("post:all", PostOut, loader, refresh=slow_refresh),
+        1,
+    )
+    released.set()
+    await cache_module.refreshing["post:all"]
+
+    assert result == mock_posts_inserted[:1]
+    loader.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_fresh_hit_skip_refresh(
+    cache_session, mock_posts_inserted
+):
+    fresh = wrap_entry(
+        encode_value(mock_posts_inserted, codec), EntryMeta(time() + 60, 0)
+    )
+    cache_session.get = AsyncMock(return_value=fresh)
+    refresh = AsyncMock()
+
+    cache = Cache(cache_session)
+
+    result = await cache.get_or_load(
+        "post:all", PostOut, AsyncMock(), refresh=refresh
+    )
+
+    assert result == mock_posts_inserted
+    assert "post:all" not in cache_module.inflight
+    refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_refresh_skip_when_locked_elsewhere(cache_session):
+    cache_session.set = AsyncMock(return_value=None)
+    refresh = AsyncMock()
+
+    cache = Cache(cache_session)
+
+    await cache.refresh("post:all", refresh)
+
+    refresh.assert_not_awaited()
+    cache_session.register_script.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refresh_error_counted_not_raised(cache_session):
+    cache_session.set = AsyncMock(return_value=True)
+    errors = metrics.counters["cache.refresh_errors"]
+
+    cache = Cache(cache_session)
+
+    await cache.refresh("post:all", AsyncMock(side_effect=RuntimeError))
+
+    assert metrics.counters["cache.refresh_errors"] == errors + 1
+    cache_session.register_script.return_value.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_many_report_misses(cache_session, mock_posts_inserted):
+    first, second = mock_posts_inserted[:2]
+    cache_session.mget = AsyncMock(
+        return_value=[
+            encode_value(first, codec),
+            None,
+            pack(f"post:{second.id}", encode_value(second, codec)),
+        ]
+    )
+
+    cache = Cache(cache_session)
+
+    found, misses = await cache.get_many(
+        ["post:1", "post:2", f"post:{second.id}", "post:1"], PostOut
+    )
+
+    cache_session.mget.assert_awaited_once_with(
+        [
+            versioned_key("post:1"),
+            versioned_key("post:2"),
+            versioned_key(f"post:{second.id}"),
+        ]
+    )
+    assert found == {"post:1": first, f"post:{second.id}": second}
+    assert misses == ["post:2"]
+
+
+@pytest.mark.asyncio
+async def test_get_many_serve_l1_before_redis(
+    cache_session, mock_posts_inserted
+):
+    l1 = LocalCache(max_entries=10, max_bytes=1 << 20)
+    l1.set(versioned_key("post:1"), mock_posts_inserted[0], 1, 10)
+    cache_session.mget = AsyncMock(return_value=[None])
+
+    cache = Cache(cache_session, l1)
+
+    found, misses = await cache.get_many(["post:1", "post:2"], PostOut)
+
+    cache_session.mget.assert_awaited_once_with([versioned_key("post:2")])
+    assert found == {"post:1": mock_posts_inserted[0]}
+    assert misses == ["post:2"]
+
+
+@pytest.mark.asyncio
+async def test_get_many_all_from_l1_skip_redis(
+    cache_session, mock_posts_inserted
+):
+    l1 = LocalCache(max_entries=10, max_bytes=1 << 20)
+    l1.set(versioned_key("post:1"), mock_posts_inserted[0], 1, 10)
+
+    cache = Cache(cache_session, l1)
+
+    found, misses = await cache.get_many(["post:1"], PostOut)
+
+    assert found == {"post:1": mock_posts_inserted[0]}
+    assert misses == []
+    cache_session.mget.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_many_connection_error_return_cache_error(cache_session):
+    cache_session.mget = AsyncMock(side_effect=ConnectionError)
+
+    cache = Cache(cache_session)
+
+    with pytest.raises(CacheError, match="ConnectionError"):
+        await cache.get_many(["post:1"], PostOut)
+
+
+@pytest.mark.asyncio
+async def test_add_many_pipeline_set_with_tags(
+    cache_session, mock_posts_inserted
+):
+    pipe = cache_session.pipeline.return_value
+    values = {f"post:{post.id}": post for post in mock_posts_inserted[:2]}
+
+    cache = Cache(cache_session)
+
+    await cache.add_many(values, tags=lambda post: [f"post:{post.id}"])
+
+    cache_session.pipeline.assert_called_once_with(transaction=False)
+    assert [call.args for call in pipe.set.call_args_list] == [
+        (versioned_key(key), pack(key, encode_value(post, codec)))
+        for key, post in values.items()
+    ]
+    assert all(
+        call.kwargs == {"ex": 600} for call in pipe.set.call_args_list
+    )
+    assert [call.args for call in pipe.sadd.call_args_list] == [
+        (f"tag:{key}", versioned_key(key)) for key in values
+    ]
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_add_many_empty_skip_redis(cache_session):
+    cache = Cache(cache_session)
+
+    await cache.add_many({})
+
+    cache_session.pipeline.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_add_many_connection_error_return_cache_error(
+    cache_session, mock_posts_inserted
+):
+    cache_session.pipeline.return_value.execute = AsyncMock(
+        side_effect=ConnectionError
+    )
+
+    cache = Cache(cache_session)
+
+    with pytest.raises(CacheError, match="ConnectionError"):
+        await cache.add_many({"post:1": mock_posts_inserted[0]})
+
+
+@pytest.mark.asyncio
+async def test_delete_many_single_round_trip(cache_session):
+    pipe = cache_session.pipeline.return_value
+
+    cache = Cache(cache_session)
+
+    await cache.delete_many(["post:1", "post:2", "post:1"])
+
+    pipe.delete.assert_called_once_with(
+        versioned_key("post:1"), versioned_key("post:2")
+    )
+    pipe.execute.assert_awaited_once()
+
+
+def test_versioned_key_prefix_namespace_with_schema_fingerprint():
+    key = versioned_key("post:all")
+
+    assert key == f"post@{schema_fingerprint(PostOut)}:all"
+    assert versioned_key(key) == key
+    assert key_namespace(key) == "post"
+    assert versioned_key("unknown:1") == "unknown:1"
+
+
+def test_schema_fingerprint_change_with_model_schema():
+    class PostOutV2(PostOut):
+        views: int = 0
+
+    assert len(schema_fingerprint(PostOut)) == 8
+    assert schema_fingerprint(PostOut) == schema_fingerprint(PostOut)
+    assert schema_fingerprint(PostOutV2) != schema_fingerprint(PostOut)
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_lock_versioned_key(cache_session, mock_posts_inserted):
+    cache_session.get = AsyncMock(return_value=None)
+    cache_session.set = AsyncMock(return_value=True)
+
+    cache = Cache(cache_session)
+
+    await cache.get_or_load(
+        "post:all", PostOut, AsyncMock(return_value=mock_posts_inserted)
+    )
+
+    lock_call, add_call = cache_session.set.await_args_list
+    assert lock_call.args[0] == f"lock:{versioned_key('post:all')}"
+    assert add_call.args[0] == versioned_key("post:all")
+
+
+def test_cache_ttl_per_namespace_with_jitter(monkeypatch):
+    monkeypatch.setattr(cache_module.random, "uniform", lambda a, b: b)
+
+    assert cache_ttl("user:1") == 660
+    assert cache_ttl("comment:1") == 198
+    assert cache_ttl("unknown:1") == 396
+
+
+def test_cache_ttl_jitter_bounded_by_policy(monkeypatch):
+    monkeypatch.setitem(
+        get_settings().CACHE_TTL, "post", TTLPolicy(ttl=100, jitter=0.5)
+    )
+    monkeypatch.setattr(cache_module.random, "uniform", lambda a, b: b)
+
+    assert cache_ttl("post:all") == 150
+
+
+@pytest.mark.asyncio
+async def test_never_cached_namespace_skip_redis(
+    cache_session, mock_posts_inserted
+):
+    loader = AsyncMock(return_value=mock_posts_inserted)
+
+    cache = Cache(cache_session)
+
+    with patch.dict(
+        get_settings().CACHE_TTL, {"post": TTLPolicy(ttl=None)}
+    ):
+        await cache.add("post:all", mock_posts_inserted)
+        assert await cache.get("post:all", PostOut) is None
+        found, misses = await cache.get_many(["post:all"], PostOut)
+        result = await cache.get_or_load("post:all", PostOut, loader)
+
+    assert (found, misses) == ({}, ["post:all"])
+    assert result == mock_posts_inserted
+    loader.assert_awaited_once()
+    cache_session.set.assert_not_awaited()
+    cache_session.get.assert_not_awaited()
+    cache_session.mget.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_sliding_namespace_reset_ttl(
+    cache_session, mock_user_out_inserted
+):
+    cache_session.getex = AsyncMock(
+        return_value=encode_value(mock_user_out_inserted, codec)
     )
+    key = f"user:{mock_user_out_inserted.id}"
+
+    cache = Cache(cache_session)
+
+    with patch.dict(
+        get_settings().CACHE_TTL, {"user": TTLPolicy(ttl=60, sliding=True)}
+    ):
+        result = await cache.get(key, UserOut)
+
+    assert result == mock_user_out_inserted
+    cache_session.getex.assert_awaited_once_with(versioned_key(key), ex=60)
+    cache_session.get.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_add_sliding_namespace_keep_tag_sets(
+    cache_session, mock_user_out_inserted
+):
+    pipe = cache_session.pipeline.return_value
+    key = f"user:{mock_user_out_inserted.id}"
+
+    cache = Cache(cache_session)
+
+    with patch.dict(
+        get_settings().CACHE_TTL, {"user": TTLPolicy(ttl=60, sliding=True)}
+    ):
+        await cache.add(key, mock_user_out_inserted, tags=[key])
+
+    pipe.set.assert_called_once_with(
+        versioned_key(key), encode_value(mock_user_out_inserted, codec), ex=60
+    )
+    pipe.persist.assert_called_once_with(f"tag:{key}")
+    pipe.expire.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_page_cache_window(cache_session, mock_posts_inserted):
+    params = KeysetParams(cursor="YWJj", size=2, total="none")
+    page = page_of(mock_posts_inserted[:2], params)
+    key = "post:all:page:YWJj:2:none"
+    cache_session.get = AsyncMock(return_value=None)
+    cache_session.set = AsyncMock(return_value=True)
+
+    cache = Cache(cache_session)
+
+    with patch.object(KeysetParams, "depth", 1):
+        result = await cache.get_or_load_page(
+            "post:all", PostOut, params, AsyncMock(return_value=page)
+        )
+
+    assert result == page
+    assert page_key("post:all", params) == key
+    cache_session.get.assert_awaited_once_with(versioned_key(key))
+    _, add_call = cache_session.set.await_args_list
+    assert add_call.args == (versioned_key(key), encode_value(page, codec))
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_page_decode_cached_page(
+    cache_session, mock_posts_inserted
+):
+    params = KeysetParams(cursor=None, size=2, total="exact")
+    page = page_of(mock_posts_inserted, params)
+    cache_session.get = AsyncMock(return_value=encode_value(page, codec))
+    loader = AsyncMock()
+
+    cache = Cache(cache_session)
+
+    result = await cache.get_or_load_page("post:all", PostOut, params, loader)
+
+    assert result == page
+    assert result.next_page is not None
+    loader.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_page_skip_cache_past_max_page(cache_session):
+    params = KeysetParams(cursor=None, size=50, total="none")
+    loader = AsyncMock()
+
+    cache = Cache(cache_session)
+
+    with patch.object(
+        KeysetParams, "depth", get_settings().CACHE_MAX_PAGE
+    ):
+        await cache.get_or_load_page("post:all", PostOut, params, loader)
+
+    loader.assert_awaited_once()
+    cache_session.get.assert_not_awaited()
+    cache_session.set.assert_not_awaited()
@@ -0,0 +1,212 @@
+from time import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from blog_api.core.config import get_settings
+from blog_api.core import database
+from blog_api.core.database import (
+    PRIMARY_UNTIL_COOKIE,
+    InstrumentedQueuePool,
+    ReplicaSet,
+    engine,
+    engine_options,
+    queue_pool,
+    read_engine,
+)
+from blog_api.core.metrics import metrics
+
+settings = get_settings()
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_engine_pool_uses_settings():
+    pool = engine.sync_engine.pool
+
+    assert isinstance(pool, InstrumentedQueuePool)
+    assert pool.size() == settings.DB_POOL_SIZE
+    assert pool._max_overflow == settings.DB_POOL_MAX_OVERFLOW
+    assert pool._timeout == settings.DB_POOL_TIMEOUT
+    assert pool._recycle == settings.DB_POOL_RECYCLE
+    assert pool._pre_ping is settings.DB_POOL_PRE_PING
+
+
+def test_engine_options_pass_asyncpg_settings():
+    custom = settings.model_copy(
+        update={
+            "DB_STATEMENT_CACHE_SIZE": 0,
+            "DB_STATEMENT_TIMEOUT_MS": 5000,
+            "DB_APPLICATION_NAME": "blog_api-worker",
+        }
+    )
+
+    connect_args = engine_options(custom)["connect_args"]
+
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["server_settings"] == {
+        "application_name": "blog_api-worker",
+        "statement_timeout": "5000",
+    }
+
+
+def test_engine_options_without_statement_timeout():
+    custom = settings.model_copy(update={"DB_STATEMENT_TIMEOUT_MS": None})
+
+    server_settings = engine_options(custom)["connect_args"]["server_settings"]
+
+    assert "statement_timeout" not in server_settings
+
+
+def test_pool_events_count_checkouts_and_checkins():
+    dispatch = engine.sync_engine.pool.dispatch
+
+    dispatch.checkout(None, None, None)
+    dispatch.checkout(None, None, None)
+    dispatch.checkin(None, None)
+
+    assert metrics.counters["db.pool.checkouts"] == 2
+    assert metrics.counters["db.pool.checkins"] == 1
+
+
+def test_pool_records_wait_time():
+    pool = engine.sync_engine.pool
+
+    with patch.object(AsyncAdaptedQueuePool, "connect", return_value="conn"):
+        assert pool.connect() == "conn"
+
+    assert metrics.summaries["db.pool.wait_seconds"].count == 1
+
+
+def test_pool_counts_timeouts():
+    pool = engine.sync_engine.pool
+
+    with patch.object(
+        AsyncAdaptedQueuePool, "connect", side_effect=TimeoutError
+    ):
+        with pytest.raises(TimeoutError):
+            pool.connect()
+
+    assert metrics.counters["db.pool.timeouts"] == 1
+    assert "db.pool.wait_seconds" not in metrics.summaries
+
+
+def test_queue_pool_rejects_pool_without_counts():
+    static = create_async_engine(settings.postgres_dsn, poolclass=NullPool)
+
+    with pytest.raises(TypeError):
+        queue_pool(static)
+
+
+def test_pool_gauges_are_published():
+    gauges = metrics.snapshot()["gauges"]
+
+    assert gauges["db.pool.size"] == settings.DB_POOL_SIZE
+    assert gauges["db.pool.checked_out"] == 0
+
+
+def replica_set(count: int = 2) -> ReplicaSet:
+    return ReplicaSet(
+        engine,
+        [f"postgresql+asyncpg://u:p@replica{i}/db" for i in range(count)],
+    )
+
+
+def request_with_cookies(cookies: dict[str, str]) -> MagicMock:
+    request = MagicMock()
+    request.cookies = cookies
+    return request
+
+
+def test_pick_without_replicas_returns_primary():
+    assert ReplicaSet(engine, []).pick() is engine
+    assert "db.replica.fallbacks" not in metrics.counters
+
+
+def test_pick_prefers_least_busy_healthy_replica():
+    replicas = replica_set(3)
+    busy, idle, down = replicas.replicas
+    down.healthy = False
+
+    with (
+        patch.object(busy, "checked_out", return_value=4),
+        patch.object(idle, "checked_out", return_value=1),
+    ):
+        assert replicas.pick() is idle.engine
+
+    assert metrics.counters[f"db.replica.{idle.name}.reads"] == 1
+
+
+def test_pick_falls_back_to_primary_when_no_replica_is_healthy():
+    replicas = replica_set()
+    for replica in replicas.replicas:
+        replica.healthy = False
+
+    assert replicas.pick() is engine
+    assert metrics.counters["db.replica.fallbacks"] == 1
+
+
+async def test_check_marks_lagging_replica_unhealthy():
+    replica = replica_set(1).replicas[0]
+    result = MagicMock()
+    result.scalar_one.return_value = settings.DB_REPLICA_MAX_LAG + 1
+    conn = AsyncMock()
+    conn.execute.return_value = result
+    replica.engine = MagicMock()
+    replica.engine.connect.return_value.__aenter__.return_value = conn
+
+    await ReplicaSet.check(None, replica)
+
+    assert not replica.healthy
+    assert replica.lag == settings.DB_REPLICA_MAX_LAG + 1
+
+
+async def test_check_marks_unreachable_replica_unhealthy():
+    replica = replica_set(1).replicas[0]
+
+    replica.engine = MagicMock()
+    replica.engine.connect.side_effect = OSError("refused")
+
+    await ReplicaSet.check(None, replica)
+
+    assert not replica.healthy
+    assert metrics.counters[f"db.replica.{replica.name}.check_errors"] == 1
+
+
+def test_disconnect_errors_take_replica_out_of_rotation():
+    replica = replica_set(1).replicas[0]
+
+    replica.on_error(MagicMock(is_disconnect=False))
+    assert replica.healthy
+
+    replica.on_error(MagicMock(is_disconnect=True))
+    assert not replica.healthy
+
+
+def test_read_engine_keeps_recent_writers_on_primary():
+    replicas = replica_set(1)
+    request = request_with_cookies({PRIMARY_UNTIL_COOKIE: str(time() + 5)})
+
+    with patch.object(database, "replicas", replicas):
+        assert read_engine(request) is engine
+        assert read_engine() is replicas.replicas[0].engine
+
+    assert metrics.counters["db.replica.read_your_writes"] == 1
+
+
+@pytest.mark.parametrize("cookie", [str(time() - 1), "garbage"])
+def test_read_engine_ignores_expired_or_invalid_cookie(cookie: str):
+    replicas = replica_set(1)
+    request = request_with_cookies({PRIMARY_UNTIL_COOKIE: cookie})
+
+    with patch.object(database, "replicas", replicas):
+        assert read_engine(request) is replicas.replicas[0].engine
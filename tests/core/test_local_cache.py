@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from blog_api.core.local_cache import LocalCache
+
+
+def test_get_return_value_success():
+    cache = LocalCache(max_entries=10, max_bytes=1024)
+
+    cache.set("post:all", ["post"], size=10, ttl=30)
+
+    assert cache.get("post:all") == ["post"]
+    assert cache.size == 10
+
+
+def test_get_return_none_when_missing():
+    cache = LocalCache(max_entries=10, max_bytes=1024)
+
+    assert cache.get("post:all") is None
+
+
+def test_get_return_none_when_expired():
+    cache = LocalCache(max_entries=10, max_bytes=1024)
+
+    with patch("blog_api.core.local_cache.monotonic", return_value=100):
+        cache.set("post:all", ["post"], size=10, ttl=30)
+
+    with patch("blog_api.core.local_cache.monotonic", return_value=131):
+        assert cache.get("post:all") is None
+
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_set_evict_least_recently_used_by_entries():
+    cache = LocalCache(max_entries=2, max_bytes=1024)
+
+    cache.set("user:1", 1, size=1, ttl=30)
+    cache.set("user:2", 2, size=1, ttl=30)
+    cache.get("user:1")
+    cache.set("user:3", 3, size=1, ttl=30)
+
+    assert cache.get("user:2") is None
+    assert cache.get("user:1") == 1
+    assert cache.get("user:3") == 3
+
+
+def test_set_evict_least_recently_used_by_bytes():
+    cache = LocalCache(max_entries=10, max_bytes=100)
+
+    cache.set("user:1", 1, size=60, ttl=30)
+    cache.set("user:2", 2, size=60, ttl=30)
+
+    assert cache.get("user:1") is None
+    assert cache.get("user:2") == 2
+    assert cache.size == 60
+
+
+def test_set_skip_values_bigger_than_max_bytes():
+    cache = LocalCache(max_entries=10, max_bytes=100)
+
+    cache.set("post:all", [], size=101, ttl=30)
+
+    assert cache.get("post:all") is None
+    assert cache.size == 0
+
+
+def test_set_replace_existing_key_size():
+    cache = LocalCache(max_entries=10, max_bytes=100)
+
+    cache.set("user:1", 1, size=60, ttl=30)
+    cache.set("user:1", 2, size=40, ttl=30)
+
+    assert cache.get("user:1") == 2
+    assert cache.size == 40
+
+
+def test_delete_and_clear():
+    cache = LocalCache(max_entries=10, max_bytes=100)
+
+    cache.set("user:1", 1, size=10, ttl=30)
+    cache.set("user:2", 2, size=10, ttl=30)
+    cache.delete("user:1", "user:3")
+
+    assert cache.get("user:1") is None
+    assert cache.size == 10
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.size == 0
@@ -0,0 +1,46 @@
+from blog_api.core.metrics import Metrics
+
+
+def test_incr_counter_success():
+    registry = Metrics()
+
+    registry.incr("cache.hits")
+    registry.incr("cache.hits", 2)
+
+    assert registry.snapshot()["counters"] == {"cache.hits": 3}
+
+
+def test_observe_summary_success():
+    registry = Metrics()
+
+    registry.observe("cache.pool.wait_seconds", 0.5)
+    registry.observe("cache.pool.wait_seconds", 1.5)
+
+    summary = registry.snapshot()["summaries"]["cache.pool.wait_seconds"]
+
+    assert summary == {"count": 2, "total": 2.0, "max": 1.5, "avg": 1.0}
+
+
+def test_gauge_is_evaluated_on_snapshot():
+    registry = Metrics()
+    value = {"in_use": 1}
+
+    registry.gauge("cache.pool.in_use", lambda: value["in_use"])
+    value["in_use"] = 4
+
+    assert registry.snapshot()["gauges"] == {"cache.pool.in_use": 4}
+
+
+def test_reset_keep_gauges():
+    registry = Metrics()
+
+    registry.incr("cache.hits")
+    registry.observe("cache.pool.wait_seconds", 0.5)
+    registry.gauge("cache.pool.in_use", lambda: 0)
+    registry.reset()
+
+    assert registry.snapshot() == {
+        "counters": {},
+        "summaries": {},
+        "gauges": {"cache.pool.in_use": 0},
+    }
@@ -0,0 +1,181 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from blog_api.core import profiling
+from blog_api.core.metrics import metrics
+from blog_api.core.profiling import (
+    EXPLAIN,
+    QueryStats,
+    caller,
+    explain,
+    instrument_queries,
+    is_explainable,
+    request_queries,
+    slow_queries,
+)
+from blog_api.repositories.posts import PostsRepository
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    metrics.reset()
+    slow_queries.clear()
+    yield
+    metrics.reset()
+    slow_queries.clear()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_queries(SimpleNamespace(sync_engine=engine))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def slow_threshold():
+    def set_threshold(ms: float | None, explain: bool = False):
+        settings = profiling.settings.model_copy(
+            update={
+                "DB_SLOW_QUERY_MS": ms,
+                "DB_EXPLAIN_SLOW_QUERIES": explain,
+            }
+        )
+        return patch.object(profiling, "settings", settings)
+
+    return set_threshold
+
+
+def test_statement_counted_for_request_and_caller(engine, slow_threshold):
+    stats = QueryStats()
+    request_token = request_queries.set(stats)
+    caller_token = caller.set("PostsRepository.get_posts")
+
+    try:
+        with slow_threshold(None), engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    finally:
+        caller.reset(caller_token)
+        request_queries.reset(request_token)
+
+    summaries = metrics.snapshot()["summaries"]
+    method = summaries["db.query.PostsRepository.get_posts.seconds"]
+
+    assert stats.count == 2
+    assert stats.seconds > 0
+    assert method["count"] == 2
+    assert not slow_queries.recent()
+
+
+def test_statement_over_threshold_logged_as_slow(engine, slow_threshold):
+    token = caller.set("PostsRepository.search_posts")
+
+    try:
+        with slow_threshold(0), engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        caller.reset(token)
+
+    [entry] = slow_queries.recent()
+
+    assert entry.statement == "SELECT 1"
+    assert entry.caller == "PostsRepository.search_posts"
+    assert entry.plan is None
+    assert metrics.counters["db.slow_queries"] == 1
+
+
+def test_failed_statement_does_not_leak_start_time(engine, slow_threshold):
+    with slow_threshold(None), engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+
+        conn.execute(text("SELECT 1"))
+
+        assert conn.info["query_start"] == []
+
+
+def test_explain_failure_is_swallowed_on_slow_select(engine, slow_threshold):
+    # sqlite has no EXPLAIN (ANALYZE): the plan is dropped, the query is not
+    with slow_threshold(0, explain=True), engine.connect() as conn:
+        result = conn.execute(text("SELECT 1"))
+
+        assert result.scalar_one() == 1
+
+    [entry] = slow_queries.recent()
+
+    assert entry.plan is None
+    assert metrics.counters["db.explain_errors"] == 1
+
+
+@pytest.mark.parametrize(
+    "statement, many, expected",
+    [
+        ("SELECT posts.id FROM posts", False, True),
+        ("\n  select 1", False, True),
+        ("SELECT 1", True, False),
+        ("UPDATE posts SET title = $1", False, False),
+        ("WITH d AS (DELETE FROM posts RETURNING id) SELECT 1", False, False),
+    ],
+)
+def test_only_single_selects_are_explained(statement, many, expected):
+    assert is_explainable(statement, many) is expected
+
+
+def test_explain_runs_in_savepoint_and_parse_plan():
+    cursor = MagicMock()
+    cursor.fetchone.return_value = ('[{"Plan": {"Node Type": "Seq Scan"}}]',)
+    conn = MagicMock()
+    conn.connection.cursor.return_value = cursor
+
+    plan = explain(conn, "SELECT 1 WHERE $1", (True,))
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+
+    assert plan == [{"Plan": {"Node Type": "Seq Scan"}}]
+    assert statements[0].startswith("SAVEPOINT")
+    assert statements[1] == EXPLAIN + "SELECT 1 WHERE $1"
+    assert statements[2].startswith("RELEASE SAVEPOINT")
+    cursor.close.assert_called_once()
+
+
+def test_explain_error_rolls_back_to_savepoint():
+    cursor = MagicMock()
+    cursor.execute.side_effect = [None, Exception("boom"), None]
+    conn = MagicMock()
+    conn.connection.cursor.return_value = cursor
+
+    assert explain(conn, "SELECT 1", ()) is None
+    assert (
+        cursor.execute.call_args_list[-1]
+        .args[0]
+        .startswith("ROLLBACK TO SAVEPOINT")
+    )
+
+
+async def test_repository_methods_set_caller():
+    seen = []
+
+    class ProbeRepository(PostsRepository):
+        async def probe(self):
+            seen.append(caller.get())
+            await self.inner()
+            seen.append(caller.get())
+
+        async def inner(self):
+            seen.append(caller.get())
+
+    await ProbeRepository(MagicMock()).probe()
+
+    assert seen == [
+        "ProbeRepository.probe",
+        "ProbeRepository.inner",
+        "ProbeRepository.probe",
+    ]
+    assert caller.get() is None
+    assert PostsRepository.get_posts.__wrapped__
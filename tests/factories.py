@@ -2,6 +2,10 @@ from datetime import datetime
 
 from faker import Faker
 from faker.providers import date_time
+from fastapi_pagination.cursor import CursorPage
+from pydantic import BaseModel
+
+from blog_api.contrib.pagination import KeysetParams, keyset_page
 
 from blog_api.core.security import gen_hash
 
@@ -146,3 +150,10 @@ def many_comments_data() -> list[dict]:
 
 def single_comment_update() -> str:
     return fake.text()
+
+
+def page_of(
+    items: list[BaseModel], params: KeysetParams | None = None
+) -> CursorPage:
+    params = params or KeysetParams(cursor=None, size=50, total="exact")
+    return keyset_page(type(items[0]), items, params, len(items))
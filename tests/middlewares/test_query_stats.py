@@ -0,0 +1,39 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from blog_api.core.metrics import metrics
+from blog_api.core.profiling import request_queries
+from blog_api.middlewares.query_stats import QueryStatsMiddleware
+
+app = FastAPI()
+app.add_middleware(QueryStatsMiddleware)
+
+
+@app.get("/items")
+async def list_items():
+    # what the engine listeners do for every statement of the request
+    stats = request_queries.get()
+    stats.add(0.002, 10)
+    stats.add(0.003, 1)
+    return []
+
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+async def test_request_totals_reported_in_server_timing(client: AsyncClient):
+    metrics.reset()
+
+    result = await client.get("/items")
+
+    summaries = metrics.snapshot()["summaries"]
+
+    assert result.headers["Server-Timing"] == 'db;dur=5.0;desc="2 queries"'
+    assert summaries["db.request.queries"]["total"] == 2
+    assert request_queries.get() is None
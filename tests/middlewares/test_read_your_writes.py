@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Response, status
+from httpx import ASGITransport, AsyncClient
+
+from blog_api.core.database import PRIMARY_UNTIL_COOKIE
+from blog_api.middlewares import read_your_writes
+from blog_api.middlewares.read_your_writes import ReadYourWritesMiddleware
+
+app = FastAPI()
+app.add_middleware(ReadYourWritesMiddleware)
+
+
+@app.get("/items")
+async def list_items():
+    return []
+
+
+@app.post("/items", status_code=status.HTTP_201_CREATED)
+async def create_item():
+    return {}
+
+
+@app.delete("/items")
+async def delete_item(response: Response):
+    response.status_code = status.HTTP_404_NOT_FOUND
+    return {}
+
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+def with_replicas():
+    settings = read_your_writes.settings.model_copy(
+        update={"DB_REPLICA_DSNS": ["postgresql+asyncpg://u:p@replica/db"]}
+    )
+    with patch.object(read_your_writes, "settings", settings):
+        yield
+
+
+async def test_successful_write_pins_reads_to_primary(
+    client: AsyncClient, with_replicas
+):
+    result = await client.post("/items")
+
+    assert result.status_code == status.HTTP_201_CREATED
+    assert PRIMARY_UNTIL_COOKIE in result.cookies
+
+
+async def test_reads_and_failed_writes_do_not_pin(
+    client: AsyncClient, with_replicas
+):
+    read = await client.get("/items")
+    failed = await client.delete("/items")
+
+    assert PRIMARY_UNTIL_COOKIE not in read.cookies
+    assert PRIMARY_UNTIL_COOKIE not in failed.cookies
+
+
+async def test_no_cookie_without_replicas(client: AsyncClient):
+    result = await client.post("/items")
+
+    assert PRIMARY_UNTIL_COOKIE not in result.cookies
@@ -0,0 +1,37 @@
+from typing import AsyncGenerator
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from blog_api.core.config import get_settings
+
+# every test migrates its own copy of the schema from scratch
+SCHEMA = "migrations_test"
+
+
+@pytest.fixture
+async def postgres() -> AsyncGenerator[AsyncEngine, None]:
+    # the .env.test database, these tests are skipped when it is not running
+    engine = create_async_engine(
+        get_settings().postgres_dsn,
+        connect_args={
+            "timeout": 2,
+            "server_settings": {"search_path": SCHEMA},
+        },
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"
+            )
+            await conn.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+    except (OSError, DBAPIError):
+        await engine.dispose()
+        pytest.skip("no PostgreSQL test database")
+
+    yield engine
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql(f"DROP SCHEMA {SCHEMA} CASCADE")
+    await engine.dispose()
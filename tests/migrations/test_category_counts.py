@@ -0,0 +1,50 @@
+from sqlalchemy import select, text
+
+from blog_api.migrations import MIGRATIONS
+from blog_api.migrations.m0005_posts_categories_index import (
+    CATEGORIES_INDEX,
+)
+from blog_api.migrations.m0006_category_counts import migration
+from blog_api.migrations.runner import upgrade
+from blog_api.models.categories import category_counts
+from tests.postgres import index_is_valid, insert_post, insert_user
+
+
+async def counts(conn) -> dict[str, int]:
+    result = await conn.execute(
+        select(category_counts.c.category, category_counts.c.posts)
+    )
+    return dict(result.tuples().all())
+
+
+async def test_upgrade_counts_existing_posts_once_per_category(postgres):
+    await upgrade(postgres, MIGRATIONS, target=migration.version - 1)
+    async with postgres.begin() as conn:
+        user_id = await insert_user(conn)
+        await insert_post(conn, user_id, "a", categories=["py", "web", "py"])
+        await insert_post(conn, user_id, "b", categories=["py"])
+        await insert_post(conn, user_id, "c")
+
+    await upgrade(postgres, MIGRATIONS, target=migration.version)
+
+    async with postgres.connect() as conn:
+        assert await counts(conn) == {"py": 2, "web": 1}
+        assert await index_is_valid(conn, CATEGORIES_INDEX.name)
+
+
+async def test_trigger_applies_net_change_of_post_writes(postgres):
+    await upgrade(postgres, MIGRATIONS, target=migration.version)
+    async with postgres.begin() as conn:
+        user_id = await insert_user(conn)
+        first = await insert_post(conn, user_id, "a", categories=["py", "web"])
+        second = await insert_post(conn, user_id, "b", categories=["web"])
+
+        await conn.execute(
+            text("UPDATE posts SET categories = :categories WHERE id = :id"),
+            {"categories": ["py", "rust"], "id": first},
+        )
+        await conn.execute(
+            text("DELETE FROM posts WHERE id = :id"), {"id": second}
+        )
+
+        assert await counts(conn) == {"py": 1, "rust": 1, "web": 0}
@@ -0,0 +1,65 @@
+from sqlalchemy import text
+
+from blog_api.migrations import MIGRATIONS
+from blog_api.migrations.m0007_counters import COUNTERS, migration
+from blog_api.migrations.runner import downgrade, upgrade
+from blog_api.models.posts import PostModel
+from blog_api.models.users import UserModel
+from tests.postgres import insert_post, insert_user, is_nullable
+
+FILENODES = (
+    "SELECT pg_relation_filenode('posts'), pg_relation_filenode('users')"
+)
+
+
+async def test_counters_added_to_existing_rows_without_rewrite(postgres):
+    await upgrade(postgres, MIGRATIONS, target=migration.version - 1)
+    async with postgres.begin() as conn:
+        user_id = await insert_user(conn)
+        await insert_post(conn, user_id, "content")
+        before = (await conn.execute(text(FILENODES))).one()
+
+    await upgrade(postgres, MIGRATIONS, target=migration.version)
+
+    async with postgres.connect() as conn:
+        after = (await conn.execute(text(FILENODES))).one()
+        result = await conn.execute(
+            text(
+                "SELECT posts.comments_count, users.posts_count, "
+                "users.comments_count FROM posts JOIN users "
+                "ON users.id = posts.user_id"
+            )
+        )
+
+        assert after == before
+        assert result.one() == (0, 0, 0)
+        for table, columns in COUNTERS.items():
+            for column in columns:
+                assert not await is_nullable(conn, table, column)
+
+
+async def test_downgrade_drops_counter_columns(postgres):
+    await upgrade(postgres, MIGRATIONS, target=migration.version)
+
+    await downgrade(postgres, MIGRATIONS, target=migration.version - 1)
+
+    async with postgres.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT count(*) FROM information_schema.columns "
+                "WHERE table_schema = current_schema() "
+                "AND column_name LIKE '%\\_count'"
+            )
+        )
+
+        assert result.scalar_one() == 0
+
+
+def test_models_declare_counter_columns():
+    for column in (
+        PostModel.__table__.c.comments_count,
+        UserModel.__table__.c.posts_count,
+        UserModel.__table__.c.comments_count,
+    ):
+        assert not column.nullable
+        assert column.server_default.arg == "0"
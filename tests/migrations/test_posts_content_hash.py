@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from blog_api.migrations import MIGRATIONS
+from blog_api.migrations.m0003_posts_content_hash import (
+    CONTENT_HASH_INDEX,
+    migration,
+)
+from blog_api.migrations.runner import upgrade
+from blog_api.models.posts import PostModel
+from tests.postgres import (
+    index_is_valid,
+    insert_post,
+    insert_user,
+    is_nullable,
+)
+
+
+async def test_upgrade_backfills_digest_of_existing_posts(postgres):
+    await upgrade(postgres, MIGRATIONS, target=migration.version - 1)
+    async with postgres.begin() as conn:
+        user_id = await insert_user(conn)
+        for i in range(3):
+            await insert_post(conn, user_id, f"post {i}")
+
+    await upgrade(postgres, MIGRATIONS, target=migration.version)
+
+    async with postgres.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT count(*) FROM posts "
+                "WHERE content_hash = md5(content)::uuid"
+            )
+        )
+
+        assert result.scalar_one() == 3
+        assert not await is_nullable(conn, "posts", "content_hash")
+        assert await index_is_valid(conn, CONTENT_HASH_INDEX.name)
+
+
+async def test_duplicate_content_rejected_by_digest_alone(postgres):
+    await upgrade(postgres, MIGRATIONS, target=migration.version)
+    async with postgres.begin() as conn:
+        user_id = await insert_user(conn)
+        await insert_post(conn, user_id, "x" * 10_000)
+        result = await conn.execute(
+            text("SELECT count(*) FROM pg_constraint WHERE conname = :name"),
+            {"name": "posts_content_key"},
+        )
+
+    assert result.scalar_one() == 0
+
+    with pytest.raises(IntegrityError):
+        async with postgres.begin() as conn:
+            await insert_post(conn, user_id, "x" * 10_000)
+
+
+def test_content_is_no_longer_unique():
+    table = PostModel.__table__
+    unique = [
+        [c.name for c in index.columns]
+        for index in table.indexes
+        if index.unique
+    ]
+
+    assert not table.c.content.unique
+    assert unique == [["content_hash"]]
+
+
+def test_insert_leaves_content_hash_to_the_database():
+    statement = PostModel.__table__.insert().values(
+        title="title", content="x" * 10_000, user_id=None
+    )
+
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "content_hash" not in sql
@@ -0,0 +1,63 @@
+from sqlalchemy import select
+
+from blog_api.migrations import MIGRATIONS
+from blog_api.migrations.m0008_posts_excerpt import (
+    BACKFILL,
+    EXCERPT_LENGTH,
+    NOT_NULL,
+    migration,
+)
+from blog_api.migrations.runner import upgrade
+from blog_api.models.posts import PostModel
+from tests.postgres import insert_post, insert_user, is_nullable
+
+
+def test_not_null_is_set_only_after_backfill():
+    steps = migration.upgrade
+
+    assert not migration.transactional
+    assert steps.index(BACKFILL) < steps.index(NOT_NULL)
+    assert MIGRATIONS[migration.version - 1] is migration
+
+
+async def test_excerpts_collapse_whitespace_and_cut_on_words(postgres):
+    short = "  a   short\n\npost  "
+    long = " ".join(["word"] * 100)
+
+    await upgrade(postgres, MIGRATIONS, target=migration.version - 1)
+    async with postgres.begin() as conn:
+        user_id = await insert_user(conn)
+        await insert_post(conn, user_id, short)
+        await insert_post(conn, user_id, long)
+
+    await upgrade(postgres, MIGRATIONS, target=migration.version)
+
+    async with postgres.begin() as conn:
+        await insert_post(conn, user_id, "written\tafter")
+        result = await conn.execute(
+            select(PostModel.content, PostModel.excerpt)
+        )
+        excerpts = dict(result.tuples().all())
+
+        assert not await is_nullable(conn, "posts", "excerpt")
+
+    cut = excerpts.pop(long)
+
+    assert excerpts == {
+        short: "a short post",
+        "written\tafter": "written after",
+    }
+    assert cut.endswith("…")
+    assert len(cut) <= EXCERPT_LENGTH + 1
+    assert cut[:-1] == " ".join(["word"] * len(cut[:-1].split()))
+
+
+def test_excerpt_is_left_to_the_database_on_insert():
+    column = PostModel.__table__.c.excerpt
+    statement = PostModel.__table__.insert().values(
+        title="title", content="content", user_id=None
+    )
+
+    assert "excerpt" not in str(statement.compile())
+    assert column.server_default is not None
+    assert not column.nullable
@@ -0,0 +1,65 @@
+from sqlalchemy import func, literal, select
+
+from blog_api.migrations import MIGRATIONS
+from blog_api.migrations.m0004_posts_search import SEARCH_INDEX, migration
+from blog_api.migrations.runner import upgrade
+from blog_api.models.posts import PostModel
+from blog_api.repositories.posts import (
+    HEADLINE_OPTIONS,
+    SEARCH_CONFIG,
+    escape_html,
+    search_matches,
+)
+from tests.postgres import index_is_valid, insert_post, insert_user
+
+
+async def test_search_finds_backfilled_and_new_posts_title_first(postgres):
+    await upgrade(postgres, MIGRATIONS, target=migration.version - 1)
+    async with postgres.begin() as conn:
+        user_id = await insert_user(conn)
+        in_content = await insert_post(conn, user_id, "the cat sat", "Birds")
+        await insert_post(conn, user_id, "nothing to see", "Dogs")
+
+    await upgrade(postgres, MIGRATIONS, target=migration.version)
+
+    async with postgres.begin() as conn:
+        in_title = await insert_post(conn, user_id, "about pets", "Cats")
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, "cats")
+        result = await conn.execute(
+            select(PostModel.id)
+            .filter(search_matches("cats"))
+            .order_by(func.ts_rank_cd(PostModel.search, query).desc())
+        )
+
+        assert list(result.scalars()) == [in_title, in_content]
+        assert await index_is_valid(conn, SEARCH_INDEX.name)
+
+
+async def test_headline_marks_matches_in_escaped_content(postgres):
+    content = "<script>alert(1)</script> <b>cats</b> & dogs"
+    headline = func.ts_headline(
+        SEARCH_CONFIG,
+        escape_html(literal(content)),
+        func.websearch_to_tsquery(SEARCH_CONFIG, "cats"),
+        HEADLINE_OPTIONS,
+    )
+
+    async with postgres.connect() as conn:
+        snippet = (await conn.execute(select(headline))).scalar_one()
+
+    markup = snippet.replace("<mark>cats</mark>", "")
+
+    assert "<mark>cats</mark>" in snippet
+    assert "<" not in markup and ">" not in markup
+    assert "&lt;/script&gt;" in markup
+
+
+def test_search_document_is_never_loaded_or_written():
+    column = PostModel.__table__.c.search
+    statement = PostModel.__table__.insert().values(
+        title="title", content="content", user_id=None
+    )
+
+    assert "search" not in str(statement.compile())
+    assert column.server_default is not None
+    assert PostModel.__mapper__.attrs["search"].deferred
@@ -0,0 +1,285 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from blog_api.contrib.errors import SchemaVersionError
+from blog_api.migrations import MIGRATIONS, runner
+from blog_api.migrations.m0002_secondary_indexes import INDEXES
+from blog_api.migrations.runner import (
+    ConcurrentIndex,
+    Migration,
+    batched_update,
+    check_order,
+    current_version,
+    downgrade,
+    head,
+    set_not_null,
+    upgrade,
+    verify,
+)
+from tests.postgres import index_is_valid
+
+
+class FakeConnection:
+    def __init__(self, log: list[str], version: int | None):
+        self.log = log
+        self.version = version
+        self.isolation_level = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def execution_options(self, isolation_level: str):
+        self.isolation_level = isolation_level
+        return self
+
+    async def exec_driver_sql(self, statement: str):
+        self.log.append(" ".join(statement.split()))
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        result = MagicMock()
+        if "to_regclass" in sql:
+            result.scalar.return_value = (
+                None if self.version is None else "schema_version"
+            )
+        elif "max(version)" in sql:
+            result.scalar_one.return_value = self.version
+        elif sql.startswith("INSERT"):
+            self.version = params["version"]
+            self.log.append(f"version={self.version}")
+        elif sql.startswith("DELETE"):
+            self.version = params["version"] - 1
+            self.log.append(f"version={self.version}")
+        return result
+
+
+class FakeEngine:
+    def __init__(self, version: int | None = None):
+        self.log: list[str] = []
+        self.lock = FakeConnection(self.log, version)
+
+    def connect(self):
+        # the first connection holds the advisory lock and the version table
+        if self.lock.isolation_level is None:
+            return self.lock
+        return FakeConnection(self.log, None)
+
+    def begin(self):
+        return FakeConnection(self.log, None)
+
+
+def migration(version: int, transactional: bool = True) -> Migration:
+    return Migration(
+        version=version,
+        name=f"m{version}",
+        upgrade=(f"up {version}",),
+        downgrade=(f"down {version}",),
+        transactional=transactional,
+    )
+
+
+def test_registered_migrations_are_ordered():
+    check_order(MIGRATIONS)
+
+    assert head(MIGRATIONS) == len(MIGRATIONS)
+
+
+def test_check_order_rejects_gaps():
+    with pytest.raises(ValueError):
+        check_order([migration(1), migration(3)])
+
+
+async def test_secondary_indexes_built_valid_and_dropped(postgres):
+    await upgrade(postgres, MIGRATIONS, target=2)
+
+    async with postgres.connect() as conn:
+        for index in INDEXES:
+            assert await index_is_valid(conn, index.name)
+
+    await downgrade(postgres, MIGRATIONS, target=0)
+
+    async with postgres.connect() as conn:
+        for index in INDEXES:
+            assert await index_is_valid(conn, index.name) is None
+
+
+async def test_concurrent_index_rebuilds_failed_build(postgres):
+    index = ConcurrentIndex("ux_t", "t (c)", unique=True)
+
+    async with postgres.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("CREATE TABLE t (c INTEGER)")
+        await conn.exec_driver_sql("INSERT INTO t VALUES (1), (1)")
+        with pytest.raises(IntegrityError):
+            await index(conn)
+        await conn.exec_driver_sql("DELETE FROM t")
+
+        assert await index_is_valid(conn, index.name) is False
+
+        await index(conn)
+
+        assert await index_is_valid(conn, index.name)
+
+
+def index_state(valid: bool | None) -> MagicMock:
+    conn = MagicMock()
+    conn.execute = AsyncMock(
+        return_value=MagicMock(**{"scalar.return_value": valid})
+    )
+    conn.exec_driver_sql = AsyncMock()
+    return conn
+
+
+async def test_concurrent_index_rebuilds_invalid_leftover():
+    index = ConcurrentIndex("ux_t", "t (c)", unique=True)
+    conn = index_state(False)
+
+    await index(conn)
+
+    assert conn.execute.await_args.args[1] == {"name": "ux_t"}
+    assert [c.args[0] for c in conn.exec_driver_sql.await_args_list] == [
+        "DROP INDEX CONCURRENTLY IF EXISTS ux_t",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_t ON t (c)",
+    ]
+
+
+@pytest.mark.parametrize("valid", [True, None])
+async def test_concurrent_index_keeps_valid_or_missing_index(valid):
+    index = ConcurrentIndex("ix_t", "t (c)")
+    conn = index_state(valid)
+
+    await index(conn)
+
+    conn.exec_driver_sql.assert_awaited_once_with(index.create)
+
+
+def backfill_state(*results: int | bool) -> MagicMock:
+    # ints are UPDATE row counts, bools whether rows are still pending
+    conn = MagicMock()
+    conn.exec_driver_sql = AsyncMock(
+        side_effect=[
+            (
+                MagicMock(**{"scalar.return_value": r})
+                if isinstance(r, bool)
+                else MagicMock(rowcount=r)
+            )
+            for r in results
+        ]
+    )
+    return conn
+
+
+async def test_batched_update_ends_when_no_row_is_pending():
+    conn = backfill_state(5000, 12, 0, False)
+
+    await batched_update("t", "c", "f(x)", batch_size=5000)(conn)
+
+    statements = [c.args[0] for c in conn.exec_driver_sql.await_args_list]
+    assert statements[0] == (
+        "UPDATE t SET c = f(x) WHERE id IN (SELECT id FROM t WHERE c IS NULL "
+        "LIMIT 5000 FOR UPDATE SKIP LOCKED)"
+    )
+    assert statements[1:3] == [statements[0]] * 2
+    assert statements[3].startswith("SELECT EXISTS")
+
+
+async def test_batched_update_retries_rows_skipped_while_locked(monkeypatch):
+    monkeypatch.setattr(runner, "BACKFILL_RETRY_SECONDS", 0)
+    conn = backfill_state(0, True, 0, True, 7, 0, False)
+
+    await batched_update("t", "c", "f(x)")(conn)
+
+    assert conn.exec_driver_sql.await_count == 7
+
+
+async def test_set_not_null_validates_check_before_constraint():
+    log: list[str] = []
+
+    await set_not_null("t", "c")(FakeConnection(log, None))
+
+    assert log == [
+        "ALTER TABLE t DROP CONSTRAINT IF EXISTS t_c_set",
+        "ALTER TABLE t ADD CONSTRAINT t_c_set CHECK (c IS NOT NULL) NOT VALID",
+        "ALTER TABLE t VALIDATE CONSTRAINT t_c_set",
+        "ALTER TABLE t ALTER COLUMN c SET NOT NULL",
+        "ALTER TABLE t DROP CONSTRAINT t_c_set",
+    ]
+
+
+async def test_current_version_without_version_table():
+    conn = FakeConnection([], None)
+
+    assert await current_version(conn) == 0
+
+
+async def test_verify_raises_when_schema_is_behind():
+    conn = FakeConnection([], 1)
+
+    with pytest.raises(SchemaVersionError) as exc:
+        await verify(conn, [migration(1), migration(2)])
+
+    assert (exc.value.current, exc.value.expected) == (1, 2)
+
+
+async def test_verify_returns_version_when_at_head():
+    conn = FakeConnection([], 2)
+
+    assert await verify(conn, [migration(1), migration(2)]) == 2
+
+
+async def test_upgrade_applies_pending_migrations_in_order():
+    engine = FakeEngine(version=1)
+    migrations = [migration(1), migration(2, False), migration(3)]
+
+    applied = await upgrade(engine, migrations)
+
+    assert [m.version for m in applied] == [2, 3]
+    assert engine.log[1:] == ["up 2", "version=2", "up 3", "version=3"]
+
+
+async def test_upgrade_stops_at_target():
+    engine = FakeEngine(version=0)
+
+    applied = await upgrade(engine, [migration(1), migration(2)], target=1)
+
+    assert [m.version for m in applied] == [1]
+    assert engine.lock.version == 1
+
+
+async def test_downgrade_reverts_in_reverse_order():
+    engine = FakeEngine(version=3)
+    migrations = [migration(1), migration(2), migration(3)]
+
+    reverted = await downgrade(engine, migrations, target=1)
+
+    assert [m.version for m in reverted] == [3, 2]
+    assert engine.log == ["down 3", "version=2", "down 2", "version=1"]
+
+
+async def test_database_lifespan_refuses_outdated_schema(monkeypatch):
+    from blog_api.commands import database
+
+    monkeypatch.setattr(
+        database, "verify", AsyncMock(side_effect=SchemaVersionError(0, 2))
+    )
+    monkeypatch.setattr(database, "engine", FakeEngine())
+
+    with pytest.raises(SchemaVersionError):
+        async with database.database_init_lifespan(MagicMock()):
+            pass
+
+
+async def test_upgrade_runs_callable_steps_on_the_connection():
+    engine = FakeEngine(version=0)
+    step = AsyncMock()
+    migrations = [Migration(1, "m1", ("up 1", step), (), False)]
+
+    await upgrade(engine, migrations)
+
+    step.assert_awaited_once()
+    assert engine.log[1:] == ["up 1", "version=1"]
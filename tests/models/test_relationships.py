@@ -0,0 +1,13 @@
+import pytest
+from sqlalchemy import inspect
+
+from blog_api.models.comments import CommentModel
+from blog_api.models.posts import PostModel
+
+
+@pytest.mark.parametrize(
+    "model, relation",
+    [(PostModel, "user"), (CommentModel, "user"), (CommentModel, "post")],
+)
+def test_relationships_are_never_loaded_implicitly(model, relation):
+    assert inspect(model).relationships[relation].lazy == "raise"
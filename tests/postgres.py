@@ -0,0 +1,67 @@
+from typing import Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def insert_user(conn: AsyncConnection) -> UUID:
+    user_id = uuid4()
+    await conn.execute(
+        text(
+            "INSERT INTO users (id, created_at, updated_at, username, email, "
+            "password, role) VALUES (:id, now(), now(), :name, :email, "
+            "'x', 'user')"
+        ),
+        {"id": user_id, "name": user_id.hex, "email": f"{user_id}@blog.io"},
+    )
+    return user_id
+
+
+async def insert_post(
+    conn: AsyncConnection,
+    user_id: UUID,
+    content: str,
+    title: str = "title",
+    categories: Sequence[str] | None = None,
+) -> UUID:
+    # only the columns of 0001, triggers fill in whatever came later
+    post_id = uuid4()
+    await conn.execute(
+        text(
+            "INSERT INTO posts (id, created_at, updated_at, title, "
+            "categories, content, user_id) VALUES (:id, now(), now(), "
+            ":title, :categories, :content, :user_id)"
+        ),
+        {
+            "id": post_id,
+            "title": title,
+            "categories": None if categories is None else list(categories),
+            "content": content,
+            "user_id": user_id,
+        },
+    )
+    return post_id
+
+
+async def is_nullable(conn: AsyncConnection, table: str, column: str) -> bool:
+    result = await conn.execute(
+        text(
+            "SELECT is_nullable FROM information_schema.columns "
+            "WHERE table_schema = current_schema() "
+            "AND table_name = :table AND column_name = :column"
+        ),
+        {"table": table, "column": column},
+    )
+    return result.scalar_one() == "YES"
+
+
+async def index_is_valid(conn: AsyncConnection, name: str) -> bool | None:
+    result = await conn.execute(
+        text(
+            "SELECT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass(:name)"
+        ),
+        {"name": name},
+    )
+    return result.scalar()
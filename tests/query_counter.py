@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+from typing import Generator
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, many):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def assert_count(self, expected: int) -> None:
+        assert (
+            self.count == expected
+        ), f"expected {expected} statements, ran {self.count}:\n" + "\n".join(
+            self.statements
+        )
+
+
+@contextmanager
+def count_queries(
+    *engines: Engine,
+) -> Generator[QueryCounter, None, None]:
+    counter = QueryCounter()
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", counter)
+
+
+def counting_session(counter: QueryCounter, *results: list[dict]) -> MagicMock:
+    # stands in for the database session on a cache miss: the repositories
+    # run unchanged and every statement they send reaches the counter,
+    # answered with the next rows in `results`
+    pending = list(results)
+
+    async def execute(statement, *args, **kwargs):
+        counter.statements.append(
+            str(statement.compile(dialect=postgresql.dialect()))
+        )
+        rows = [MagicMock(_mapping=row) for row in (pending or [[]]).pop(0)]
+        result = MagicMock()
+        result.__iter__.side_effect = lambda: iter(rows)
+        result.one_or_none.return_value = rows[0] if rows else None
+        return result
+
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.execute = AsyncMock(side_effect=execute)
+    return session
@@ -2,6 +2,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -13,8 +14,12 @@ from blog_api.contrib.errors import (
     UnableCreateEntity,
     UnableDeleteEntity,
 )
+from blog_api.core.cache import Cache
 from blog_api.models.comments import CommentModel
-from blog_api.repositories.comments import CommentsRepository
+from blog_api.repositories.comments import (
+    CommentsRepository,
+    select_comments,
+)
 from blog_api.schemas.comments import CommentOut
 
 
@@ -30,6 +35,7 @@ async def test_create_comment_success(
         return_value=mock_post_inserted
     )
 
+    mock_session.execute.return_value = MagicMock()
     mock_session.commit.side_effect = lambda: setattr(
         mock_comment, "id", comment_id
     )
@@ -49,14 +55,17 @@ async def test_create_comment_raise_no_result_found_post_id(
     mock_session: AsyncSession, mock_comment: CommentModel, mock_user_inserted
 ):
     posts_repository = AsyncMock()
-    posts_repository.get_post_by_id.return_value = None
+    mock_session.flush.side_effect = IntegrityError(
+        "stmt", "params", MagicMock(sqlstate="23503")
+    )
 
     comments_repository = CommentsRepository(mock_session, posts_repository)
 
     with pytest.raises(NoResultFound, match="Result not found with post_id"):
         await comments_repository.create_comment(mock_comment)
 
-        mock_session.assert_called_once_with(mock_comment)
+    posts_repository.get_post_by_id.assert_not_awaited()
+    mock_session.rollback.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -643,3 +652,162 @@ async def test_delete_comment_raise_generic_error(
             await comments_repository.delete_comment(comment_id)
 
         mock.assert_called_once_with(comment_id)
+
+
+def test_select_comments_projects_only_comment_out_columns():
+    sql = str(select_comments().compile(dialect=postgresql.dialect()))
+
+    assert "JOIN posts ON posts.id = comments.post_id" in sql
+    assert "JOIN users ON users.id = comments.user_id" in sql
+    assert "password" not in sql
+    assert "posts.content" not in sql
+    assert {c.name for c in select_comments().selected_columns} == set(
+        CommentOut.model_fields
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_comments_by_user_id_build_dtos_from_rows(
+    mock_comments_inserted: list[CommentOut], user_id: UUID
+):
+    result = MagicMock()
+    result.__iter__.return_value = iter(
+        [MagicMock(_mapping=c.model_dump()) for c in mock_comments_inserted]
+    )
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.execute = AsyncMock(return_value=result)
+    repository = CommentsRepository(session, MagicMock())
+
+    comments = await repository.get_comments_by_user_id(user_id)
+
+    assert comments == mock_comments_inserted
+
+
+@pytest.mark.asyncio
+async def test_create_comments_join_posts_and_skip_missing(
+    user_id: UUID, post_id: UUID
+):
+    comments = [
+        {"content": "first", "post_id": post_id, "user_id": user_id},
+        {"content": "orphan", "post_id": UUID(int=1), "user_id": user_id},
+    ]
+    session = MagicMock()
+    session.commit = AsyncMock()
+    posts_repository = AsyncMock()
+    cache = AsyncMock(spec=Cache)
+    repository = CommentsRepository(session, posts_repository, cache)
+
+    async def execute(statement):
+        if statement.is_update:
+            return MagicMock(**{"scalar_one_or_none.return_value": user_id})
+        first_id = statement.compile().params["param_1"]
+        return MagicMock(**{"scalars.return_value": [first_id]})
+
+    session.execute = AsyncMock(side_effect=execute)
+
+    ids = await repository.create_comments(comments)
+
+    assert ids[0] is not None and ids[1] is None
+    session.commit.assert_awaited_once()
+    posts_repository.get_post_by_id.assert_not_awaited()
+    insert, *counters = [c.args[0] for c in session.execute.await_args_list]
+    sql = str(insert.compile(dialect=postgresql.dialect()))
+    assert "JOIN posts ON posts.id = incoming.post_id" in sql
+    assert "RETURNING comments.id" in sql
+    # only the inserted comment is counted, on its post then its author
+    assert [c.table.name for c in counters] == ["posts", "users"]
+    assert [c.compile().params["comments_count_1"] for c in counters] == [
+        1,
+        1,
+    ]
+    tags = set(cache.invalidate_tags.await_args.args)
+    assert {"feed", f"post:{post_id}", f"author:{user_id}"} <= tags
+
+
+def counted(session) -> list[tuple[str, int]]:
+    statements = [call.args[0] for call in session.execute.await_args_list]
+    return [
+        (s.table.name, s.compile().params["comments_count_1"])
+        for s in statements
+        if s.is_update
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_comment_bump_counters_before_commit(
+    mock_session: AsyncSession, mock_comment: CommentModel
+):
+    order = []
+
+    def execute(statement):
+        order.append(statement.table.name)
+        return MagicMock()
+
+    mock_session.execute.side_effect = execute
+    mock_session.commit.side_effect = lambda: order.append("commit")
+
+    await CommentsRepository(mock_session, AsyncMock()).create_comment(
+        mock_comment
+    )
+
+    assert order == ["posts", "users", "commit"]
+    assert counted(mock_session) == [("posts", 1), ("users", 1)]
+    assert "RETURNING posts.user_id" in str(
+        mock_session.execute.await_args_list[0].args[0]
+    )
+
+
+@pytest.mark.asyncio
+async def test_delete_comment_decrement_counters(
+    comment_id: UUID, post_id: UUID, user_id: UUID
+):
+    returned = MagicMock()
+    returned.one_or_none.return_value = MagicMock(
+        post_id=post_id, user_id=user_id
+    )
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.__aexit__ = AsyncMock(return_value=None)
+    author_id = UUID(int=7)
+    incremented = MagicMock()
+    incremented.scalar_one_or_none.return_value = author_id
+    session.execute = AsyncMock(side_effect=[returned, incremented, None])
+    session.commit = AsyncMock()
+    cache = AsyncMock(spec=Cache)
+
+    await CommentsRepository(session, AsyncMock(), cache).delete_comment(
+        comment_id
+    )
+
+    assert counted(session) == [("posts", -1), ("users", -1)]
+    session.commit.assert_awaited_once()
+    # both counters show up in cached listings and post payloads
+    cache.invalidate_tags.assert_awaited_once_with(
+        "feed",
+        f"comments:{post_id}",
+        f"commenter:{user_id}",
+        f"post:{post_id}",
+        f"author:{user_id}",
+        f"author:{author_id}",
+    )
+
+
+@pytest.mark.asyncio
+async def test_delete_comment_miss_leave_counters_alone(comment_id: UUID):
+    returned = MagicMock()
+    returned.one_or_none.return_value = None
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.execute = AsyncMock(return_value=returned)
+    session.commit = AsyncMock()
+
+    with pytest.raises(NoResultFound):
+        await CommentsRepository(session, AsyncMock()).delete_comment(
+            comment_id
+        )
+
+    session.execute.assert_awaited_once()
+    session.commit.assert_not_awaited()
@@ -1,12 +1,26 @@
 from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import create_engine, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import OperationalError, IntegrityError
-from blog_api.repositories.posts import PostsRepository
+from blog_api.core.cache import Cache
+from blog_api.contrib.pagination import KeysetParams, RankKeyset
+from blog_api.repositories.posts import (
+    PostsRepository,
+    escape_html,
+    select_post_summaries,
+    select_posts,
+)
+from blog_api.contrib.repositories import increment
 from blog_api.models.posts import PostModel
+from blog_api.models.users import UserModel
 from blog_api.contrib.errors import (
+    CacheError,
     DatabaseError,
     GenericError,
     NoResultFound,
+    NotOwner,
+    NothingToUpdate,
     UnableCreateEntity,
     UnableDeleteEntity,
     UnableUpdateEntity,
@@ -14,7 +28,7 @@ from blog_api.contrib.errors import (
 from uuid import UUID
 import pytest
 
-from blog_api.schemas.posts import PostOut
+from blog_api.schemas.posts import CategoryCountOut, PostOut, PostSummaryOut
 
 
 @pytest.mark.asyncio
@@ -37,6 +51,37 @@ async def test_create_post_success(
     assert mock_post.id == post_id
 
 
+@pytest.mark.asyncio
+async def test_create_post_invalidate_feed_and_author_tags(
+    mock_session: AsyncSession,
+    mock_post: PostModel,
+):
+    cache = AsyncMock(spec=Cache)
+
+    posts_repository = PostsRepository(mock_session, cache)
+
+    await posts_repository.create_post(mock_post)
+
+    cache.invalidate_tags.assert_awaited_once_with(
+        "feed", f"author:{mock_post.user_id}"
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_post_success_when_invalidation_fails(
+    mock_session: AsyncSession,
+    mock_post: PostModel,
+):
+    cache = AsyncMock(spec=Cache)
+    cache.invalidate_tags.side_effect = CacheError("ConnectionError")
+
+    posts_repository = PostsRepository(mock_session, cache)
+
+    await posts_repository.create_post(mock_post)
+
+    mock_session.commit.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_create_post_raise_database_error(
     mock_session: AsyncMock, mock_post: MagicMock
@@ -425,3 +470,329 @@ async def test_delete_post_raise_generic_error(mock_session: AsyncMock, post_id:
             await posts_repository.delete_post(post_id)
 
         mock.assert_called_once_with(post_id)
+
+
+def projected_session(rows: list[dict]) -> MagicMock:
+    result = MagicMock()
+    result.__iter__.return_value = iter(
+        [MagicMock(_mapping=row) for row in rows]
+    )
+    result.one_or_none.return_value = (
+        MagicMock(_mapping=rows[0]) if rows else None
+    )
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+def test_select_posts_projects_only_post_out_columns():
+    sql = str(select_posts().compile(dialect=postgresql.dialect()))
+
+    assert "JOIN users ON users.id = posts.user_id" in sql
+    assert "password" not in sql
+    assert "content_hash" not in sql
+    assert {c.name for c in select_posts().selected_columns} == set(
+        PostOut.model_fields
+    )
+
+
+def test_select_post_summaries_read_excerpt_not_content():
+    sql = str(select_post_summaries().compile(dialect=postgresql.dialect()))
+
+    assert "posts.excerpt" in sql
+    assert "posts.content" not in sql
+    assert {c.name for c in select_post_summaries().selected_columns} == set(
+        PostSummaryOut.model_fields
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_posts_build_dtos_from_rows(
+    mock_post_summaries: list[PostSummaryOut],
+):
+    rows = [post.model_dump() for post in mock_post_summaries]
+    repository = PostsRepository(projected_session(rows))
+
+    posts = await repository.get_posts(limit=10)
+
+    assert posts == mock_post_summaries
+    assert all(type(post) is PostSummaryOut for post in posts)
+
+
+@pytest.mark.asyncio
+async def test_get_post_by_id_build_dto_from_row(mock_post_inserted: PostOut):
+    session = projected_session([mock_post_inserted.model_dump()])
+    repository = PostsRepository(session)
+
+    assert await repository.get_post_by_id(mock_post_inserted.id) == (
+        mock_post_inserted
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_post_by_id_without_row_return_none(post_id: UUID):
+    repository = PostsRepository(projected_session([]))
+
+    assert await repository.get_post_by_id(post_id) is None
+
+
+def scalar_session(*values) -> MagicMock:
+    results = [MagicMock(**{"scalar_one_or_none.return_value": v}) for v in values]
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.execute = AsyncMock(side_effect=results)
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+def statement_sql(session: MagicMock, index: int = 0) -> str:
+    statement = session.execute.await_args_list[index].args[0]
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_update_post_owned_runs_single_statement(
+    post_id: UUID, user_id: UUID, mock_update_post: dict
+):
+    session = scalar_session(user_id)
+    cache = AsyncMock(spec=Cache)
+    repository = PostsRepository(session, cache)
+
+    await repository.update_post(post_id, mock_update_post, owner_id=user_id)
+
+    session.execute.assert_awaited_once()
+    session.commit.assert_awaited_once()
+    sql = statement_sql(session)
+    assert "posts.user_id = " in sql
+    assert "RETURNING posts.user_id" in sql
+    cache.invalidate_tags.assert_awaited_once_with(
+        f"post:{post_id}", "feed", f"author:{user_id}"
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_post_skip_none_fields(post_id: UUID, user_id: UUID):
+    session = scalar_session(user_id)
+    repository = PostsRepository(session)
+
+    await repository.update_post(post_id, {"title": "new", "content": None})
+
+    sql = statement_sql(session)
+    assert "title=" in sql
+    assert "content=" not in sql
+
+
+@pytest.mark.asyncio
+async def test_update_post_raise_nothing_to_update(post_id: UUID):
+    session = scalar_session()
+    repository = PostsRepository(session)
+
+    with pytest.raises(NothingToUpdate):
+        await repository.update_post(post_id, {"title": None})
+
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_update_post_miss_raise_not_owner(
+    post_id: UUID, user_id: UUID, mock_update_post: dict
+):
+    session = scalar_session(None, UUID(int=1))
+    repository = PostsRepository(session)
+
+    with pytest.raises(NotOwner):
+        await repository.update_post(
+            post_id, mock_update_post, owner_id=user_id
+        )
+
+    session.commit.assert_not_awaited()
+    assert session.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_update_post_miss_raise_no_result_found(
+    post_id: UUID, user_id: UUID, mock_update_post: dict
+):
+    session = scalar_session(None, None)
+    repository = PostsRepository(session)
+
+    with pytest.raises(NoResultFound, match="post_id"):
+        await repository.update_post(
+            post_id, mock_update_post, owner_id=user_id
+        )
+
+
+@pytest.mark.asyncio
+async def test_delete_post_without_owner_skip_ownership_lookup(post_id: UUID):
+    session = scalar_session(None)
+    repository = PostsRepository(session)
+
+    with pytest.raises(NoResultFound, match="post_id"):
+        await repository.delete_post(post_id)
+
+    session.execute.assert_awaited_once()
+    assert "posts.user_id = " not in statement_sql(session)
+
+
+@pytest.mark.asyncio
+async def test_create_posts_single_statement_skip_duplicates(user_id: UUID):
+    posts = [
+        {"title": "a", "categories": [], "content": "a", "user_id": user_id},
+        {"title": "b", "categories": [], "content": "b", "user_id": user_id},
+    ]
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    cache = AsyncMock(spec=Cache)
+    repository = PostsRepository(session, cache)
+
+    async def execute(statement):
+        if statement.is_update:
+            return MagicMock()
+        first_id = statement.compile().params["id_m0"]
+        return MagicMock(**{"scalars.return_value": [first_id]})
+
+    session.execute.side_effect = execute
+
+    ids = await repository.create_posts(posts)
+
+    assert session.execute.await_count == 2
+    session.commit.assert_awaited_once()
+    assert ids[0] is not None and ids[1] is None
+    counter = session.execute.await_args_list[1].args[0]
+    assert counter.compile().params["posts_count_1"] == 1
+    sql = statement_sql(session)
+    assert "ON CONFLICT (content_hash) DO NOTHING" in sql
+    assert "RETURNING posts.id" in sql
+    cache.invalidate_tags.assert_awaited_once_with("feed", f"author:{user_id}")
+
+
+@pytest.mark.asyncio
+async def test_create_posts_raise_database_error(mock_session: AsyncMock):
+    mock_session.execute.side_effect = OperationalError("stmt", "params", "orig")
+    repository = PostsRepository(mock_session)
+
+    with pytest.raises(DatabaseError):
+        await repository.create_posts(
+            [{"title": "a", "categories": [], "content": "a", "user_id": None}]
+        )
+
+    mock_session.rollback.assert_awaited_once()
+    mock_session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_search_posts_rank_matches_before_building_headlines(
+    post_id: UUID,
+):
+    session = projected_session([])
+    repository = PostsRepository(session)
+
+    await repository.search_posts("cats", 11, RankKeyset(0.5, post_id))
+
+    sql = statement_sql(session)
+    outer, inner = sql.split("FROM (", 1)
+    ranked = inner.split(") AS ranked", 1)[0]
+    assert "posts.search @@ websearch_to_tsquery" in ranked
+    assert "ts_headline" not in ranked
+    assert "LIMIT" in ranked
+    assert "ts_headline" in outer
+
+
+@pytest.mark.asyncio
+async def test_search_posts_headline_built_from_escaped_content():
+    session = projected_session([])
+    repository = PostsRepository(session)
+
+    await repository.search_posts("cats")
+
+    sql = statement_sql(session)
+    headline = sql.split("ts_headline(", 1)[1]
+    assert headline.split(",", 1)[1].lstrip().startswith("replace(")
+
+
+def test_escape_html_leaves_no_markup_in_content():
+    engine = create_engine("sqlite://")
+    content = '<script>alert("x")</script> cats &amp; <b>dogs</b>'
+
+    with engine.connect() as conn:
+        escaped = conn.execute(select(escape_html(literal(content)))).scalar()
+    engine.dispose()
+
+    assert escaped == (
+        '&lt;script&gt;alert("x")&lt;/script&gt; cats &amp;amp; '
+        "&lt;b&gt;dogs&lt;/b&gt;"
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_posts_page_cursor_on_rank(
+    mock_posts_inserted: list[PostOut],
+):
+    found = [
+        {**post.model_dump(), "rank": 1.0 - i / 10, "snippet": "s"}
+        for i, post in enumerate(mock_posts_inserted)
+    ]
+    repository = PostsRepository(projected_session(found))
+    params = KeysetParams(cursor=None, size=1, total="none")
+
+    page = await repository.search_posts_page("cats", params)
+
+    next_params = KeysetParams(cursor=page.next_page, size=1, total="none")
+    assert next_params.rank_keyset() == RankKeyset(1.0, found[0]["id"], 1)
+
+
+@pytest.mark.parametrize("match, operator", [("all", "@>"), ("any", "&&")])
+@pytest.mark.asyncio
+async def test_get_posts_filter_categories_with_array_operator(
+    match: str, operator: str
+):
+    session = projected_session([])
+    repository = PostsRepository(session)
+
+    await repository.get_posts(11, None, ["python", "web"], match)
+
+    assert f"posts.categories {operator} " in statement_sql(session)
+
+
+@pytest.mark.asyncio
+async def test_get_posts_without_categories_skip_filter():
+    session = projected_session([])
+
+    await PostsRepository(session).get_posts(11)
+
+    assert "posts.categories @>" not in statement_sql(session)
+    assert "posts.categories &&" not in statement_sql(session)
+
+
+@pytest.mark.asyncio
+async def test_get_category_counts_read_summary_table():
+    session = projected_session([{"name": "python", "posts": 2}])
+
+    counts = await PostsRepository(session).get_category_counts()
+
+    sql = statement_sql(session)
+    assert "FROM category_counts" in sql
+    assert "unnest" not in sql
+    assert counts == [CategoryCountOut(name="python", posts=2)]
+
+
+def test_counter_increment_keep_updated_at():
+    statement = increment(UserModel.posts_count, UUID(int=1), -1)
+
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "posts_count=(users.posts_count + " in sql
+    assert "updated_at=users.updated_at" in sql
+
+
+def test_select_posts_read_counters_from_joined_rows():
+    sql = str(select_posts().compile(dialect=postgresql.dialect()))
+
+    assert "posts.comments_count" in sql
+    assert "users.posts_count AS author_posts_count" in sql
+    assert "count(" not in sql.lower()
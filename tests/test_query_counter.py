@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from blog_api.models.posts import PostModel
+from tests.query_counter import QueryCounter, count_queries, counting_session
+
+
+def test_query_counter_counts_statements_per_engine():
+    engine = create_engine("sqlite://")
+    other = create_engine("sqlite://")
+
+    with count_queries(engine) as counter:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        with other.connect() as conn:
+            conn.execute(text("SELECT 3"))
+
+    counter.assert_count(2)
+    assert counter.statements == ["SELECT 1", "SELECT 2"]
+
+    with pytest.raises(AssertionError, match="SELECT 1"):
+        counter.assert_count(1)
+
+
+def test_query_counter_stops_counting_on_exit():
+    engine = create_engine("sqlite://")
+
+    with count_queries(engine) as counter:
+        pass
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    counter.assert_count(0)
+
+
+async def test_counting_session_record_statements_and_answer_in_order():
+    counter = QueryCounter()
+    session = counting_session(counter, [{"id": 1}, {"id": 2}])
+
+    async with session as db:
+        first = await db.execute(select(PostModel.id))
+        second = await db.execute(select(PostModel.title))
+
+    counter.assert_count(2)
+    assert "SELECT posts.id" in counter.statements[0]
+    assert [row._mapping for row in first] == [{"id": 1}, {"id": 2}]
+    assert second.one_or_none() is None
@@ -0,0 +1,25 @@
+from blog_api.utils.compression import (
+    COMPRESSION_MAGIC,
+    compress,
+    decompress,
+    is_compressed,
+)
+
+
+def test_compress_add_marker():
+    compressed = compress(b"post content " * 100, 6)
+
+    assert compressed.startswith(COMPRESSION_MAGIC)
+    assert is_compressed(compressed)
+    assert len(compressed) < len(b"post content " * 100)
+
+
+def test_decompress_round_trip():
+    payload = b"post content " * 100
+
+    assert decompress(compress(payload, 6)) == payload
+
+
+def test_decompress_return_uncompressed_payload_unchanged():
+    assert decompress(b"\x01\x01[]") == b"\x01\x01[]"
+    assert not is_compressed(b'{"id": 1}')
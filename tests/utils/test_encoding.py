@@ -1,8 +1,22 @@
 import json
 
-from blog_api.utils.encoding import encode_pydantic_model, decode_pydantic_model
+import pytest
+from fastapi_pagination.cursor import CursorPage
+
+from blog_api.utils.encoding import (
+    FORMAT_VERSION,
+    JsonCodec,
+    PydanticCodec,
+    decode_pydantic_model,
+    decode_value,
+    encode_pydantic_model,
+    encode_value,
+    get_codec,
+)
 from blog_api.models.users import UserModel
+from blog_api.schemas.posts import PostOut
 from blog_api.schemas.users import UserOut
+from tests.factories import page_of
 
 
 def test_encode_pydantic_model_success(mock_user_out_inserted):
@@ -49,3 +63,77 @@ def test_decode_pydantic_model_success_return_none():
     decode_obj = decode_pydantic_model("", UserOut)
 
     assert decode_obj is None
+
+
+@pytest.mark.parametrize("codec", [JsonCodec(), PydanticCodec()])
+def test_encode_value_write_version_and_codec_header(
+    codec, mock_user_out_inserted
+):
+    encoded = encode_value(mock_user_out_inserted, codec)
+
+    assert encoded[:2] == bytes((FORMAT_VERSION, codec.id))
+
+
+@pytest.mark.parametrize("codec", [JsonCodec(), PydanticCodec()])
+def test_decode_value_single_model_success(codec, mock_user_out_inserted):
+    encoded = encode_value(mock_user_out_inserted, codec)
+
+    assert decode_value(encoded, UserOut) == mock_user_out_inserted
+
+
+@pytest.mark.parametrize("codec", [JsonCodec(), PydanticCodec()])
+def test_decode_value_many_models_success(codec, mock_posts_inserted):
+    encoded = encode_value(mock_posts_inserted, codec)
+
+    assert decode_value(encoded, PostOut) == mock_posts_inserted
+
+
+@pytest.mark.parametrize("codec", [JsonCodec(), PydanticCodec()])
+def test_decode_value_page_success(codec, mock_posts_inserted):
+    page = page_of(mock_posts_inserted)
+    encoded = encode_value(page, codec)
+
+    assert decode_value(encoded, CursorPage[PostOut]) == page
+
+
+def test_decode_value_empty_list_success():
+    encoded = encode_value([], PydanticCodec())
+
+    assert decode_value(encoded, UserOut) == []
+
+
+def test_decode_value_legacy_json_success(mock_users_out_inserted):
+    encoded = encode_pydantic_model(mock_users_out_inserted)
+
+    assert decode_value(encoded, UserOut) == mock_users_out_inserted
+    assert decode_value(encoded.encode(), UserOut) == mock_users_out_inserted
+
+
+def test_decode_value_unknown_codec_return_none(mock_user_out_inserted):
+    encoded = encode_value(mock_user_out_inserted, PydanticCodec())
+
+    assert (
+        decode_value(bytes((FORMAT_VERSION, 99)) + encoded[2:], UserOut)
+        is None
+    )
+    assert (
+        decode_value(bytes((FORMAT_VERSION + 1,)) + encoded[1:], UserOut)
+        is None
+    )
+
+
+def test_decode_value_return_none():
+    assert decode_value(None, UserOut) is None
+    assert decode_value(b"", UserOut) is None
+
+
+def test_encode_value_raise_type_error():
+    with pytest.raises(TypeError):
+        encode_value(UserModel(), PydanticCodec())
+
+
+def test_get_codec_success():
+    assert isinstance(get_codec("pydantic"), PydanticCodec)
+
+    with pytest.raises(ValueError):
+        get_codec("msgpack")